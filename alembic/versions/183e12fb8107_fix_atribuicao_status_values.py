@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     op.execute("UPDATE atribuicoes SET status = 'PENDENTE' WHERE status = 'Pendente';")
     op.execute("UPDATE atribuicoes SET status = 'EM_ANDAMENTO' WHERE status = 'Em Andamento';")
     op.execute("UPDATE atribuicoes SET status = 'REALIZADO' WHERE status = 'Realizado';")
@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     # SQLite supports ADD COLUMN natively
     op.add_column('usuarios', sa.Column('cpf', sa.String(), nullable=True))
@@ -33,6 +35,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     with op.batch_alter_table('usuarios', schema=None) as batch_op:
         batch_op.drop_constraint('uq_usuarios_cpf', type_='unique')
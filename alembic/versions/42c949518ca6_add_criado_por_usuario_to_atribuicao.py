@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('atribuicoes', schema=None) as batch_op:
         batch_op.add_column(sa.Column('criado_por_usuario', sa.Boolean(), nullable=False, server_default=sa.text("'0'")))
         batch_op.alter_column('status',
@@ -36,6 +38,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('cursos', schema=None) as batch_op:
         batch_op.alter_column('atribuir_a_todos',
                    existing_type=sa.BOOLEAN(),
@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('atribuicoes', schema=None) as batch_op:
         batch_op.add_column(sa.Column('atribuido_em', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True))
         batch_op.alter_column('id',
@@ -73,6 +75,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('inscricoes', schema=None) as batch_op:
         batch_op.add_column(sa.Column('data_inscricao', sa.DATETIME(), nullable=True))
         batch_op.alter_column('user_id', new_column_name='usuario_id', existing_type=sa.String())
@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     op.create_table('certificados',
     sa.Column('id', sa.String(), nullable=False),
@@ -67,6 +69,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_table('atribuicoes')
     op.drop_table('usuarios')
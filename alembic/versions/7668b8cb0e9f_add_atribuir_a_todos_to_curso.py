@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     op.add_column('cursos', sa.Column('atribuir_a_todos', sa.Boolean(), nullable=False, server_default='0'))
     # ### end Alembic commands ###
@@ -27,6 +29,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_column('cursos', 'atribuir_a_todos')
     # ### end Alembic commands ###
@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('atribuicoes', schema=None) as batch_op:
         batch_op.add_column(sa.Column('certificado_id', sa.String(), nullable=True))
         batch_op.add_column(sa.Column('data_conclusao', sa.DateTime(), nullable=True))
@@ -28,6 +30,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('atribuicoes', schema=None) as batch_op:
         batch_op.drop_constraint('fk_atribuicoes_certificado_id', type_='foreignkey')
         batch_op.drop_column('data_conclusao')
@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     try:
         op.drop_index(op.f('ix_refresh_tokens_id'), table_name='refresh_tokens')
@@ -36,6 +38,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     op.create_table('refresh_tokens',
     sa.Column('id', sa.INTEGER(), nullable=False),
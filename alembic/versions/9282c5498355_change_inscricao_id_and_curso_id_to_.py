@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('inscricoes', schema=None) as batch_op:
         batch_op.alter_column('id',
                existing_type=sa.INTEGER(),
@@ -32,6 +34,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('inscricoes', schema=None) as batch_op:
         batch_op.alter_column('curso_id',
                existing_type=sa.String(),
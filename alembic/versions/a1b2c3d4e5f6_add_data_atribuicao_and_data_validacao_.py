@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # Add new datetime columns
     with op.batch_alter_table('atribuicoes', schema=None) as batch_op:
         batch_op.add_column(sa.Column('data_atribuicao', sa.DateTime(), nullable=True))
@@ -31,6 +33,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # Revert enum value
     op.execute("UPDATE atribuicoes SET status='REALIZADO' WHERE status='Realizado'")
 
@@ -0,0 +1,114 @@
+"""add hot path indexes
+
+Revision ID: a7d3c9e5b218
+Revises: f1c8a2b7d406
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3c9e5b218'
+down_revision: Union[str, Sequence[str], None] = 'f1c8a2b7d406'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Entre atribuições repetidas do mesmo usuário e curso, fica a mais avançada
+# (e, no empate, a de menor ID)
+def _progresso(alias: str) -> str:
+    return f"""
+        CASE {alias}.status
+            WHEN 'CONCLUIDO' THEN 6 WHEN 'VALIDADO' THEN 5 WHEN 'REALIZADO' THEN 4
+            WHEN 'RECUSADO' THEN 3 WHEN 'EM_ANDAMENTO' THEN 2 ELSE 1
+        END
+    """
+
+
+ATRIBUICOES_REPETIDAS = f"""
+    SELECT atribuicoes.id FROM atribuicoes
+    WHERE EXISTS (
+        SELECT 1 FROM atribuicoes outra
+        WHERE outra.user_id = atribuicoes.user_id
+          AND outra.curso_id = atribuicoes.curso_id
+          AND outra.id <> atribuicoes.id
+          AND ({_progresso('outra')} > {_progresso('atribuicoes')}
+               OR ({_progresso('outra')} = {_progresso('atribuicoes')} AND outra.id < atribuicoes.id))
+    )
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # Inscrições repetidas: fica a de menor ID
+    op.execute(
+        """
+        DELETE FROM inscricoes
+        WHERE EXISTS (
+            SELECT 1 FROM inscricoes outra
+            WHERE outra.user_id = inscricoes.user_id
+              AND outra.curso_id = inscricoes.curso_id
+              AND outra.id < inscricoes.id
+        )
+        """
+    )
+
+    repetidas = [row[0] for row in bind.execute(sa.text(ATRIBUICOES_REPETIDAS))]
+    if repetidas:
+        # As remoções entram no feed de alterações e o resumo é recalculado
+        alteracoes = sa.table(
+            'alteracoes_atribuicoes',
+            sa.column('atribuicao_id', sa.String()),
+            sa.column('operacao', sa.String()),
+            sa.column('alterado_em', sa.DateTime()),
+        )
+        agora = sa.func.current_timestamp()
+        for atribuicao_id in repetidas:
+            bind.execute(alteracoes.insert().values(atribuicao_id=atribuicao_id, operacao='delete', alterado_em=agora))
+        bind.execute(sa.text(f"DELETE FROM atribuicoes WHERE id IN ({ATRIBUICOES_REPETIDAS})"))
+        op.execute("DELETE FROM resumo_atribuicoes")
+        op.execute(
+            """
+            INSERT INTO resumo_atribuicoes (lotacao, vinculo, ano_gd, status, total)
+            SELECT COALESCE(u.lotacao, ''), COALESCE(u.vinculo, ''), COALESCE(c.ano_gd, ''), a.status, COUNT(a.id)
+            FROM atribuicoes a
+            JOIN usuarios u ON a.user_id = u.id
+            LEFT JOIN cursos c ON a.curso_id = c.id
+            WHERE a.status IS NOT NULL
+            GROUP BY COALESCE(u.lotacao, ''), COALESCE(u.vinculo, ''), COALESCE(c.ano_gd, ''), a.status
+            """
+        )
+
+    # Os índices únicos (user_id, curso_id) também atendem às buscas só por user_id
+    op.drop_index('ix_atribuicoes_user_id', table_name='atribuicoes')
+    op.drop_index('ix_inscricoes_user_id', table_name='inscricoes')
+    op.create_index('ix_atribuicoes_user_id_curso_id', 'atribuicoes', ['user_id', 'curso_id'], unique=True)
+    op.create_index('ix_inscricoes_user_id_curso_id', 'inscricoes', ['user_id', 'curso_id'], unique=True)
+
+    op.create_index('ix_atribuicoes_curso_id_status', 'atribuicoes', ['curso_id', 'status'])
+    op.create_index('ix_atribuicoes_status_data_conclusao', 'atribuicoes', ['status', 'data_conclusao'])
+    op.create_index('ix_inscricoes_curso_id', 'inscricoes', ['curso_id'])
+    op.create_index('ix_usuarios_lotacao_vinculo', 'usuarios', ['lotacao', 'vinculo'])
+    op.create_index('ix_usuarios_vinculo', 'usuarios', ['vinculo'])
+    op.create_index('ix_cursos_ano_gd', 'cursos', ['ano_gd'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # As linhas repetidas removidas não são restauradas
+    op.drop_index('ix_cursos_ano_gd', table_name='cursos')
+    op.drop_index('ix_usuarios_vinculo', table_name='usuarios')
+    op.drop_index('ix_usuarios_lotacao_vinculo', table_name='usuarios')
+    op.drop_index('ix_inscricoes_curso_id', table_name='inscricoes')
+    op.drop_index('ix_atribuicoes_status_data_conclusao', table_name='atribuicoes')
+    op.drop_index('ix_atribuicoes_curso_id_status', table_name='atribuicoes')
+    op.drop_index('ix_inscricoes_user_id_curso_id', table_name='inscricoes')
+    op.drop_index('ix_atribuicoes_user_id_curso_id', table_name='atribuicoes')
+    op.create_index('ix_inscricoes_user_id', 'inscricoes', ['user_id'])
+    op.create_index('ix_atribuicoes_user_id', 'atribuicoes', ['user_id'])
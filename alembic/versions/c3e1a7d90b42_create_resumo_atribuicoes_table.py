@@ -0,0 +1,56 @@
+"""create resumo_atribuicoes table
+
+Revision ID: c3e1a7d90b42
+Revises: 183e12fb8107
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1a7d90b42'
+down_revision: Union[str, Sequence[str], None] = '183e12fb8107'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# O tipo statusatribuicao já existe (atribuicoes.status); no PostgreSQL ele não é recriado
+STATUS_ENUM = postgresql.ENUM(
+    'PENDENTE', 'EM_ANDAMENTO', 'REALIZADO', 'VALIDADO', 'RECUSADO', 'CONCLUIDO',
+    name='statusatribuicao', create_type=False
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'resumo_atribuicoes',
+        sa.Column('lotacao', sa.String(), nullable=False),
+        sa.Column('vinculo', sa.String(), nullable=False),
+        sa.Column('ano_gd', sa.String(), nullable=False),
+        sa.Column('status', STATUS_ENUM, nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('lotacao', 'vinculo', 'ano_gd', 'status')
+    )
+    # Carga inicial a partir das atribuições existentes
+    op.execute(
+        """
+        INSERT INTO resumo_atribuicoes (lotacao, vinculo, ano_gd, status, total)
+        SELECT COALESCE(u.lotacao, ''), COALESCE(u.vinculo, ''), COALESCE(c.ano_gd, ''), a.status, COUNT(a.id)
+        FROM atribuicoes a
+        JOIN usuarios u ON a.user_id = u.id
+        LEFT JOIN cursos c ON a.curso_id = c.id
+        WHERE a.status IS NOT NULL
+        GROUP BY COALESCE(u.lotacao, ''), COALESCE(u.vinculo, ''), COALESCE(c.ano_gd, ''), a.status
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resumo_atribuicoes')
@@ -18,15 +18,94 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# As revisões seguintes, até 183e12fb8107, foram escritas para o SQLite (trocas de tipo
+# de colunas e recriação de tabelas pelo modo batch) e só são aplicadas nele. Nos demais
+# bancos, esta revisão cria diretamente o esquema resultante delas.
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    op.create_table('usuarios',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('nome', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('perfil', sa.Enum('TRABALHADOR', 'CHEFIA', 'UDP', name='perfilusuario'), nullable=False),
+    sa.Column('lotacao', sa.String(), nullable=True),
+    sa.Column('nome_chefia', sa.String(), nullable=True),
+    sa.Column('cargo', sa.String(), nullable=True),
+    sa.Column('matricula', sa.String(), nullable=True),
+    sa.Column('cpf', sa.String(), nullable=True),
+    sa.Column('vinculo', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cpf', name='uq_usuarios_cpf')
+    )
+    op.create_table('cursos',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('lotacao_id', sa.String(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+    sa.Column('titulo', sa.String(), nullable=False),
+    sa.Column('certificadora', sa.String(), nullable=True),
+    sa.Column('carga_horaria', sa.Integer(), nullable=True),
+    sa.Column('link', sa.String(), nullable=True),
+    sa.Column('ano_gd', sa.String(length=255), nullable=True),
+    sa.Column('atribuir_a_todos', sa.Boolean(), server_default=sa.false(), nullable=True),
+    sa.Column('tema', sa.String(), nullable=True),
+    sa.Column('conteudista', sa.String(), nullable=True),
+    sa.Column('disponibilidade_dias', sa.Integer(), nullable=True),
+    sa.Column('tipo_oferta', sa.String(), nullable=True),
+    sa.Column('apresentacao', sa.Text(), nullable=True),
+    sa.Column('publico_alvo', sa.Text(), nullable=True),
+    sa.Column('conteudo_programatico', sa.Text(), nullable=True),
+    sa.Column('data_lancamento', sa.String(), nullable=True),
+    sa.Column('acessibilidade', sa.String(), nullable=True),
+    sa.Column('observacao', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('certificados',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('file_path', sa.String(), nullable=True),
+    sa.Column('link', sa.String(), nullable=True),
+    sa.Column('validado', sa.Boolean(), nullable=False),
+    sa.Column('curso_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['curso_id'], ['cursos.id'], name='fk_certificados_curso_id'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('atribuicoes',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('atribuido_em', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('curso_id', sa.String(), nullable=False),
+    sa.Column('status', sa.Enum('PENDENTE', 'EM_ANDAMENTO', 'REALIZADO', 'VALIDADO', 'RECUSADO', 'CONCLUIDO', name='statusatribuicao'), nullable=True),
+    sa.Column('criado_por_usuario', sa.Boolean(), server_default=sa.false(), nullable=False),
+    sa.Column('certificado_id', sa.String(), nullable=True),
+    sa.Column('data_conclusao', sa.DateTime(), nullable=True),
+    sa.Column('data_atribuicao', sa.DateTime(), nullable=True),
+    sa.Column('data_validacao', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['certificado_id'], ['certificados.id'], name='fk_atribuicoes_certificado_id'),
+    sa.ForeignKeyConstraint(['curso_id'], ['cursos.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('inscricoes',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('inscrito_em', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('curso_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['curso_id'], ['cursos.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    op.drop_table('inscricoes')
+    op.drop_table('atribuicoes')
+    op.drop_table('certificados')
+    op.drop_table('cursos')
+    op.drop_table('usuarios')
+    sa.Enum(name='statusatribuicao').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='perfilusuario').drop(op.get_bind(), checkfirst=True)
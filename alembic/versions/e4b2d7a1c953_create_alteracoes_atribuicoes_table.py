@@ -0,0 +1,36 @@
+"""create alteracoes_atribuicoes table
+
+Revision ID: e4b2d7a1c953
+Revises: c3e1a7d90b42
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b2d7a1c953'
+down_revision: Union[str, Sequence[str], None] = 'c3e1a7d90b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sem carga inicial: consumidores sem cursor recebem primeiro a carga completa do dataset
+    op.create_table(
+        'alteracoes_atribuicoes',
+        sa.Column('seq', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('atribuicao_id', sa.String(), nullable=False),
+        sa.Column('operacao', sa.String(), nullable=False),
+        sa.Column('alterado_em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('alteracoes_atribuicoes')
@@ -0,0 +1,108 @@
+"""normalize user ids to lowercase
+
+Revision ID: f1c8a2b7d406
+Revises: e4b2d7a1c953
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c8a2b7d406'
+down_revision: Union[str, Sequence[str], None] = 'e4b2d7a1c953'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tabelas que referenciam usuarios.id (nome da FK no PostgreSQL, quando existe).
+# refresh_tokens é criada pela aplicação (create_all), não pelas migrações.
+REFERENCIAS = (
+    ('atribuicoes', 'atribuicoes_user_id_fkey'),
+    ('inscricoes', 'inscricoes_user_id_fkey'),
+    ('refresh_tokens', None),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    postgres = bind.dialect.name == 'postgresql'
+    referencias = [(tabela, fk) for tabela, fk in REFERENCIAS if sa.inspect(bind).has_table(tabela)]
+    if postgres:
+        # As FKs não são DEFERRABLE: são recriadas depois de reescrever as chaves
+        for tabela, fk in referencias:
+            if fk:
+                op.drop_constraint(fk, tabela, type_='foreignkey')
+
+    # Atribuições cujo usuário muda de chave (a própria ou a do usuário
+    # referenciado): entram no feed de alterações depois da reescrita
+    alteradas = [row[0] for row in bind.execute(sa.text(
+        """
+        SELECT id FROM atribuicoes
+        WHERE user_id <> LOWER(TRIM(user_id))
+           OR user_id IN (SELECT id FROM usuarios WHERE id <> LOWER(TRIM(id)))
+        """
+    ))]
+
+    # Usuários duplicados apenas por maiúsculas/minúsculas ou espaços nas pontas: fica
+    # a variante já normalizada ou, sem ela, a menor; as demais são removidas (as
+    # referências passam para a que fica ao serem reescritas em minúsculas abaixo)
+    op.execute(
+        """
+        DELETE FROM usuarios
+        WHERE id <> LOWER(TRIM(id))
+          AND EXISTS (
+            SELECT 1 FROM usuarios outro
+            WHERE LOWER(TRIM(outro.id)) = LOWER(TRIM(usuarios.id))
+              AND outro.id <> usuarios.id
+              AND (outro.id = LOWER(TRIM(outro.id)) OR outro.id < usuarios.id)
+          )
+        """
+    )
+    op.execute("UPDATE usuarios SET id = LOWER(TRIM(id)) WHERE id <> LOWER(TRIM(id))")
+    for tabela, _ in referencias:
+        op.execute(f"UPDATE {tabela} SET user_id = LOWER(TRIM(user_id)) WHERE user_id <> LOWER(TRIM(user_id))")
+
+    if postgres:
+        for tabela, fk in referencias:
+            if fk:
+                op.create_foreign_key(fk, tabela, 'usuarios', ['user_id'], ['id'])
+
+    # Atribuições de duplicados removidos passam a contar na lotação e no
+    # vínculo do usuário que ficou: o resumo é recalculado
+    alteracoes = sa.table(
+        'alteracoes_atribuicoes',
+        sa.column('atribuicao_id', sa.String()),
+        sa.column('operacao', sa.String()),
+        sa.column('alterado_em', sa.DateTime()),
+    )
+    agora = sa.func.current_timestamp()
+    for atribuicao_id in alteradas:
+        bind.execute(alteracoes.insert().values(atribuicao_id=atribuicao_id, operacao='upsert', alterado_em=agora))
+    op.execute("DELETE FROM resumo_atribuicoes")
+    op.execute(
+        """
+        INSERT INTO resumo_atribuicoes (lotacao, vinculo, ano_gd, status, total)
+        SELECT COALESCE(u.lotacao, ''), COALESCE(u.vinculo, ''), COALESCE(c.ano_gd, ''), a.status, COUNT(a.id)
+        FROM atribuicoes a
+        JOIN usuarios u ON a.user_id = u.id
+        LEFT JOIN cursos c ON a.curso_id = c.id
+        WHERE a.status IS NOT NULL
+        GROUP BY COALESCE(u.lotacao, ''), COALESCE(u.vinculo, ''), COALESCE(c.ano_gd, ''), a.status
+        """
+    )
+
+    # Buscas por usuário passam a ser igualdade simples nessas colunas
+    op.create_index('ix_atribuicoes_user_id', 'atribuicoes', ['user_id'])
+    op.create_index('ix_inscricoes_user_id', 'inscricoes', ['user_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # A grafia original dos IDs não é restaurada
+    op.drop_index('ix_inscricoes_user_id', table_name='inscricoes')
+    op.drop_index('ix_atribuicoes_user_id', table_name='atribuicoes')
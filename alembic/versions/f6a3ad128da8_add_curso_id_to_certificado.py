@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('certificados', schema=None) as batch_op:
         batch_op.add_column(sa.Column('curso_id', sa.String(), nullable=True)) # Add as nullable first
         batch_op.create_foreign_key('fk_certificados_curso_id', 'cursos', ['curso_id'], ['id']) # Add foreign key
@@ -34,6 +36,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('certificados', schema=None) as batch_op:
         batch_op.drop_constraint('fk_certificados_curso_id', type_='foreignkey')
         batch_op.drop_column('curso_id')
@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     op.add_column('cursos', sa.Column('conteudista', sa.String(), nullable=True))
     op.add_column('cursos', sa.Column('disponibilidade_dias', sa.Integer(), nullable=True))
@@ -35,6 +37,8 @@ def upgrade() -> None:
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_column('cursos', 'observacao')
     op.drop_column('cursos', 'acessibilidade')
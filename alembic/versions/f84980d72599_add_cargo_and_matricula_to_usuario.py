@@ -20,12 +20,16 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('usuarios', schema=None) as batch_op:
         batch_op.add_column(sa.Column('cargo', sa.String(), nullable=True))
         batch_op.add_column(sa.Column('matricula', sa.String(), nullable=True))
 
 def downgrade() -> None:
     """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # outros bancos: esquema criado em df72b10ec0f3
     with op.batch_alter_table('usuarios', schema=None) as batch_op:
         batch_op.drop_column('matricula')
         batch_op.drop_column('cargo')
@@ -0,0 +1,421 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+from dotenv import load_dotenv
+from sqlalchemy import insert
+
+from src.resources.database import DatabaseManager
+from src.resources.report_cache import report_cache
+from src.models.base import Base
+from src.models import Usuario, Curso, Atribuicao, Certificado, Inscricao, PerfilUsuario, StatusAtribuicao
+from src.providers.implementations.relatorio_provider import RelatorioProvider
+from src.providers.implementations.relatorio_definicoes import CONSOLIDADO, CAPACITACOES
+from src.controllers import relatorio_controller, resumo_controller
+from src.helpers import csv_helper, ndjson_helper
+
+# Carrega variáveis de ambiente imediatamente
+load_dotenv()
+
+# Arquivo (JSON Lines) onde cada execução acrescenta seus resultados
+BENCHMARK_RESULTS_FILE = os.getenv("BENCHMARK_RESULTS_FILE", "benchmark_resultados.jsonl")
+
+SEED_BATCH_SIZE = 10000
+VINCULOS = ("RJU", "EBSERH", "RESIDENTE", None)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _rss_atual() -> int:
+    """
+    RSS atual do processo em bytes (Linux); fora do Linux, o pico desde o início do processo.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+
+
+class MonitorRSS:
+    """
+    Amostra o RSS do processo em uma thread enquanto um caso roda e guarda o pico.
+    Como o RSS raramente diminui, o acréscimo sobre o valor inicial (`pico - inicial`)
+    é o que isola o consumo de cada caso.
+    Não inclui a memória de processos filhos (ex: RENDER_EXECUTOR=process).
+    """
+    def __init__(self, intervalo: float = 0.005):
+        self.intervalo = intervalo
+        self.inicial = 0
+        self.pico = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.is_set():
+            self.pico = max(self.pico, _rss_atual())
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self) -> "MonitorRSS":
+        self.inicial = self.pico = _rss_atual()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        self.pico = max(self.pico, _rss_atual())
+
+
+async def popular(db_manager: DatabaseManager, usuarios: int, cursos: int, atribuicoes: int, seed: int) -> None:
+    """
+    Cria as tabelas e gera dados sintéticos na escala pedida (inserções em lote).
+    Os dados são determinísticos para a mesma `seed`.
+    """
+    rnd = random.Random(seed)
+    lotacoes = [f"SETOR {i:03d}" for i in range(max(1, usuarios // 50))]
+    anos = ["2023", "2024", "2025"]
+    agora = datetime(2025, 6, 30)
+
+    async with db_manager.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_rows = [
+        {
+            "id": f"bench.user{i:07d}",
+            "nome": f"Servidor {i:07d}",
+            "email": f"servidor{i}@exemplo.com",
+            "perfil": PerfilUsuario.CHEFIA if i % 50 == 0 else PerfilUsuario.TRABALHADOR,
+            "lotacao": lotacoes[i % len(lotacoes)],
+            "vinculo": rnd.choice(VINCULOS),
+            "cargo": "Analista",
+        }
+        for i in range(usuarios)
+    ]
+    curso_rows = [
+        {
+            "id": f"bench-curso-{i:06d}",
+            "titulo": f"Curso {i:06d}",
+            "certificadora": "Escola Corporativa",
+            "carga_horaria": rnd.choice((4, 8, 20, 40)),
+            "ano_gd": rnd.choice(anos),
+        }
+        for i in range(cursos)
+    ]
+
+    # Pares (usuário, curso) distintos
+    total = min(atribuicoes, usuarios * cursos)
+    pares = set()
+    while len(pares) < total:
+        pares.add((rnd.randrange(usuarios), rnd.randrange(cursos)))
+
+    status = list(StatusAtribuicao)
+    atribuicao_rows, certificado_rows, inscricao_rows = [], [], []
+    for user_idx, curso_idx in sorted(pares):
+        user_id, curso_id = user_rows[user_idx]["id"], curso_rows[curso_idx]["id"]
+        situacao = rnd.choice(status)
+        atribuido_em = agora - timedelta(days=rnd.randrange(730))
+        certificado_id = None
+        if situacao in (StatusAtribuicao.REALIZADO, StatusAtribuicao.VALIDADO, StatusAtribuicao.CONCLUIDO):
+            certificado_id = str(uuid4())
+            certificado_rows.append({
+                "id": certificado_id, "curso_id": curso_id,
+                "file_path": f"uploads/{certificado_id}.pdf", "validado": situacao != StatusAtribuicao.REALIZADO,
+            })
+        if rnd.random() < 0.3:
+            inscricao_rows.append({"id": str(uuid4()), "user_id": user_id, "curso_id": curso_id, "inscrito_em": atribuido_em})
+        atribuicao_rows.append({
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "curso_id": curso_id,
+            "status": situacao,
+            "atribuido_em": atribuido_em,
+            "data_atribuicao": atribuido_em,
+            "certificado_id": certificado_id,
+            "data_conclusao": atribuido_em + timedelta(days=10) if certificado_id else None,
+        })
+
+    async with db_manager.async_session_maker() as db:
+        for model, rows in (
+            (Usuario, user_rows), (Curso, curso_rows), (Certificado, certificado_rows),
+            (Atribuicao, atribuicao_rows), (Inscricao, inscricao_rows),
+        ):
+            for inicio in range(0, len(rows), SEED_BATCH_SIZE):
+                await db.execute(insert(model), rows[inicio:inicio + SEED_BATCH_SIZE])
+        await resumo_controller.reconstruir_resumo(db)
+        await db.commit()
+
+
+async def _consumir(iterador) -> int:
+    """
+    Consome um fluxo de bytes (CSV/NDJSON) e retorna o total de bytes gerados.
+    """
+    return sum([len(chunk) async for chunk in iterador])
+
+
+def _tamanho(file_stream) -> int:
+    try:
+        file_stream.seek(0, os.SEEK_END)
+        return file_stream.tell()
+    finally:
+        file_stream.close()
+
+
+def _casos(db, lotacao: str) -> Dict[str, Tuple[Callable[[], Awaitable[Any]], Callable[[], Awaitable[int]]]]:
+    """
+    Casos medidos: nome -> (execução, contagem de linhas processadas).
+    Consultas retornam a lista de linhas; exportações retornam o tamanho do arquivo.
+    """
+    provider = RelatorioProvider(db)
+
+    async def total(definicao, **filtros):
+        return await definicao.contar(db, **filtros)
+
+    async def fixo(linhas: int):
+        return linhas
+
+    casos = {
+        "consulta.consolidado": (
+            lambda: relatorio_controller.get_relatorio_consolidado(db),
+            lambda: total(CONSOLIDADO),
+        ),
+        "consulta.consolidado_lotacao": (
+            lambda: relatorio_controller.get_relatorio_consolidado(db, lotacao=lotacao),
+            lambda: total(CONSOLIDADO, lotacao=lotacao),
+        ),
+        "consulta.consolidado_pagina": (
+            lambda: relatorio_controller.paginar_relatorio(db, CONSOLIDADO, limit=100),
+            lambda: fixo(100),
+        ),
+        "consulta.capacitacoes": (
+            lambda: provider.listar_dados_capacitacoes(),
+            lambda: total(CAPACITACOES),
+        ),
+        "consulta.status_lotacao": (
+            lambda: provider.get_status_lotacao(lotacao),
+            lambda: total(CONSOLIDADO, lotacao=lotacao),
+        ),
+        "consulta.progresso_equipe": (
+            lambda: provider.get_progresso_equipe(lotacao),
+            lambda: total(CONSOLIDADO, lotacao=lotacao),
+        ),
+        "consulta.status_geral": (
+            lambda: relatorio_controller.get_relatorio_status_geral_udp(db),
+            lambda: total(CONSOLIDADO),
+        ),
+        "consulta.cursos_populares": (
+            lambda: relatorio_controller.listar_cursos_mais_inscritos_udp(db, 10),
+            lambda: total(CONSOLIDADO),
+        ),
+    }
+    for definicao in (CONSOLIDADO, CAPACITACOES):
+        contagem = lambda definicao=definicao: total(definicao)
+        for formato in ("excel", "excel_resumo", "pdf"):
+            if formato == "excel_resumo" and definicao.resumo is None:
+                continue
+            casos[f"export.{definicao.nome}.{formato}"] = (
+                lambda definicao=definicao, formato=formato: _exportar(db, definicao, formato),
+                contagem,
+            )
+        casos[f"export.{definicao.nome}.csv"] = (
+            lambda definicao=definicao: _consumir(csv_helper.stream_csv(relatorio_controller.stream_relatorio(db, definicao))),
+            contagem,
+        )
+        casos[f"export.{definicao.nome}.ndjson"] = (
+            lambda definicao=definicao: _consumir(ndjson_helper.iter_ndjson(relatorio_controller.stream_relatorio(db, definicao))),
+            contagem,
+        )
+    for formato in ("parquet", "arrow"):
+        casos[f"export.dataset.{formato}"] = (
+            lambda formato=formato: _exportar_dataset(provider, formato),
+            lambda: total(CAPACITACOES),
+        )
+    return casos
+
+
+async def _exportar(db, definicao, formato: str) -> int:
+    return _tamanho(await relatorio_controller.exportar_relatorio(db, definicao, formato))
+
+
+async def _exportar_dataset(provider, formato: str) -> int:
+    return _tamanho(await relatorio_controller.exportar_dataset_capacitacoes(provider, formato))
+
+
+async def medir(db, nome: str, executar, contar, repeticoes: int) -> Dict[str, Any]:
+    """
+    Executa o caso `repeticoes` vezes, sempre sem cache de relatórios, e retorna a
+    latência (mediana, mín. e máx.), o pico de RSS (e o acréscimo no caso), as linhas
+    e as linhas por segundo.
+    """
+    linhas = await contar()
+    latencias, picos, acrescimos, saida = [], [], [], None
+    for _ in range(repeticoes):
+        report_cache.clear()
+        gc.collect()
+        with MonitorRSS() as monitor:
+            inicio = time.perf_counter()
+            saida = await executar()
+            latencias.append(time.perf_counter() - inicio)
+        picos.append(monitor.pico)
+        acrescimos.append(monitor.pico - monitor.inicial)
+
+    mediana = statistics.median(latencias)
+    resultado = {
+        "caso": nome,
+        "linhas": linhas,
+        "latencia_ms": round(mediana * 1000, 2),
+        "latencia_min_ms": round(min(latencias) * 1000, 2),
+        "latencia_max_ms": round(max(latencias) * 1000, 2),
+        "pico_rss_mb": round(max(picos) / (1024 * 1024), 1),
+        "acrescimo_rss_mb": round(max(acrescimos) / (1024 * 1024), 1),
+        "linhas_por_s": round(linhas / mediana, 1) if mediana else None,
+    }
+    if isinstance(saida, int):
+        resultado["bytes"] = saida
+    return resultado
+
+
+async def executar_benchmark(
+    usuarios: int,
+    cursos: int,
+    atribuicoes: int,
+    repeticoes: int = 3,
+    filtro: str | None = None,
+    db_path: str | None = None,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Gera (ou reaproveita, se `db_path` já existir) o banco na escala pedida e mede cada
+    consulta de relatório e cada formato de exportação. Retorna o registro da execução.
+    """
+    temporario = None
+    if db_path is None:
+        temporario = tempfile.mkdtemp(prefix="benchmark_relatorios_")
+        db_path = os.path.join(temporario, "benchmark.db")
+    reaproveitado = os.path.exists(db_path)
+
+    db_manager = DatabaseManager(f"sqlite+aiosqlite:///{db_path}")
+    try:
+        inicio = time.perf_counter()
+        if not reaproveitado:
+            await popular(db_manager, usuarios, cursos, atribuicoes, seed)
+        carga_s = time.perf_counter() - inicio
+
+        resultados = []
+        async with db_manager.async_session_maker() as db:
+            for nome, (executar, contar) in _casos(db, "SETOR 000").items():
+                if filtro and filtro not in nome:
+                    continue
+                resultado = await medir(db, nome, executar, contar, repeticoes)
+                resultados.append(resultado)
+                print(
+                    f"{nome:40s} {resultado['latencia_ms']:>10.1f} ms {resultado['acrescimo_rss_mb']:>+8.1f} MB "
+                    f"{resultado['linhas_por_s'] or 0:>12.0f} linhas/s",
+                    flush=True
+                )
+    finally:
+        await db_manager.close_connection()
+        report_cache.clear()
+        if temporario:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    return {
+        "commit": _git_commit(),
+        "executado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "escala": {"usuarios": usuarios, "cursos": cursos, "atribuicoes": atribuicoes, "seed": seed},
+        "repeticoes": repeticoes,
+        "carga_s": None if reaproveitado else round(carga_s, 1),
+        "resultados": resultados,
+    }
+
+
+def carregar_execucoes(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+
+def comparar(anterior: Dict[str, Any], atual: Dict[str, Any], limite: float) -> List[str]:
+    """
+    Compara a latência e o acréscimo de RSS de cada caso com a execução anterior.
+    Retorna os casos que pioraram mais que `limite` (fração, ex: 0.2 = 20%).
+    """
+    base = {r["caso"]: r for r in anterior["resultados"]}
+    regressoes = []
+    print(f"\nComparação com {anterior.get('commit')} ({anterior['executado_em']}):")
+    for resultado in atual["resultados"]:
+        antes = base.get(resultado["caso"])
+        if antes is None:
+            continue
+        variacoes = []
+        for metrica in ("latencia_ms", "acrescimo_rss_mb"):
+            if antes[metrica]:
+                variacao = resultado[metrica] / antes[metrica] - 1
+                variacoes.append(f"{metrica} {variacao:+.0%}")
+                if variacao > limite:
+                    regressoes.append(f"{resultado['caso']} ({metrica} {variacao:+.0%})")
+        print(f"  {resultado['caso']:40s} {', '.join(variacoes)}")
+    return regressoes
+
+
+async def main(args) -> int:
+    execucao = await executar_benchmark(
+        args.usuarios, args.cursos, args.atribuicoes,
+        repeticoes=args.repeticoes, filtro=args.casos, db_path=args.db, seed=args.seed
+    )
+
+    # Execução anterior de outro commit na mesma escala, para comparação
+    anteriores = [
+        e for e in carregar_execucoes(args.saida)
+        if e["escala"] == execucao["escala"] and e.get("commit") != execucao["commit"]
+    ]
+
+    with open(args.saida, "a", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+    print(f"\nResultados gravados em {args.saida}")
+
+    if anteriores:
+        regressoes = comparar(anteriores[-1], execucao, args.limite)
+        if regressoes:
+            print("Regressões acima do limite:\n  " + "\n  ".join(regressoes))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das consultas de relatórios e dos formatos de exportação.")
+    parser.add_argument("--usuarios", type=int, default=10000)
+    parser.add_argument("--cursos", type=int, default=2000)
+    parser.add_argument("--atribuicoes", type=int, default=200000)
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por caso (vale a mediana).")
+    parser.add_argument("--casos", help="Mede apenas os casos cujo nome contém este texto (ex: export.consolidado).")
+    parser.add_argument("--db", help="Arquivo SQLite a reaproveitar entre execuções (criado e populado se não existir).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", default=BENCHMARK_RESULTS_FILE, help="Arquivo JSON Lines de resultados.")
+    parser.add_argument("--limite", type=float, default=0.2, help="Piora (fração) que conta como regressão.")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import os
+from dotenv import load_dotenv
+
+from src.resources.database import DatabaseManager
+from src.providers.implementations.relatorio_provider import RelatorioProvider
+from src.controllers import relatorio_controller
+from src.helpers.arrow_helper import DATASET_FORMATS
+
+# Carrega variáveis de ambiente imediatamente
+load_dotenv()
+
+APP_DB_URL = os.getenv("SQLITE_DSN", "sqlite+aiosqlite:///./app.db")
+
+
+async def exportar(destino: str, formato: str, ano: str | None, vinculo: str | None):
+    """
+    Grava o dataset de capacitações diretamente no arquivo de destino, em lotes.
+    """
+    db_manager = DatabaseManager(APP_DB_URL)
+    tmp_path = f"{destino}.part"
+    try:
+        async with db_manager.read_session_maker() as db:
+            with open(tmp_path, "wb") as sink:
+                await relatorio_controller.exportar_dataset_capacitacoes(
+                    RelatorioProvider(db), formato, ano=ano, vinculo=vinculo, sink=sink
+                )
+        os.replace(tmp_path, destino)
+        print(f"Dataset gravado em {destino}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        await db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta o dataset de capacitações em formato colunar (Parquet/Arrow).")
+    parser.add_argument("destino", help="Arquivo de saída (ex: capacitacoes.parquet)")
+    parser.add_argument("--formato", choices=sorted(DATASET_FORMATS), default="parquet")
+    parser.add_argument("--ano", help="Filtra pelo ano GD do curso")
+    parser.add_argument("--vinculo", help="Filtra pelo vínculo do usuário")
+    args = parser.parse_args()
+    asyncio.run(exportar(args.destino, args.formato, args.ano, args.vinculo))
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+
+from src.resources.database import DatabaseManager
+from src.controllers import snapshot_controller
+
+# Carrega variáveis de ambiente imediatamente
+load_dotenv()
+
+APP_DB_URL = os.getenv("SQLITE_DSN", "sqlite+aiosqlite:///./app.db")
+
+
+async def gerar(anos: list[str] | None) -> int:
+    """
+    Gera os snapshots dos relatórios mais consultados (capacitações, consolidado geral
+    e por lotação, status geral), para serem servidos com `snapshot=true` durante o dia.
+    Pensado para rodar no cron, fora do horário de uso.
+    """
+    db_manager = DatabaseManager(APP_DB_URL)
+    try:
+        async with db_manager.read_session_maker() as db:
+            total = await snapshot_controller.gerar_snapshots(db, anos)
+            print(f"{total} snapshot(s) gerado(s).")
+            return 0
+    finally:
+        await db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera os snapshots noturnos dos relatórios.")
+    parser.add_argument(
+        "--ano", action="append", dest="anos",
+        help="Ano a pré-calcular (pode repetir). Padrão: todos os anos e o ano corrente."
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(gerar(args.anos)))
@@ -8,7 +8,9 @@ from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy import text
 
 from src.resources.database import DatabaseManager
-from src.models import Usuario, PerfilUsuario
+from src.models import Usuario, PerfilUsuario, Atribuicao, normalizar_user_id
+from src.controllers.resumo_controller import atualizando_resumo
+from src.resources.report_cache import bump_data_version
 
 # Carrega variáveis de ambiente imediatamente
 load_dotenv()
@@ -91,7 +93,7 @@ async def import_users():
         for row in users_data:
             # Normalização de chaves (id, nome, email, cpf, vinculo)
             # Tenta chaves comuns de retorno SQL ou CSV
-            user_id = row.get('id') or row.get('sAMAccountName')
+            user_id = normalizar_user_id(row.get('id') or row.get('sAMAccountName'))
             
             # DEBUG SPECIFIC USER
             if user_id and 'filipe.cavalcanti' in str(user_id).lower():
@@ -119,11 +121,15 @@ async def import_users():
             if existing_user:
                 # Atualiza dados se fornecidos e diferentes
                 updated = False
-                if cpf and existing_user.cpf != cpf:
-                    existing_user.cpf = cpf
-                    updated = True
-                if vinculo and existing_user.vinculo != vinculo:
-                    existing_user.vinculo = vinculo
+                if (cpf and existing_user.cpf != cpf) or (vinculo and existing_user.vinculo != vinculo):
+                    # CPF e vínculo fazem parte das linhas do dataset (feed de alterações),
+                    # e o vínculo também é chave do resumo de atribuições
+                    async with atualizando_resumo(db, Atribuicao.user_id == user_id):
+                        if cpf:
+                            existing_user.cpf = cpf
+                        if vinculo:
+                            existing_user.vinculo = vinculo
+                        await db.flush()
                     updated = True
                 if matricula and existing_user.matricula != matricula:
                     existing_user.matricula = matricula
@@ -151,6 +157,9 @@ async def import_users():
         
         try:
             await db.commit()
+            if count_new or count_updated:
+                # Vínculo, CPF e novos usuários aparecem nos relatórios de todas as lotações
+                bump_data_version()
             print(f"Importação concluída com sucesso!")
             print(f"Novos usuários: {count_new}")
             print(f"Usuários atualizados: {count_updated}")
@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+
+from src.resources.database import DatabaseManager
+from src.controllers import resumo_controller
+
+# Carrega variáveis de ambiente imediatamente
+load_dotenv()
+
+APP_DB_URL = os.getenv("SQLITE_DSN", "sqlite+aiosqlite:///./app.db")
+
+
+async def recalcular(somente_verificar: bool) -> int:
+    """
+    Compara o resumo de atribuições com a contagem real, lista as divergências e,
+    a menos que `somente_verificar` seja informado, recalcula o resumo do zero.
+    Retorna o código de saída (1 quando há divergências e nada foi corrigido).
+    """
+    db_manager = DatabaseManager(APP_DB_URL)
+    try:
+        async with db_manager.async_session_maker() as db:
+            divergencias = await resumo_controller.verificar_resumo(db)
+            if not divergencias:
+                print("Resumo de atribuições consistente.")
+            else:
+                print(f"{len(divergencias)} divergência(s) encontrada(s):")
+                for d in divergencias:
+                    print(
+                        f"  lotacao={d['lotacao']!r} vinculo={d['vinculo']!r} ano_gd={d['ano_gd']!r} "
+                        f"status={d['status']}: esperado={d['esperado']} atual={d['atual']}"
+                    )
+
+            if somente_verificar:
+                return 1 if divergencias else 0
+
+            linhas = await resumo_controller.reconstruir_resumo(db)
+            print(f"Resumo recalculado: {linhas} linha(s).")
+            return 0
+    finally:
+        await db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica e recalcula o resumo de atribuições por lotação e status.")
+    parser.add_argument("--verificar", action="store_true", help="Apenas lista as divergências, sem recalcular.")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(recalcular(args.verificar)))
@@ -13,6 +13,7 @@ from sqlalchemy import select, delete
 
 from ..resources.database import get_app_db_session
 from ..models.refresh_token import RefreshToken
+from ..models.usuario import normalizar_user_id
 
 load_dotenv()
 
@@ -206,6 +207,8 @@ class AuthHandler:
         to_encode = data.copy()
         if 'username' in to_encode:
             to_encode['sub'] = to_encode['username']
+        if 'sub' in to_encode:
+            to_encode['sub'] = normalizar_user_id(to_encode['sub'])
         expire = datetime.utcnow() + (expires_delta or timedelta(hours=JWT_EXP_HOURS))
         to_encode.update({"exp": expire})
         if not JWT_SECRET:
@@ -238,6 +241,9 @@ class AuthHandler:
             if not JWT_SECRET:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="JWT_SECRET not configured")
             payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+            # Tokens emitidos antes da normalização dos IDs podem trazer maiúsculas
+            if payload.get("sub"):
+                payload["sub"] = normalizar_user_id(payload["sub"])
             return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
@@ -0,0 +1,148 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, func
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+import base64
+import json
+
+from ..models import Atribuicao, AlteracaoAtribuicao, Usuario
+from ..providers.implementations.relatorio_definicoes import DATASET_CAPACITACOES
+
+OPERACAO_UPSERT = "upsert"
+OPERACAO_DELETE = "delete"
+
+# Chave do advisory lock que serializa as escritas no feed no PostgreSQL (ver registrar_alteracoes)
+FEED_LOCK_ID = 7_310_416
+
+# Campos do usuário que aparecem no dataset: alterá-los muda as linhas de todas as
+# atribuições dele, e a alteração deve passar por `atualizando_resumo`
+CAMPOS_USUARIO = frozenset(
+    coluna.expressao.key for coluna in DATASET_CAPACITACOES.colunas
+    if getattr(coluna.expressao, "class_", None) is Usuario
+)
+
+
+async def estados(db: AsyncSession, *criterios) -> Dict[str, Dict[str, Any]]:
+    """
+    Linhas do dataset de capacitações das atribuições que atendem aos critérios, por ID.
+    Comparadas antes e depois de uma alteração para saber o que o feed deve publicar.
+    """
+    result = await db.execute(DATASET_CAPACITACOES.compilar().where(*criterios))
+    return {row["atribuicao_id"]: DATASET_CAPACITACOES.mapear(row) for row in result.mappings()}
+
+
+async def registrar_alteracoes(
+    db: AsyncSession,
+    antes: Dict[str, Dict[str, Any]],
+    depois: Dict[str, Dict[str, Any]]
+) -> int:
+    """
+    Registra no feed as atribuições que surgiram, mudaram ou deixaram de existir entre
+    `antes` e `depois` (ver `estados`), na transação corrente. Retorna quantas foram registradas.
+
+    O cursor do feed avança por `seq`, então os `seq` precisam ficar visíveis na ordem em
+    que foram gerados. No SQLite isso já vale (um único escritor). No PostgreSQL o valor da
+    sequência é obtido no INSERT, não no commit: uma transação com `seq` menor que ainda não
+    fez commit seria pulada por um leitor que já viu um `seq` maior. Por isso, lá, as escritas
+    no feed são serializadas por um advisory lock mantido até o fim da transação.
+    """
+    agora = datetime.utcnow()
+    alteracoes = [
+        {
+            "atribuicao_id": atribuicao_id,
+            "operacao": OPERACAO_UPSERT if atribuicao_id in depois else OPERACAO_DELETE,
+            "alterado_em": agora,
+        }
+        for atribuicao_id in sorted(antes.keys() | depois.keys())
+        if antes.get(atribuicao_id) != depois.get(atribuicao_id)
+    ]
+    if alteracoes:
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(select(func.pg_advisory_xact_lock(FEED_LOCK_ID)))
+        await db.execute(insert(AlteracaoAtribuicao), alteracoes)
+    return len(alteracoes)
+
+
+def _encode_cursor(seq: int, ultimo_id: str | None = None) -> str:
+    payload = json.dumps({"seq": seq, "id": ultimo_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, str | None]:
+    try:
+        posicao = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        seq, ultimo_id = posicao["seq"], posicao["id"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Cursor de alterações inválido.")
+    if not isinstance(seq, int) or not (ultimo_id is None or isinstance(ultimo_id, str)):
+        raise ValueError("Cursor de alterações inválido.")
+    return seq, ultimo_id
+
+
+async def _carga_completa(db: AsyncSession, seq: int, ultimo_id: str | None, limit: int) -> Dict[str, Any]:
+    """
+    Página da carga inicial: o dataset atual, por ID da atribuição. Ao final da carga,
+    o cursor passa a apontar para as alterações registradas desde o seu início.
+    """
+    stmt = DATASET_CAPACITACOES.compilar()
+    if ultimo_id is not None:
+        stmt = stmt.where(Atribuicao.id > ultimo_id)
+    rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+
+    data = [
+        {"operacao": OPERACAO_UPSERT, "atribuicao_id": row["atribuicao_id"], "dados": DATASET_CAPACITACOES.mapear(row)}
+        for row in rows[:limit]
+    ]
+    if len(rows) > limit:
+        return {"data": data, "next_cursor": _encode_cursor(seq, rows[limit - 1]["atribuicao_id"]), "has_more": True}
+    return {"data": data, "next_cursor": _encode_cursor(seq), "has_more": False}
+
+
+async def listar_alteracoes(db: AsyncSession, cursor: str | None = None, limit: int = 1000) -> Dict[str, Any]:
+    """
+    Feed incremental do dataset de capacitações.
+
+    Sem cursor, entrega primeiro a carga completa (em páginas). Depois, cada chamada
+    com o `next_cursor` anterior entrega só as atribuições criadas ou alteradas
+    ('upsert', com a linha atual em `dados`) e removidas ('delete') desde então, na
+    ordem em que ocorreram. `next_cursor` sempre vem preenchido e deve ser guardado
+    pelo consumidor; `has_more` indica que já existe outra página disponível.
+    Nenhuma alteração é pulada mesmo com escritas concorrentes (ver `registrar_alteracoes`).
+    Levanta ValueError se o cursor for inválido.
+    """
+    if cursor is None:
+        seq = (await db.execute(select(func.coalesce(func.max(AlteracaoAtribuicao.seq), 0)))).scalar_one()
+        return await _carga_completa(db, seq, None, limit)
+
+    seq, ultimo_id = _decode_cursor(cursor)
+    if ultimo_id is not None:
+        return await _carga_completa(db, seq, ultimo_id, limit)
+
+    stmt = (
+        select(AlteracaoAtribuicao.seq, AlteracaoAtribuicao.atribuicao_id)
+        .where(AlteracaoAtribuicao.seq > seq)
+        .order_by(AlteracaoAtribuicao.seq)
+        .limit(limit + 1)
+    )
+    alteracoes = (await db.execute(stmt)).all()
+    has_more = len(alteracoes) > limit
+    alteracoes = alteracoes[:limit]
+    if not alteracoes:
+        return {"data": [], "next_cursor": _encode_cursor(seq), "has_more": False}
+
+    # Cada atribuição aparece uma vez, na posição da sua última alteração da página,
+    # com o estado atual (o que também cobre alterações seguidas de remoção)
+    ultima_posicao: Dict[str, int] = {}
+    for seq_alteracao, atribuicao_id in alteracoes:
+        ultima_posicao[atribuicao_id] = seq_alteracao
+    atuais = await estados(db, Atribuicao.id.in_(list(ultima_posicao)))
+
+    data: List[Dict[str, Any]] = []
+    for atribuicao_id in sorted(ultima_posicao, key=ultima_posicao.get):
+        dados = atuais.get(atribuicao_id)
+        data.append({
+            "operacao": OPERACAO_UPSERT if dados is not None else OPERACAO_DELETE,
+            "atribuicao_id": atribuicao_id,
+            "dados": dados,
+        })
+    return {"data": data, "next_cursor": _encode_cursor(alteracoes[-1][0]), "has_more": has_more}
@@ -5,19 +5,34 @@ from sqlalchemy.orm import selectinload
 from uuid import uuid4
 from typing import List
 
-from ..models import Atribuicao, StatusAtribuicao, Usuario, Curso
+from ..models import Atribuicao, StatusAtribuicao, Usuario, Curso, normalizar_user_id
+from ..resources.report_cache import bump_data_version
+from .resumo_controller import atualizando_resumo
+
+async def _lotacao_da_atribuicao(db: AsyncSession, atribuicao_id: str) -> str | None:
+    """
+    Retorna a lotação do usuário dono da atribuição (escopo de invalidação dos relatórios).
+    """
+    stmt = (
+        select(Usuario.lotacao)
+        .join(Atribuicao, Atribuicao.user_id == Usuario.id)
+        .where(Atribuicao.id == atribuicao_id)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 async def criar_atribuicoes_para_lotacao(db: AsyncSession, curso_id: str, lotacao: str):
     """
     Cria registros de atribuição para todos os usuários de uma determinada lotação.
+    Usuários que já têm o curso atribuído são ignorados.
     """
-    # 1. Encontrar todos os usuários na lotação especificada
-    stmt_select_users = select(Usuario.id).where(Usuario.lotacao == lotacao)
+    # 1. Encontrar os usuários da lotação especificada que ainda não têm o curso
+    ja_atribuidos = select(Atribuicao.user_id).where(Atribuicao.curso_id == curso_id)
+    stmt_select_users = select(Usuario.id).where(Usuario.lotacao == lotacao, Usuario.id.not_in(ja_atribuidos))
     result = await db.execute(stmt_select_users)
     user_ids = result.scalars().all()
 
     if not user_ids:
-        return # Nenhum usuário encontrado para esta lotação
+        return # Nenhum usuário sem o curso nesta lotação
 
     # 2. Criar uma lista de novas atribuições
     novas_atribuicoes = [
@@ -32,8 +47,10 @@ async def criar_atribuicoes_para_lotacao(db: AsyncSession, curso_id: str, lotaca
     ]
 
     # 3. Adicionar todas as novas atribuições à sessão em lote
-    db.add_all(novas_atribuicoes)
+    async with atualizando_resumo(db, Atribuicao.curso_id == curso_id, Usuario.lotacao == lotacao):
+        db.add_all(novas_atribuicoes)
     await db.commit()
+    bump_data_version(lotacao)
 
 async def criar_atribuicoes_seletivas(db: AsyncSession, curso_id: str, user_ids: List[str], chefia_lotacao: str):
     """
@@ -52,7 +69,7 @@ async def criar_atribuicoes_seletivas(db: AsyncSession, curso_id: str, user_ids:
     # 2. Buscar os usuários solicitados e validar que pertencem à lotação da chefia
     stmt_users = (
         select(Usuario.id, Usuario.lotacao)
-        .where(Usuario.id.in_(user_ids))
+        .where(Usuario.id.in_([normalizar_user_id(user_id) for user_id in user_ids]))
     )
     users_result = await db.execute(stmt_users)
     users = users_result.mappings().all()
@@ -81,8 +98,10 @@ async def criar_atribuicoes_seletivas(db: AsyncSession, curso_id: str, user_ids:
         )
 
     if new_assignments:
-        db.add_all(new_assignments)
+        async with atualizando_resumo(db, Atribuicao.curso_id == curso_id, Usuario.lotacao == chefia_lotacao):
+            db.add_all(new_assignments)
         await db.commit()
+        bump_data_version(chefia_lotacao)
 
     return len(new_assignments)
 
@@ -105,8 +124,11 @@ async def atualizar_atribuicao_com_certificado(
             data_conclusao=datetime.utcnow()
         )
     )
-    await db.execute(stmt)
+    lotacao = await _lotacao_da_atribuicao(db, atribuicao_id)
+    async with atualizando_resumo(db, Atribuicao.id == atribuicao_id):
+        await db.execute(stmt)
     await db.commit()
+    bump_data_version(lotacao)
 
 async def validar_atribuicao(
     db: AsyncSession,
@@ -124,8 +146,11 @@ async def validar_atribuicao(
             data_validacao=datetime.utcnow()
         )
     )
-    await db.execute(stmt)
+    lotacao = await _lotacao_da_atribuicao(db, atribuicao_id)
+    async with atualizando_resumo(db, Atribuicao.id == atribuicao_id):
+        await db.execute(stmt)
     await db.commit()
+    bump_data_version(lotacao)
 
 async def listar_atribuicoes_por_usuario(db: AsyncSession, user_id: str) -> List[dict]:
     """
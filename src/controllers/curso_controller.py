@@ -8,6 +8,8 @@ import io
 
 from ..models import Curso, Atribuicao, Usuario, StatusAtribuicao
 from ..schemas.curso_schema import CursoCreate
+from ..resources.report_cache import bump_data_version
+from .resumo_controller import atualizando_resumo
 from datetime import datetime
 
 from sqlalchemy import func
@@ -70,18 +72,20 @@ async def criar_curso(db: AsyncSession, curso_data: CursoCreate) -> Curso:
         user_stmt = select(Usuario).where(Usuario.lotacao.ilike(curso_data.lotacao_id))
         users_to_assign = (await db.execute(user_stmt)).scalars().all()
         
-        # 2. Create an Atribuicao for each user
-        for user in users_to_assign:
-            new_atribuicao = Atribuicao(
-                id=str(uuid4()),
-                user_id=user.id,
-                curso_id=new_id,
-                status=StatusAtribuicao.PENDENTE,
-                atribuido_em=datetime.utcnow()
-            )
-            db.add(new_atribuicao)
+        # 2. Create an Atribuicao for each user (keeping the assignment summary in sync)
+        async with atualizando_resumo(db, Atribuicao.curso_id == new_id):
+            for user in users_to_assign:
+                new_atribuicao = Atribuicao(
+                    id=str(uuid4()),
+                    user_id=user.id,
+                    curso_id=new_id,
+                    status=StatusAtribuicao.PENDENTE,
+                    atribuido_em=datetime.utcnow()
+                )
+                db.add(new_atribuicao)
 
     await db.commit()
+    bump_data_version()
     await db.refresh(new_curso)
     return new_curso
 
@@ -96,43 +100,46 @@ async def atualizar_curso(db: AsyncSession, curso_id: str, curso_data: CursoCrea
     if not curso:
         return None
 
-    curso.atribuir_a_todos = curso_data.atribuir_a_todos
-    # Update course fields
-    for key, value in curso_data.dict(exclude_unset=True).items():
-        if hasattr(curso, key):
-            setattr(curso, key, value)
+    # Changes to ano_gd and to the course's assignments are reflected in the assignment summary
+    async with atualizando_resumo(db, Atribuicao.curso_id == curso_id):
+        curso.atribuir_a_todos = curso_data.atribuir_a_todos
+        # Update course fields
+        for key, value in curso_data.dict(exclude_unset=True).items():
+            if hasattr(curso, key):
+                setattr(curso, key, value)
 
-    # If the flag is set, assign the course to users in the lotacao who don't have it yet
-    if curso_data.atribuir_a_todos and curso_data.lotacao_id and curso_data.lotacao_id != '':
-        # 1. Find all users in the specified lotacao
-        user_stmt = select(Usuario).where(Usuario.lotacao.ilike(curso_data.lotacao_id))
-        users_in_lotacao = (await db.execute(user_stmt)).scalars().all()
+        # If the flag is set, assign the course to users in the lotacao who don't have it yet
+        if curso_data.atribuir_a_todos and curso_data.lotacao_id and curso_data.lotacao_id != '':
+            # 1. Find all users in the specified lotacao
+            user_stmt = select(Usuario).where(Usuario.lotacao.ilike(curso_data.lotacao_id))
+            users_in_lotacao = (await db.execute(user_stmt)).scalars().all()
         
-        # 2. Find all users who already have an assignment for this course
-        existing_atribuicoes_stmt = select(Atribuicao.user_id).where(Atribuicao.curso_id == curso_id)
-        existing_assigned_users = (await db.execute(existing_atribuicoes_stmt)).scalars().all()
-        existing_user_ids = set(existing_assigned_users)
+            # 2. Find all users who already have an assignment for this course
+            existing_atribuicoes_stmt = select(Atribuicao.user_id).where(Atribuicao.curso_id == curso_id)
+            existing_assigned_users = (await db.execute(existing_atribuicoes_stmt)).scalars().all()
+            existing_user_ids = set(existing_assigned_users)
+
+            # 3. Create an Atribuicao for each user who doesn't have one
+            for user in users_in_lotacao:
+                if user.id not in existing_user_ids:
+                    new_atribuicao = Atribuicao(
+                        id=str(uuid4()),
+                        user_id=user.id,
+                        curso_id=curso_id,
+                        status=StatusAtribuicao.PENDENTE,
+                        atribuido_em=datetime.utcnow()
+                    )
+                    db.add(new_atribuicao)
+        elif not curso_data.atribuir_a_todos and curso_data.lotacao_id and curso_data.lotacao_id != '': # Only delete if lotacao_id is present
+            # If the flag is unchecked, remove all 'Pendente' assignments for this course
+            stmt_delete = delete(Atribuicao).where(
+                Atribuicao.curso_id == curso_id,
+                Atribuicao.status == StatusAtribuicao.PENDENTE
+            )
+            await db.execute(stmt_delete)
 
-        # 3. Create an Atribuicao for each user who doesn't have one
-        for user in users_in_lotacao:
-            if user.id not in existing_user_ids:
-                new_atribuicao = Atribuicao(
-                    id=str(uuid4()),
-                    user_id=user.id,
-                    curso_id=curso_id,
-                    status=StatusAtribuicao.PENDENTE,
-                    atribuido_em=datetime.utcnow()
-                )
-                db.add(new_atribuicao)
-    elif not curso_data.atribuir_a_todos and curso_data.lotacao_id and curso_data.lotacao_id != '': # Only delete if lotacao_id is present
-        # If the flag is unchecked, remove all 'Pendente' assignments for this course
-        stmt_delete = delete(Atribuicao).where(
-            Atribuicao.curso_id == curso_id,
-            Atribuicao.status == StatusAtribuicao.PENDENTE
-        )
-        await db.execute(stmt_delete)
-        
     await db.commit()
+    bump_data_version()
     await db.refresh(curso)
     return curso
 
@@ -140,8 +147,9 @@ async def deletar_curso(db: AsyncSession, curso_id: str) -> bool:
     """
     Deleta um curso e suas atribuições, inscrições e certificados associados.
     """
-    # Deletar atribuições relacionadas
-    await db.execute(delete(Atribuicao).where(Atribuicao.curso_id == curso_id))
+    # Deletar atribuições relacionadas (descontando-as do resumo de atribuições)
+    async with atualizando_resumo(db, Atribuicao.curso_id == curso_id):
+        await db.execute(delete(Atribuicao).where(Atribuicao.curso_id == curso_id))
     
     # Deletar inscrições relacionadas
     from ..models import Inscricao # Import local para evitar circular dependency
@@ -157,6 +165,7 @@ async def deletar_curso(db: AsyncSession, curso_id: str) -> bool:
     if curso:
         await db.delete(curso)
         await db.commit()
+        bump_data_version()
         return True
     return False
 
@@ -265,13 +274,17 @@ async def importar_cursos_csv(file_bytes: bytes, db: AsyncSession) -> Dict[str,
         
         try:
             if curso_existente:
-                atualizou = False
-                for k, v in curso_kwargs.items():
-                    # Ignorar id na atualização
-                    if k != 'id' and getattr(curso_existente, k) != v:
-                        setattr(curso_existente, k, v)
-                        atualizou = True
-                if atualizou:
+                # Ignorar id na atualização
+                alterados = {
+                    k: v for k, v in curso_kwargs.items()
+                    if k != 'id' and getattr(curso_existente, k) != v
+                }
+                if alterados:
+                    # Título, tema e carga horária fazem parte das linhas das atribuições
+                    # do curso no dataset (feed de alterações)
+                    async with atualizando_resumo(db, Atribuicao.curso_id == id_curso):
+                        for k, v in alterados.items():
+                            setattr(curso_existente, k, v)
                     atualizados += 1
             else:
                 novo_curso = Curso(**curso_kwargs)
@@ -281,6 +294,8 @@ async def importar_cursos_csv(file_bytes: bytes, db: AsyncSession) -> Dict[str,
             erros.append(f"Linha {row_num}: Erro ao processar curso {id_curso}: {str(e)}")
             
     await db.commit()
+    if novos or atualizados:
+        bump_data_version()
     
     return {
         "novos": novos,
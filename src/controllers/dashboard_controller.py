@@ -1,63 +1,76 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case
 from typing import Dict, Any
 import logging
 
-from ..models import Curso, Inscricao, Certificado, Usuario, Atribuicao, StatusAtribuicao
+from ..models import Curso, Inscricao, Certificado, Usuario, Atribuicao, StatusAtribuicao, normalizar_user_id
+from ..resources.report_cache import report_cache
 
 logger = logging.getLogger(__name__)
 
-async def get_dashboard_stats(db: AsyncSession, user_id: str | None = None) -> Dict[str, Any]:
+# Status em que o certificado do usuário conta como validado
+STATUS_VALIDADOS = (StatusAtribuicao.VALIDADO, StatusAtribuicao.CONCLUIDO)
+
+async def _contagens_globais(db: AsyncSession) -> Dict[str, int]:
     """
-    Calculates and returns key statistics for the dashboard (both global and personal).
+    Totais gerais (iguais para todos os usuários) em uma única query.
     """
-    try:
-        # Total de Cursos
-        total_cursos_stmt = select(func.count(Curso.id))
-        total_cursos = (await db.execute(total_cursos_stmt)).scalar_one()
-
-        # Total de Inscrições
-        total_inscricoes_stmt = select(func.count(Inscricao.id))
-        total_inscricoes = (await db.execute(total_inscricoes_stmt)).scalar_one()
+    stmt = select(
+        select(func.count(Curso.id)).scalar_subquery(),
+        select(func.count(Inscricao.id)).scalar_subquery(),
+        select(func.count(Certificado.id)).where(Certificado.validado == True).scalar_subquery(),
+        select(func.count(Usuario.id)).scalar_subquery(),
+    )
+    row = (await db.execute(stmt)).one()
+    return {
+        "total_cursos": row[0],
+        "total_inscricoes": row[1],
+        "total_certificados_validados": row[2],
+        "total_usuarios": row[3],
+    }
 
-        # Total de Certificados Validados
-        total_certificados_stmt = select(func.count(Certificado.id)).where(Certificado.validado == True)
-        total_certificados = (await db.execute(total_certificados_stmt)).scalar_one()
 
-        # Total de Usuários
-        total_usuarios_stmt = select(func.count(Usuario.id))
-        total_usuarios = (await db.execute(total_usuarios_stmt)).scalar_one()
+async def _contagens_pessoais(db: AsyncSession, user_id: str) -> Dict[str, int]:
+    """
+    Contagens do usuário em uma única query agregada sobre as suas atribuições:
+    cursos (inscrições ∪ atribuições), certificados enviados e validados.
+    """
+    user_id = normalizar_user_id(user_id)
+    inscricoes_cursos = select(Inscricao.curso_id).where(Inscricao.user_id == user_id)
+    atribuicoes_cursos = select(Atribuicao.curso_id).where(Atribuicao.user_id == user_id)
+    meus_cursos = select(func.count()).select_from(inscricoes_cursos.union(atribuicoes_cursos).subquery())
 
-        minhas_inscricoes = 0
-        meus_certificados_enviados = 0
-        meus_certificados_validados = 0
+    stmt = select(
+        meus_cursos.scalar_subquery(),
+        func.count(Atribuicao.certificado_id),
+        func.coalesce(func.sum(case((Atribuicao.status.in_(STATUS_VALIDADOS), 1), else_=0)), 0),
+    ).where(Atribuicao.user_id == user_id)
+    row = (await db.execute(stmt)).one()
+    return {
+        "minhas_inscricoes": row[0],
+        "meus_certificados_enviados": row[1],
+        "meus_certificados_validados": row[2],
+    }
 
-        if user_id:
-            user_id_lower = user_id.lower()
-            inscricoes_cursos = select(Inscricao.curso_id).where(func.lower(Inscricao.user_id) == user_id_lower)
-            atribuicoes_cursos = select(Atribuicao.curso_id).where(func.lower(Atribuicao.user_id) == user_id_lower)
-            union_stmt = inscricoes_cursos.union(atribuicoes_cursos)
-            minhas_inscricoes = (await db.execute(select(func.count()).select_from(union_stmt.subquery()))).scalar_one()
 
-            meus_certificados_enviados_stmt = select(func.count(Atribuicao.id)).where(
-                (func.lower(Atribuicao.user_id) == user_id.lower()) & (Atribuicao.certificado_id.isnot(None))
-            )
-            meus_certificados_enviados = (await db.execute(meus_certificados_enviados_stmt)).scalar_one()
-
-            meus_certificados_validados_stmt = select(func.count(Atribuicao.id)).where(
-                (func.lower(Atribuicao.user_id) == user_id.lower()) & (Atribuicao.status.in_([StatusAtribuicao.VALIDADO, StatusAtribuicao.CONCLUIDO]))
-            )
-            meus_certificados_validados = (await db.execute(meus_certificados_validados_stmt)).scalar_one()
+async def get_dashboard_stats(db: AsyncSession, user_id: str | None = None) -> Dict[str, Any]:
+    """
+    Calculates and returns key statistics for the dashboard (both global and personal).
+    Os totais gerais ficam em cache até que os dados mudem; as contagens pessoais
+    custam uma query por chamada.
+    """
+    try:
+        globais = await report_cache.get_or_compute("dashboard_global", {}, lambda: _contagens_globais(db))
 
-        return {
-            "total_cursos": total_cursos,
-            "total_inscricoes": total_inscricoes,
-            "total_certificados_validados": total_certificados,
-            "total_usuarios": total_usuarios,
-            "minhas_inscricoes": minhas_inscricoes,
-            "meus_certificados_enviados": meus_certificados_enviados,
-            "meus_certificados_validados": meus_certificados_validados,
+        pessoais = {
+            "minhas_inscricoes": 0,
+            "meus_certificados_enviados": 0,
+            "meus_certificados_validados": 0,
         }
+        if user_id:
+            pessoais = await _contagens_pessoais(db, user_id)
+
+        return {**globais, **pessoais}
     except Exception as e:
         logger.error(f"Error calculating dashboard stats: {e}")
         # Return zeroed stats in case of an error to prevent frontend crashes
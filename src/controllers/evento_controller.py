@@ -0,0 +1,69 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+from ..models import Usuario, PerfilUsuario, normalizar_user_id
+from ..resources.live_events import agendar_contadores
+
+ESCOPO_GERAL = "geral"
+
+
+def _escopos_da_linha(row: Dict[str, Any]) -> List[str]:
+    escopos = [ESCOPO_GERAL, f"usuario:{row['id']}"]
+    if row["setor"]:
+        escopos.append(f"lotacao:{row['setor']}")
+    return escopos
+
+
+def deltas_por_escopo(
+    antes: Dict[str, Dict[str, Any]],
+    depois: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, int]]:
+    """
+    Variação do número de atribuições por status em cada escopo (geral, lotação e
+    usuário) entre dois estados do dataset (ver `alteracao_controller.estados`).
+    Escopos sem variação não aparecem.
+    """
+    deltas: Dict[str, Counter] = defaultdict(Counter)
+    for linhas, sinal in ((antes, -1), (depois, 1)):
+        for row in linhas.values():
+            if row["status"] is None:
+                continue
+            for escopo in _escopos_da_linha(row):
+                deltas[escopo][row["status"]] += sinal
+    return {
+        escopo: {status: n for status, n in contagem.items() if n}
+        for escopo, contagem in deltas.items()
+        if any(contagem.values())
+    }
+
+
+def registrar_contadores(
+    db: AsyncSession,
+    antes: Dict[str, Dict[str, Any]],
+    depois: Dict[str, Dict[str, Any]]
+) -> None:
+    """
+    Agenda o envio das variações de contadores aos clientes conectados, após o commit.
+    """
+    for escopo, deltas in deltas_por_escopo(antes, depois).items():
+        agendar_contadores(db, escopo, deltas)
+
+
+async def escopos_do_usuario(db: AsyncSession, current_user: dict) -> List[str]:
+    """
+    Escopos de eventos que o usuário pode acompanhar: sempre os próprios contadores;
+    Chefia e UDP também os da sua lotação; UDP também os gerais.
+    """
+    user_id = current_user.get("sub")
+    escopos = [f"usuario:{user_id}"]
+    perfil = current_user.get("perfil")
+    if perfil in (PerfilUsuario.CHEFIA.value, PerfilUsuario.UDP.value):
+        stmt = select(Usuario.lotacao).where(Usuario.id == normalizar_user_id(user_id))
+        lotacao = (await db.execute(stmt)).scalar_one_or_none()
+        if lotacao:
+            escopos.append(f"lotacao:{lotacao}")
+    if perfil == PerfilUsuario.UDP.value:
+        escopos.append(ESCOPO_GERAL)
+    return escopos
@@ -5,8 +5,16 @@ from uuid import uuid4
 from typing import List, Tuple
 
 from ..models import Inscricao, Curso, Usuario, Atribuicao, StatusAtribuicao, Certificado
+from ..resources.report_cache import bump_data_version
+from .resumo_controller import atualizando_resumo
 from datetime import datetime
 
+async def _lotacao_do_usuario(db: AsyncSession, usuario_id: str) -> str | None:
+    """
+    Retorna a lotação do usuário (escopo de invalidação dos relatórios).
+    """
+    return (await db.execute(select(Usuario.lotacao).where(Usuario.id == usuario_id))).scalar_one_or_none()
+
 async def verificar_inscricao_existente(db: AsyncSession, usuario_id: str, curso_id: str) -> Inscricao | None:
     """
     Verifica se já existe uma inscrição para um usuário em um curso específico.
@@ -21,8 +29,9 @@ async def verificar_inscricao_existente(db: AsyncSession, usuario_id: str, curso
 async def inscrever_usuario_em_curso(db: AsyncSession, usuario_id: str, curso_id: str) -> Tuple[Inscricao, Atribuicao]:
     """
     Inscreve um usuário em um curso.
-    Se já existir uma atribuição 'Pendente' para este curso, atualiza seu status para 'Realizado'.
-    Caso contrário, cria uma nova atribuição com status 'Realizado'.
+    Se já existir uma atribuição 'Pendente' para este curso, atualiza seu status para 'Em Andamento'.
+    Se não existir atribuição, cria uma nova com status 'Em Andamento'; uma atribuição
+    já iniciada é mantida como está (há no máximo uma por usuário e curso).
     """
     # 1. Cria a inscrição
     new_inscricao = Inscricao(
@@ -42,10 +51,13 @@ async def inscrever_usuario_em_curso(db: AsyncSession, usuario_id: str, curso_id
 
     if existing_atribuicao and existing_atribuicao.status == StatusAtribuicao.PENDENTE:
         # Atualiza a atribuição existente
-        existing_atribuicao.status = StatusAtribuicao.EM_ANDAMENTO
+        async with atualizando_resumo(db, Atribuicao.id == existing_atribuicao.id):
+            existing_atribuicao.status = StatusAtribuicao.EM_ANDAMENTO
+        atribuicao_a_retornar = existing_atribuicao
+    elif existing_atribuicao:
         atribuicao_a_retornar = existing_atribuicao
     else:
-        # Cria uma nova atribuição se não houver uma pendente
+        # Cria uma nova atribuição se não houver nenhuma
         new_atribuicao = Atribuicao(
             id=str(uuid4()),
             user_id=usuario_id,
@@ -53,10 +65,13 @@ async def inscrever_usuario_em_curso(db: AsyncSession, usuario_id: str, curso_id
             status=StatusAtribuicao.EM_ANDAMENTO, # Status 'Em Andamento' pois a inscrição está sendo feita
             criado_por_usuario=True # Marcado como criado por usuário
         )
-        db.add(new_atribuicao)
+        async with atualizando_resumo(db, Atribuicao.id == new_atribuicao.id):
+            db.add(new_atribuicao)
         atribuicao_a_retornar = new_atribuicao
 
+    lotacao = await _lotacao_do_usuario(db, usuario_id)
     await db.commit()
+    bump_data_version(lotacao)
     
     # Eagerly load the relationship to avoid MissingGreenlet error
     result_inscricao = await db.execute(
@@ -93,26 +108,29 @@ async def desinscrever_usuario_de_curso(db: AsyncSession, inscricao_id: str) ->
         if atribuicao_a_reverter.certificado_id or atribuicao_a_reverter.status != StatusAtribuicao.EM_ANDAMENTO:
             raise ValueError("Não é possível cancelar uma inscrição que já possui certificado enviado.")
 
-        if atribuicao_a_reverter.criado_por_usuario:
-            # Se a atribuição foi criada pelo usuário, deleta
-            await db.delete(atribuicao_a_reverter)
-        else:
-            # Se a atribuição foi criada por um gestor, verifica o status do curso
-            # para ver se a atribuição ainda é válida
-            curso_associado = await db.execute(select(Curso).where(Curso.id == atribuicao_a_reverter.curso_id))
-            curso_associado = curso_associado.scalars().first()
-
-            if curso_associado and not curso_associado.atribuir_a_todos:
-                # Se o curso não está mais atribuído a todos, deleta a atribuição
+        async with atualizando_resumo(db, Atribuicao.id == atribuicao_a_reverter.id):
+            if atribuicao_a_reverter.criado_por_usuario:
+                # Se a atribuição foi criada pelo usuário, deleta
                 await db.delete(atribuicao_a_reverter)
             else:
-                # Caso contrário, reverte o status para Pendente
-                atribuicao_a_reverter.status = StatusAtribuicao.PENDENTE
-                db.add(atribuicao_a_reverter)
+                # Se a atribuição foi criada por um gestor, verifica o status do curso
+                # para ver se a atribuição ainda é válida
+                curso_associado = await db.execute(select(Curso).where(Curso.id == atribuicao_a_reverter.curso_id))
+                curso_associado = curso_associado.scalars().first()
+
+                if curso_associado and not curso_associado.atribuir_a_todos:
+                    # Se o curso não está mais atribuído a todos, deleta a atribuição
+                    await db.delete(atribuicao_a_reverter)
+                else:
+                    # Caso contrário, reverte o status para Pendente
+                    atribuicao_a_reverter.status = StatusAtribuicao.PENDENTE
+                    db.add(atribuicao_a_reverter)
 
     # Remover a inscrição
+    lotacao = await _lotacao_do_usuario(db, inscricao.user_id)
     await db.delete(inscricao)
     await db.commit()
+    bump_data_version(lotacao)
     return True
 
 async def listar_inscricoes_por_usuario(db: AsyncSession, usuario_id: str) -> List[dict]:
@@ -1,127 +1,177 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
-from typing import List, Dict, Any
-from io import BytesIO
+from sqlalchemy import select, func, desc, literal, union_all, cast, Integer
+from typing import List, Dict, Any, AsyncIterator, IO
+from datetime import datetime, timedelta
+from tempfile import SpooledTemporaryFile
+import os
+import shutil
 
 from ..models import Curso, Inscricao, Atribuicao, Usuario, StatusAtribuicao, PerfilUsuario, Certificado
 from ..providers.implementations.relatorio_provider import RelatorioProvider
 from ..providers.interfaces.relatorio_provider_interface import RelatorioProviderInterface
-from ..helpers import excel_helper, pdf_helper
-
-async def gerar_relatorio_capacitacoes(
+from ..providers.implementations.relatorio_definicoes import CONSOLIDADO, RELATORIOS
+from ..helpers.report_engine import DefinicaoRelatorio
+from ..helpers import excel_helper, pdf_helper, arrow_helper
+from ..resources.render_pool import render_pool
+from ..resources.report_cache import report_cache
+from . import resumo_controller
+
+# Quantidade de linhas lidas do banco por vez nas exportações em fluxo
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Tamanho máximo de página dos relatórios paginados por cursor
+CONSOLIDADO_MAX_PAGE_SIZE = int(os.getenv("CONSOLIDADO_MAX_PAGE_SIZE", "500"))
+
+async def exportar_dataset_capacitacoes(
     provider: RelatorioProviderInterface,
+    formato: str,
     ano: str | None = None,
-    vinculo: str | None = None
-) -> List[Dict[str, Any]]:
+    vinculo: str | None = None,
+    sink: IO[bytes] | None = None
+) -> IO[bytes]:
     """
-    Gera o relatório completo de capacitações EAD, consolidando dados de usuários, cursos e certificados.
-    Suporta filtros opcionais por ano e vínculo.
-    """
-    return await provider.listar_dados_capacitacoes(ano=ano, vinculo=vinculo)
-
-async def exportar_relatorio_excel(
-    provider: RelatorioProviderInterface,
-    ano: str | None = None,
-    vinculo: str | None = None
-) -> BytesIO:
+    Gera o dataset analítico das capacitações em formato colunar ('parquet' ou 'arrow'),
+    lendo o banco em lotes e gravando um record batch por lote.
+    Sem `sink`, grava em um arquivo temporário (memória/disco) posicionado no início.
     """
-    Gera o arquivo Excel do relatório de capacitações.
-    Suporta filtros opcionais por ano e vínculo.
+    output = sink if sink is not None else SpooledTemporaryFile(max_size=excel_helper.EXPORT_SPOOL_MAX_BYTES)
+    lotes = provider.stream_lotes_dataset_capacitacoes(ano=ano, vinculo=vinculo, batch_size=EXPORT_BATCH_SIZE)
+    try:
+        await arrow_helper.write_dataset(lotes, output, formato)
+    except BaseException:
+        if sink is None:
+            output.close()
+        raise
+    if sink is None:
+        output.seek(0)
+    return output
+
+# Janelas de tempo (dias) aceitas no ranking de cursos populares
+JANELAS_CURSOS_POPULARES = (30, 90, 365)
+
+def _build_cursos_populares_query(limit: int, dias: int | None, por_lotacao: bool):
     """
-    data = await provider.listar_dados_capacitacoes(ano=ano, vinculo=vinculo)
-    return await excel_helper.export_to_excel(data)
+    Monta o ranking de cursos populares em uma única query.
 
-async def export_consolidado_to_pdf(data: List[Dict[str, Any]], filename: str = "relatorio_consolidado.pdf") -> BytesIO:
-    """
-    Gera PDF do relatório consolidado.
+    Inscrições e atribuições são contadas em subqueries separadas, já agregadas por
+    curso (e lotação), e só então combinadas via UNION ALL. Juntar as duas tabelas
+    diretamente ao curso multiplicaria as linhas (inscrições × atribuições) e
+    inflaria as contagens.
     """
-    return await pdf_helper.export_to_pdf(data, filename=filename)
+    inicio = datetime.utcnow() - timedelta(days=dias) if dias else None
+    data_atribuicao = func.coalesce(Atribuicao.data_atribuicao, Atribuicao.atribuido_em)
 
+    inscricoes = select(
+        Inscricao.curso_id.label("curso_id"),
+        func.count(Inscricao.id).label("inscricoes"),
+        literal(0).label("atribuicoes"),
+    )
+    atribuicoes = select(
+        Atribuicao.curso_id.label("curso_id"),
+        literal(0).label("inscricoes"),
+        func.count(Atribuicao.id).label("atribuicoes"),
+    )
+    if inicio:
+        inscricoes = inscricoes.where(Inscricao.inscrito_em >= inicio)
+        atribuicoes = atribuicoes.where(data_atribuicao >= inicio)
+    if por_lotacao:
+        inscricoes = inscricoes.join(Usuario, Inscricao.user_id == Usuario.id).add_columns(Usuario.lotacao.label("lotacao"))
+        atribuicoes = atribuicoes.join(Usuario, Atribuicao.user_id == Usuario.id).add_columns(Usuario.lotacao.label("lotacao"))
+        inscricoes = inscricoes.group_by(Inscricao.curso_id, Usuario.lotacao)
+        atribuicoes = atribuicoes.group_by(Atribuicao.curso_id, Usuario.lotacao)
+    else:
+        inscricoes = inscricoes.group_by(Inscricao.curso_id)
+        atribuicoes = atribuicoes.group_by(Atribuicao.curso_id)
+
+    parciais = union_all(inscricoes, atribuicoes).subquery()
+    chave = [parciais.c.curso_id] + ([parciais.c.lotacao] if por_lotacao else [])
+    # No PostgreSQL, SUM de COUNT (bigint) devolve numeric; o cast mantém o total inteiro
+    total_inscricoes = cast(func.sum(parciais.c.inscricoes), Integer)
+    total_atribuicoes = cast(func.sum(parciais.c.atribuicoes), Integer)
+    ordem = [total_inscricoes.desc(), total_atribuicoes.desc(), Curso.titulo]
+
+    agregado = (
+        select(
+            *chave,
+            Curso.titulo,
+            total_inscricoes.label("total_inscricoes"),
+            total_atribuicoes.label("total_atribuicoes"),
+        )
+        .join(Curso, Curso.id == parciais.c.curso_id)
+        .group_by(*chave, Curso.titulo)
+    )
 
-async def exportar_relatorio_pdf(
-    provider: RelatorioProviderInterface,
-    ano: str | None = None,
-    vinculo: str | None = None
-) -> BytesIO:
-    """
-    Gera o arquivo PDF do relatório de capacitações.
-    Suporta filtros opcionais por ano e vínculo.
-    """
-    data = await provider.listar_dados_capacitacoes(ano=ano, vinculo=vinculo)
-    return await pdf_helper.export_to_pdf(data, filename="relatorio_capacitacoes.pdf")
+    if not por_lotacao:
+        return agregado.order_by(*ordem).limit(limit)
+
+    # Top N por lotação, na mesma query, com uma função de janela
+    ranking = agregado.add_columns(
+        func.row_number().over(partition_by=parciais.c.lotacao, order_by=ordem).label("posicao")
+    ).subquery()
+    return (
+        select(ranking)
+        .where(ranking.c.posicao <= limit)
+        .order_by(ranking.c.lotacao, ranking.c.posicao)
+    )
 
-async def listar_cursos_mais_inscritos_udp(db: AsyncSession, limit: int = 10) -> List[Dict[str, Any]]:
+async def listar_cursos_mais_inscritos_udp(
+    db: AsyncSession,
+    limit: int = 10,
+    dias: int | None = None,
+    por_lotacao: bool = False
+) -> List[Dict[str, Any]]:
     """
     Lista os cursos mais inscritos/atribuídos para a UDP.
+    `dias` restringe a contagem às inscrições/atribuições dos últimos 30, 90 ou 365 dias;
+    `por_lotacao` devolve o ranking (top `limit`) de cada lotação.
+    Levanta ValueError para janelas não suportadas.
     """
-    stmt = (
-        select(
-            Curso.titulo,
-            func.count(Inscricao.id).label("total_inscricoes"),
-            func.count(Atribuicao.id).label("total_atribuicoes")
-        )
-        .outerjoin(Inscricao, Curso.id == Inscricao.curso_id)
-        .outerjoin(Atribuicao, Curso.id == Atribuicao.curso_id)
-        .group_by(Curso.id, Curso.titulo)
-        .order_by(desc("total_inscricoes"), desc("total_atribuicoes"))
-        .limit(limit)
+    if dias is not None and dias not in JANELAS_CURSOS_POPULARES:
+        raise ValueError(f"Janela inválida: use {', '.join(map(str, JANELAS_CURSOS_POPULARES))} dias.")
+
+    async def consultar() -> List[Dict[str, Any]]:
+        result = await db.execute(_build_cursos_populares_query(limit, dias, por_lotacao))
+        cursos = []
+        for r in result.mappings().all():
+            item = {
+                "curso_id": r["curso_id"],
+                "titulo": r["titulo"],
+                "total_inscricoes": r["total_inscricoes"],
+                "total_atribuicoes": r["total_atribuicoes"],
+            }
+            if por_lotacao:
+                item["lotacao"] = r["lotacao"]
+                item["posicao"] = r["posicao"]
+            cursos.append(item)
+        return cursos
+
+    return await report_cache.get_or_compute(
+        "cursos_populares",
+        {"limit": limit, "dias": dias, "por_lotacao": por_lotacao},
+        consultar,
     )
-    result = await db.execute(stmt)
-    return [
-        {
-            "titulo": r.titulo,
-            "total_inscricoes": r.total_inscricoes,
-            "total_atribuicoes": r.total_atribuicoes,
-        }
-        for r in result.all()
-    ]
 
 # Placeholder para outras funções de relatório
 async def get_relatorio_status_geral_udp(db: AsyncSession) -> List[Dict[str, Any]]:
     """
     Gera um relatório com a contagem de atribuições para cada status.
+    Lido do resumo de atribuições (uma linha por lotação/vínculo/ano/status).
     """
-    stmt = (
-        select(
-            Atribuicao.status,
-            func.count(Atribuicao.id).label("total")
-        )
-        .group_by(Atribuicao.status)
-    )
-    result = await db.execute(stmt)
-    
+    contagens = await resumo_controller.contagens_por_status(db)
+
     # Inicializa um dicionário com todos os status para garantir que todos apareçam no resultado
-    status_counts = {status.value: 0 for status in StatusAtribuicao}
-    
-    for row in result.all():
-        status_counts[row.status] = row.total
-        
+    status_counts = {status.value: contagens.get(status, 0) for status in StatusAtribuicao}
+
     # Converte o dicionário para o formato de lista de dicionários esperado
     return [{"name": status, "value": count} for status, count in status_counts.items()]
 
 async def get_relatorio_conformidade_lotacao_udp(db: AsyncSession) -> List[Dict[str, Any]]:
     """
     Gera um relatório de conformidade por lotação, contando as atribuições por status.
+    Lido do resumo de atribuições, sem percorrer a tabela de atribuições.
     """
-    stmt = (
-        select(
-            Usuario.lotacao,
-            Atribuicao.status,
-            func.count(Atribuicao.id).label("total")
-        )
-        .join(Usuario, Atribuicao.user_id == Usuario.id)
-        .group_by(Usuario.lotacao, Atribuicao.status)
-        .order_by(Usuario.lotacao, Atribuicao.status)
-    )
-    result = await db.execute(stmt)
-    
     conformidade_por_lotacao: Dict[str, Dict[str, Any]] = {}
-    
-    for row in result.all():
-        lotacao = row.lotacao
-        status = row.status
-        total = row.total
-        
+
+    for lotacao, status, total in await resumo_controller.contagens_por_lotacao(db):
         if lotacao not in conformidade_por_lotacao:
             conformidade_por_lotacao[lotacao] = {
                 "lotacao": lotacao,
@@ -132,10 +182,10 @@ async def get_relatorio_conformidade_lotacao_udp(db: AsyncSession) -> List[Dict[
                 "Recusado": 0,
                 "Total Atribuições": 0,
             }
-        
-        conformidade_por_lotacao[lotacao][status] = total
+
+        conformidade_por_lotacao[lotacao][status.value] = total
         conformidade_por_lotacao[lotacao]["Total Atribuições"] += total
-            
+
     return list(conformidade_por_lotacao.values())
 
 async def get_relatorio_certificados_pendentes_udp(db: AsyncSession) -> List[Dict[str, Any]]:
@@ -159,8 +209,14 @@ async def get_relatorio_status_lotacao_chefia(
     """
     Relatório para a Chefia: Status de cursos da minha lotação.
     Suporta filtros opcionais por ano e vínculo.
+    O resultado fica em cache até que os dados da lotação mudem.
     """
-    return await provider.get_status_lotacao(lotacao, ano=ano, vinculo=vinculo)
+    return await report_cache.get_or_compute(
+        "status_lotacao",
+        {"lotacao": lotacao, "ano": ano, "vinculo": vinculo},
+        lambda: provider.get_status_lotacao(lotacao, ano=ano, vinculo=vinculo),
+        lotacao=lotacao,
+    )
 
 async def get_relatorio_progresso_individual_chefia(
     provider: RelatorioProviderInterface,
@@ -171,8 +227,14 @@ async def get_relatorio_progresso_individual_chefia(
     """
     Relatório para a Chefia: Progresso individual de subordinados.
     Suporta filtros opcionais por ano e vínculo.
+    O resultado fica em cache até que os dados da lotação mudem.
     """
-    return await provider.get_progresso_equipe(lotacao, ano=ano, vinculo=vinculo)
+    return await report_cache.get_or_compute(
+        "progresso_equipe",
+        {"lotacao": lotacao, "ano": ano, "vinculo": vinculo},
+        lambda: provider.get_progresso_equipe(lotacao, ano=ano, vinculo=vinculo),
+        lotacao=lotacao,
+    )
 
 async def get_relatorio_certificados_pendentes_chefia(db: AsyncSession, lotacao: str) -> List[Dict[str, Any]]:
     """
@@ -280,6 +342,112 @@ async def can_access_user_details(
     # UDP (perfil == "UDP") pode acessar qualquer usuário - sem restrição extra
 
 
+def _escopo(definicao: DefinicaoRelatorio, filtros: Dict[str, Any]) -> str | None:
+    """
+    Lotação à qual o resultado está restrito (define quando o cache é invalidado).
+    """
+    return filtros.get(definicao.escopo) if definicao.escopo else None
+
+
+async def listar_relatorio(db: AsyncSession, definicao: DefinicaoRelatorio, **filtros) -> List[Dict[str, Any]]:
+    """
+    Linhas do relatório definido, com os filtros aplicados.
+    O resultado fica em cache até que os dados do escopo consultado mudem; as saídas
+    montadas a partir da lista completa (JSON, PDF) reaproveitam a mesma consulta.
+    Levanta ValueError para filtros que o relatório não possui.
+    """
+    filtros = definicao.normalizar_filtros(**filtros)
+    return await report_cache.get_or_compute(
+        definicao.nome,
+        filtros,
+        lambda: definicao.listar(db, **filtros),
+        lotacao=_escopo(definicao, filtros),
+    )
+
+
+def stream_relatorio(
+    db: AsyncSession,
+    definicao: DefinicaoRelatorio,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    **filtros
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Versão em fluxo do relatório definido: lê o resultado do banco em lotes de
+    `batch_size` linhas e entrega uma linha por vez, sem montar a lista completa.
+    Os filtros são validados antes do início do fluxo (ValueError).
+    """
+    filtros = definicao.normalizar_filtros(**filtros)
+    return definicao.stream(db, batch_size, **filtros)
+
+
+async def contar_relatorio(db: AsyncSession, definicao: DefinicaoRelatorio, **filtros) -> int:
+    """
+    Total de linhas do relatório definido para os filtros informados (em cache).
+    """
+    filtros = definicao.normalizar_filtros(**filtros)
+    return await report_cache.get_or_compute(
+        f"{definicao.nome}_total",
+        filtros,
+        lambda: definicao.contar(db, **filtros),
+        lotacao=_escopo(definicao, filtros),
+    )
+
+
+async def paginar_relatorio(
+    db: AsyncSession,
+    definicao: DefinicaoRelatorio,
+    limit: int = 100,
+    cursor: str | None = None,
+    incluir_total: bool = False,
+    **filtros
+) -> Dict[str, Any]:
+    """
+    Página do relatório definido com paginação por cursor (keyset) sobre a ordenação
+    da definição: cada página parte da posição da anterior, sem OFFSET.
+    Levanta ValueError se o cursor ou os filtros forem inválidos.
+    """
+    limit = max(1, min(limit, CONSOLIDADO_MAX_PAGE_SIZE))
+    data, next_cursor = await definicao.pagina(db, limit, cursor, **filtros)
+
+    total_count = None
+    if incluir_total:
+        total_count = await contar_relatorio(db, definicao, **filtros)
+
+    return {
+        "data": data,
+        "next_cursor": next_cursor,
+        "total_count": total_count,
+    }
+
+
+async def exportar_relatorio(
+    db: AsyncSession,
+    definicao: DefinicaoRelatorio,
+    formato: str,
+    **filtros
+) -> IO[bytes]:
+    """
+    Gera o arquivo do relatório definido no formato pedido ('excel', 'excel_resumo' ou 'pdf').
+    O Excel é gravado em fluxo, com memória constante; em 'excel_resumo', as planilhas
+    de resumo são agregadas na mesma passada que grava o detalhe. O PDF precisa da
+    lista completa e parte do resultado em cache do relatório.
+    """
+    if formato == "excel":
+        rows = stream_relatorio(db, definicao, **filtros)
+        return await excel_helper.stream_to_excel(rows, batch_size=EXPORT_BATCH_SIZE)
+    if formato == "excel_resumo":
+        if definicao.resumo is None:
+            raise ValueError(f"O relatório '{definicao.nome}' não possui planilhas de resumo.")
+        rows = stream_relatorio(db, definicao, **filtros)
+        return await excel_helper.stream_to_excel(
+            rows, sheet_name="Detalhe", batch_size=EXPORT_BATCH_SIZE, agregadores=[definicao.resumo()]
+        )
+    if formato == "pdf":
+        data = await listar_relatorio(db, definicao, **filtros)
+        return await pdf_helper.export_to_pdf(data, filename=f"{definicao.nome_arquivo}.pdf")
+    raise ValueError(f"Formato de exportação inválido: '{formato}'.")
+
+
 async def get_relatorio_consolidado(
     db: AsyncSession,
     lotacao: str | None = None,
@@ -289,59 +457,65 @@ async def get_relatorio_consolidado(
     """
     Relatório consolidado: nome, curso, status, data_envio_certificado, vinculo, certificado_enviado.
     Se lotacao for fornecido, filtra por chefia. Caso contrário (UDP), retorna tudo.
+    O resultado fica em cache até que os dados do escopo consultado mudem.
     """
-    stmt = (
-        select(
-            Usuario.id,
-            Usuario.nome,
-            Usuario.vinculo,
-            Usuario.lotacao.label("setor"),
-            Curso.titulo.label("nome_curso"),
-            Curso.certificadora,
-            Curso.carga_horaria,
-            Curso.ano_gd,
-            Atribuicao.status,
-            Atribuicao.data_conclusao,
-            Certificado.file_path.label("certificado_file_path"),
-            Certificado.link.label("certificado_link"),
-            Certificado.id.label("certificado_id"),
-        )
-        .join(Usuario, Atribuicao.user_id == Usuario.id)
-        .join(Curso, Atribuicao.curso_id == Curso.id)
-        .outerjoin(Certificado, Atribuicao.certificado_id == Certificado.id)
-    )
+    return await listar_relatorio(db, CONSOLIDADO, lotacao=lotacao, ano=ano, vinculo=vinculo)
 
-    if lotacao:
-        stmt = stmt.where(Usuario.lotacao == lotacao)
 
-    if vinculo:
-        stmt = stmt.where(Usuario.vinculo == vinculo)
+# Relatórios e formatos disponíveis para exportação assíncrona
+EXPORT_FORMATS = {
+    "excel": ("xlsx", excel_helper.XLSX_MEDIA_TYPE),
+    "excel_resumo": ("xlsx", excel_helper.XLSX_MEDIA_TYPE),
+    "pdf": ("pdf", "application/pdf"),
+}
 
-    if ano:
-        stmt = stmt.where(Curso.ano_gd == str(ano))
 
-    stmt = stmt.order_by(Usuario.nome, Curso.titulo)
-    result = await db.execute(stmt)
+async def gerar_exportacao(
+    db: AsyncSession,
+    relatorio: str,
+    formato: str,
+    lotacao: str | None = None,
+    ano: str | None = None,
+    vinculo: str | None = None
+) -> IO[bytes]:
+    """
+    Gera o arquivo de exportação de um relatório definido ('capacitacoes' ou 'consolidado')
+    no formato pedido ('excel', 'excel_resumo' ou 'pdf').
+    A lotação só se aplica aos relatórios com escopo de lotação (o de capacitações não tem).
+    """
+    definicao = RELATORIOS.get(relatorio)
+    if definicao is None:
+        raise ValueError(f"Relatório desconhecido: '{relatorio}'.")
+
+    filtros = {"ano": ano, "vinculo": vinculo}
+    if definicao.escopo:
+        filtros[definicao.escopo] = lotacao
+    return await exportar_relatorio(db, definicao, formato, **filtros)
+
+
+async def salvar_exportacao(
+    session_maker,
+    destino: str,
+    relatorio: str,
+    formato: str,
+    lotacao: str | None = None,
+    ano: str | None = None,
+    vinculo: str | None = None
+) -> None:
+    """
+    Gera a exportação com uma sessão própria (o job sobrevive à requisição que o criou)
+    e grava o arquivo em `destino`.
+    """
+    async with session_maker() as session:
+        file_stream = await gerar_exportacao(
+            session, relatorio, formato, lotacao=lotacao, ano=ano, vinculo=vinculo
+        )
+    try:
+        await render_pool.run_local(_copiar_para_arquivo, file_stream, destino)
+    finally:
+        file_stream.close()
+
 
-    rows = result.mappings().all()
-    data = []
-    for row in rows:
-        data.append({
-            "id": row["id"],
-            "nome": row["nome"],
-            "vinculo": row["vinculo"] or "Não informado",
-            "setor": row["setor"],
-            "nome_curso": row["nome_curso"],
-            "certificadora": row["certificadora"],
-            "carga_horaria": row["carga_horaria"],
-            "ano_gd": row["ano_gd"],
-            "status": row["status"],
-            "data_envio_certificado": row["data_conclusao"].isoformat() if row["data_conclusao"] else None,
-            "vinculo_display": row["vinculo"] or "Não informado",
-            "certificado_enviado": "Sim" if row["certificado_id"] else "Não",
-            "certificado_id": row["certificado_id"],
-            "certificado_file_path": row["certificado_file_path"],
-            "certificado_link": row["certificado_link"],
-        })
-
-    return data
+def _copiar_para_arquivo(file_stream: IO[bytes], destino: str) -> None:
+    with open(destino, "wb") as output:
+        shutil.copyfileobj(file_stream, output)
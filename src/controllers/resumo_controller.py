@@ -0,0 +1,166 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert, delete, func
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+from ..models import Atribuicao, Usuario, Curso, StatusAtribuicao, ResumoAtribuicao
+from . import alteracao_controller, evento_controller
+
+Chave = Tuple[str, str, str, StatusAtribuicao]
+
+
+def _consulta_contagens(*criterios):
+    """
+    Contagem das atribuições que atendem aos critérios, agrupada pela chave do resumo.
+    """
+    lotacao = func.coalesce(Usuario.lotacao, '')
+    vinculo = func.coalesce(Usuario.vinculo, '')
+    ano_gd = func.coalesce(Curso.ano_gd, '')
+    return (
+        select(lotacao, vinculo, ano_gd, Atribuicao.status, func.count(Atribuicao.id))
+        .join(Usuario, Atribuicao.user_id == Usuario.id)
+        .outerjoin(Curso, Atribuicao.curso_id == Curso.id)
+        .where(Atribuicao.status.isnot(None), *criterios)
+        .group_by(lotacao, vinculo, ano_gd, Atribuicao.status)
+    )
+
+
+async def _contar(db: AsyncSession, *criterios) -> Dict[Chave, int]:
+    result = await db.execute(_consulta_contagens(*criterios))
+    return {(row[0], row[1], row[2], row[3]): row[4] for row in result.all()}
+
+
+async def _somar(db: AsyncSession, chave: Chave, delta: int):
+    """
+    Soma `delta` à contagem da chave, criando a linha se necessário e
+    removendo-a quando a contagem chega a zero.
+    """
+    lotacao, vinculo, ano_gd, status = chave
+    filtro = (
+        ResumoAtribuicao.lotacao == lotacao,
+        ResumoAtribuicao.vinculo == vinculo,
+        ResumoAtribuicao.ano_gd == ano_gd,
+        ResumoAtribuicao.status == status,
+    )
+    result = await db.execute(
+        update(ResumoAtribuicao).where(*filtro).values(total=ResumoAtribuicao.total + delta)
+    )
+    if result.rowcount == 0:
+        if delta > 0:
+            await db.execute(
+                insert(ResumoAtribuicao).values(
+                    lotacao=lotacao, vinculo=vinculo, ano_gd=ano_gd, status=status, total=delta
+                )
+            )
+    elif delta < 0:
+        await db.execute(delete(ResumoAtribuicao).where(*filtro, ResumoAtribuicao.total <= 0))
+
+
+@asynccontextmanager
+async def atualizando_resumo(db: AsyncSession, *criterios) -> AsyncIterator[None]:
+    """
+    Mantém o resumo de atribuições e o feed de alterações em dia durante uma alteração.
+
+    As atribuições que atendem aos critérios são contadas antes e depois do bloco,
+    e a diferença é aplicada ao resumo na mesma transação. Cobre criação, mudança de
+    status, remoção de atribuições e mudanças de lotação/vínculo/ano GD.
+    As linhas dessas atribuições no dataset também são comparadas, e as que mudaram
+    são registradas no feed incremental (ver `alteracao_controller`) e convertidas em
+    variações de contadores por status, enviadas aos clientes conectados após o commit
+    (ver `evento_controller`):
+
+        async with atualizando_resumo(db, Atribuicao.id == atribuicao_id):
+            await db.execute(update(Atribuicao)...)
+        await db.commit()
+    """
+    antes = await _contar(db, *criterios)
+    estados_antes = await alteracao_controller.estados(db, *criterios)
+    yield
+    depois = await _contar(db, *criterios)
+    for chave in antes.keys() | depois.keys():
+        delta = depois.get(chave, 0) - antes.get(chave, 0)
+        if delta:
+            await _somar(db, chave, delta)
+    estados_depois = await alteracao_controller.estados(db, *criterios)
+    await alteracao_controller.registrar_alteracoes(db, estados_antes, estados_depois)
+    evento_controller.registrar_contadores(db, estados_antes, estados_depois)
+
+
+async def contagens_por_lotacao(db: AsyncSession) -> List[Tuple[str | None, StatusAtribuicao, int]]:
+    """
+    Retorna (lotação, status, total) a partir do resumo.
+    """
+    lotacao = ResumoAtribuicao.lotacao
+    stmt = (
+        select(lotacao, ResumoAtribuicao.status, func.sum(ResumoAtribuicao.total))
+        .group_by(lotacao, ResumoAtribuicao.status)
+        .order_by(lotacao, ResumoAtribuicao.status)
+    )
+    result = await db.execute(stmt)
+    return [(row[0] or None, row[1], row[2]) for row in result.all()]
+
+
+async def contagens_por_status(db: AsyncSession) -> Dict[StatusAtribuicao, int]:
+    """
+    Retorna o total de atribuições por status a partir do resumo.
+    """
+    stmt = select(ResumoAtribuicao.status, func.sum(ResumoAtribuicao.total)).group_by(ResumoAtribuicao.status)
+    result = await db.execute(stmt)
+    return {row[0]: row[1] for row in result.all()}
+
+
+async def verificar_resumo(db: AsyncSession) -> List[Dict[str, object]]:
+    """
+    Compara o resumo com a contagem calculada a partir das atribuições.
+    Retorna as divergências encontradas (lista vazia = resumo consistente).
+    """
+    esperado = await _contar(db)
+    result = await db.execute(
+        select(
+            ResumoAtribuicao.lotacao, ResumoAtribuicao.vinculo, ResumoAtribuicao.ano_gd,
+            ResumoAtribuicao.status, ResumoAtribuicao.total
+        )
+    )
+    atual = {(row[0], row[1], row[2], row[3]): row[4] for row in result.all()}
+
+    divergencias = []
+    for chave in sorted(esperado.keys() | atual.keys(), key=lambda c: (c[0], c[1], c[2], c[3].name)):
+        if esperado.get(chave, 0) != atual.get(chave, 0):
+            lotacao, vinculo, ano_gd, status = chave
+            divergencias.append({
+                "lotacao": lotacao,
+                "vinculo": vinculo,
+                "ano_gd": ano_gd,
+                "status": status.value,
+                "esperado": esperado.get(chave, 0),
+                "atual": atual.get(chave, 0),
+            })
+    return divergencias
+
+
+async def reconstruir_resumo(db: AsyncSession) -> int:
+    """
+    Recalcula o resumo do zero a partir das atribuições. Retorna o número de linhas gravadas.
+    """
+    contagens = await _contar(db)
+    await db.execute(delete(ResumoAtribuicao))
+    if contagens:
+        await db.execute(
+            insert(ResumoAtribuicao),
+            [
+                {"lotacao": lotacao, "vinculo": vinculo, "ano_gd": ano_gd, "status": status, "total": total}
+                for (lotacao, vinculo, ano_gd, status), total in contagens.items()
+            ]
+        )
+    await db.commit()
+    return len(contagens)
+
+
+async def resumo_vazio_com_atribuicoes(db: AsyncSession) -> bool:
+    """
+    Indica se o resumo ainda não foi carregado (tabela vazia com atribuições existentes).
+    """
+    tem_resumo = (await db.execute(select(ResumoAtribuicao.lotacao).limit(1))).first() is not None
+    if tem_resumo:
+        return False
+    return (await db.execute(select(Atribuicao.id).limit(1))).first() is not None
@@ -0,0 +1,60 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List
+
+from ..providers.implementations.relatorio_definicoes import CONSOLIDADO, CAPACITACOES
+from ..resources.report_snapshots import snapshot_store, Snapshot
+from . import relatorio_controller
+
+# Nome do snapshot do status geral (os demais usam o nome do relatório definido)
+STATUS_GERAL = "status_geral"
+
+
+def _anos_padrao() -> List[str | None]:
+    """
+    Variantes de ano pré-calculadas: todos os anos e o ano corrente.
+    """
+    return [None, str(datetime.now().year)]
+
+
+async def gerar_snapshots(db: AsyncSession, anos: List[str | None] | None = None) -> int:
+    """
+    Pré-calcula as variantes mais consultadas dos relatórios e grava os snapshots:
+    capacitações e consolidado (todas as lotações e cada lotação) por ano, e o status geral.
+    O consolidado de cada lotação sai da mesma consulta do consolidado geral, separado
+    pela lotação de cada linha. Retorna o número de snapshots gravados.
+    """
+    gerado_em = datetime.now()
+    total = 0
+
+    for ano in anos if anos is not None else _anos_padrao():
+        capacitacoes = await CAPACITACOES.listar(db, ano=ano)
+        snapshot_store.salvar(CAPACITACOES.nome, CAPACITACOES.normalizar_filtros(ano=ano), capacitacoes, gerado_em)
+
+        consolidado = await CONSOLIDADO.listar(db, ano=ano)
+        snapshot_store.salvar(CONSOLIDADO.nome, CONSOLIDADO.normalizar_filtros(ano=ano), consolidado, gerado_em)
+        total += 2
+
+        por_lotacao: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in consolidado:
+            if row["setor"]:
+                por_lotacao[row["setor"]].append(row)
+        for lotacao, rows in por_lotacao.items():
+            filtros = CONSOLIDADO.normalizar_filtros(lotacao=lotacao, ano=ano)
+            snapshot_store.salvar(CONSOLIDADO.nome, filtros, rows, gerado_em)
+            total += 1
+
+    status_geral = await relatorio_controller.get_relatorio_status_geral_udp(db)
+    snapshot_store.salvar(STATUS_GERAL, {}, status_geral, gerado_em)
+    total += 1
+
+    snapshot_store.purge()
+    return total
+
+
+def obter_snapshot(relatorio: str, filtros: Dict[str, Any] | None = None) -> Snapshot | None:
+    """
+    Snapshot do relatório para os filtros informados, se houver um dentro do prazo de validade.
+    """
+    return snapshot_store.carregar(relatorio, filtros or {})
@@ -4,7 +4,10 @@ from sqlalchemy import update, select, func
 import re
 from typing import List, Dict, Any
 
-from ..models import Usuario, PerfilUsuario, Atribuicao
+from ..models import Usuario, PerfilUsuario, Atribuicao, normalizar_user_id
+from ..resources.report_cache import bump_data_version
+from .resumo_controller import atualizando_resumo
+from .alteracao_controller import CAMPOS_USUARIO
 
 async def sincronizar_usuario(db: AsyncSession, user_info: dict) -> Usuario:
     """
@@ -17,10 +20,10 @@ async def sincronizar_usuario(db: AsyncSession, user_info: dict) -> Usuario:
         # Não deveria acontecer se a autenticação AD funcionou
         raise ValueError("sAMAccountName não encontrado nos dados do AD")
 
-    user_id = user_id.lower()
+    user_id = normalizar_user_id(user_id)
 
-    # Busca o usuário existente (case insensitive)
-    stmt_select = select(Usuario).where(func.lower(Usuario.id) == user_id)
+    # IDs são gravados sempre em minúsculas: busca por igualdade, pela chave primária
+    stmt_select = select(Usuario).where(Usuario.id == user_id)
     result = await db.execute(stmt_select)
     db_user = result.scalars().first()
 
@@ -58,13 +61,26 @@ async def sincronizar_usuario(db: AsyncSession, user_info: dict) -> Usuario:
         elif ad_profile in [PerfilUsuario.UDP, PerfilUsuario.CHEFIA] and db_user.perfil != ad_profile:
             updated_values["perfil"] = ad_profile
 
+        # Dados exibidos nos relatórios: só invalida o cache se algum deles mudou
+        lotacao_anterior = db_user.lotacao
+        campos_alterados = {campo for campo, valor in updated_values.items() if getattr(db_user, campo) != valor}
+        dados_relatorio_alterados = bool(campos_alterados & {"nome", "lotacao", "cargo", "matricula"})
+
         stmt_update = (
             update(Usuario)
             .where(Usuario.id == user_id)
             .values(**updated_values)
         )
-        await db.execute(stmt_update)
+        if campos_alterados & CAMPOS_USUARIO:
+            # Nome e lotação fazem parte das linhas do dataset (feed de alterações),
+            # e a mudança de lotação move as atribuições do usuário no resumo
+            async with atualizando_resumo(db, Atribuicao.user_id == db_user.id):
+                await db.execute(stmt_update)
+        else:
+            await db.execute(stmt_update)
         await db.commit()
+        if dados_relatorio_alterados:
+            bump_data_version(lotacao_anterior, department)
         await db.refresh(db_user)
         return db_user
     else:
@@ -81,6 +97,7 @@ async def sincronizar_usuario(db: AsyncSession, user_info: dict) -> Usuario:
         )
         db.add(new_user)
         await db.commit()
+        bump_data_version(department)
         await db.refresh(new_user)
         return new_user
 
@@ -90,7 +107,7 @@ async def atualizar_perfil_usuario(db: AsyncSession, user_id: str, novo_perfil:
     """
     stmt = (
         update(Usuario)
-        .where(Usuario.id == user_id)
+        .where(Usuario.id == normalizar_user_id(user_id))
         .values(perfil=novo_perfil)
         .returning(Usuario)
     )
@@ -157,7 +174,7 @@ async def get_user_by_username(db: AsyncSession, username: str) -> Usuario | Non
     """
     if not username:
         return None
-    stmt = select(Usuario).where(func.lower(Usuario.id) == username.lower())
+    stmt = select(Usuario).where(Usuario.id == normalizar_user_id(username))
     result = await db.execute(stmt)
     return result.scalars().first()
 
@@ -0,0 +1,87 @@
+# src/helpers/arrow_helper.py
+from typing import Any, AsyncIterator, Dict, IO, List
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ..models import StatusAtribuicao
+from ..resources.render_pool import render_pool
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+
+# Formatos colunares disponíveis: extensão e media type
+DATASET_FORMATS = {
+    "parquet": ("parquet", PARQUET_MEDIA_TYPE),
+    "arrow": ("arrow", ARROW_MEDIA_TYPE),
+}
+
+# Esquema do dataset de capacitações (ver RelatorioProvider.stream_lotes_dataset_capacitacoes)
+CAPACITACOES_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("cpf", pa.string()),
+    ("vinculo", pa.string()),
+    ("setor", pa.string()),
+    ("nome_profissional", pa.string()),
+    ("ano_gd", pa.string()),
+    ("nome_curso", pa.string()),
+    ("carga_horaria", pa.int32()),
+    ("plataforma", pa.string()),
+    ("tema", pa.string()),
+    ("atribuicao_id", pa.string()),
+    ("curso_id", pa.string()),
+    ("status", pa.dictionary(pa.int8(), pa.string())),
+    ("atribuido_em", pa.timestamp("us")),
+    ("data_conclusao", pa.timestamp("us")),
+    ("data_validacao", pa.timestamp("us")),
+    ("certificado", pa.bool_()),
+])
+
+# Valores fixos das colunas dicionário: todos os lotes usam o mesmo dicionário, como exige
+# o formato de arquivo Arrow IPC (sem isso, cada lote traria só os valores que contém)
+DICIONARIOS = {
+    "status": pa.array([status.value for status in StatusAtribuicao], pa.string()),
+}
+
+
+def _open_writer(sink: IO[bytes], schema: pa.Schema, formato: str):
+    if formato == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    if formato == "arrow":
+        return pa.ipc.new_file(sink, schema)
+    raise ValueError(f"Formato de dataset inválido: {formato}")
+
+
+def _com_dicionarios_fixos(batch: pa.RecordBatch) -> pa.RecordBatch:
+    colunas = []
+    for field, coluna in zip(batch.schema, batch.columns):
+        dicionario = DICIONARIOS.get(field.name)
+        if dicionario is not None and pa.types.is_dictionary(field.type):
+            indices = pc.index_in(coluna.dictionary_decode(), value_set=dicionario).cast(field.type.index_type)
+            coluna = pa.DictionaryArray.from_arrays(indices, dicionario)
+        colunas.append(coluna)
+    return pa.RecordBatch.from_arrays(colunas, schema=batch.schema)
+
+
+def _write_batch(writer, schema: pa.Schema, lote: List[Dict[str, Any]]) -> None:
+    writer.write_batch(_com_dicionarios_fixos(pa.RecordBatch.from_pylist(lote, schema=schema)))
+
+
+async def write_dataset(
+    lotes: AsyncIterator[List[Dict[str, Any]]],
+    sink: IO[bytes],
+    formato: str,
+    schema: pa.Schema = CAPACITACOES_SCHEMA
+) -> None:
+    """
+    Grava os lotes recebidos em `sink` como Parquet ou Arrow IPC (formato de arquivo),
+    um record batch por lote, sem acumular o dataset em memória.
+    A conversão e a escrita de cada lote rodam em uma thread do pool de renderização.
+    """
+    writer = _open_writer(sink, schema, formato)
+    try:
+        async for lote in lotes:
+            if lote:
+                await render_pool.run_local(_write_batch, writer, schema, lote)
+    finally:
+        await render_pool.run_local(writer.close)
@@ -0,0 +1,50 @@
+# src/helpers/csv_helper.py
+import csv
+import enum
+import io
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict
+
+from .pdf_helper import get_column_headers
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+# Separador usado pelo Excel em português, que usa a vírgula como separador decimal
+CSV_DELIMITER = ";"
+# Volume de texto acumulado antes de cada envio ao cliente
+CSV_FLUSH_SIZE = 64 * 1024
+UTF8_BOM = "\ufeff".encode("utf-8")
+
+
+def _csv_value(value: Any) -> Any:
+    """Converte um valor de célula para texto simples no CSV."""
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def stream_csv(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    Escreve as linhas recebidas como CSV separado por ';', em UTF-8 com BOM
+    (para que o Excel reconheça a acentuação), enviando blocos de ~64KB à medida
+    que as linhas chegam do banco.
+    O cabeçalho usa os mesmos rótulos das exportações em PDF.
+    """
+    yield UTF8_BOM
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=CSV_DELIMITER, lineterminator="\r\n")
+    keys = None
+    async for row in rows:
+        if keys is None:
+            keys = list(row.keys())
+            writer.writerow(get_column_headers(keys))
+        writer.writerow([_csv_value(row.get(key)) for key in keys])
+        if buffer.tell() >= CSV_FLUSH_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,41 @@
+# src/helpers/etag_helper.py
+from typing import Any, Dict
+import hashlib
+import json
+
+from fastapi import HTTPException, Request, Response, status
+
+# Respostas validadas a cada uso: o cliente guarda a cópia, mas sempre envia If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def calcular_etag(*partes: Any) -> str:
+    """
+    ETag fraco a partir das partes que identificam a versão da resposta.
+    """
+    digest = hashlib.sha1(json.dumps(partes, default=str).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:24]}"'
+
+
+def _corresponde(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match usa comparação fraca: o prefixo W/ é ignorado
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def verificar_etag(request: Request, response: Response | None, *versao: Any) -> Dict[str, str]:
+    """
+    Calcula o ETag da resposta a partir da URL, do Accept e da `versao` dos dados.
+    Se o cliente já possui essa versão (If-None-Match), levanta 304 Not Modified antes
+    de qualquer consulta pesada. Caso contrário, grava os cabeçalhos em `response`
+    (quando informado) e os retorna, para uso em respostas montadas pela rota.
+    """
+    etag = calcular_etag(request.url.path, request.url.query, request.headers.get("accept"), *versao)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept, Authorization"}
+    if _corresponde(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if response is not None:
+        response.headers.update(headers)
+    return headers
@@ -1,16 +1,200 @@
 # src/helpers/excel_helper.py
-from typing import List, Dict, Any
+import os
+from collections import Counter, defaultdict
+from enum import Enum
+from typing import List, Dict, Any, AsyncIterator, Iterable, Iterator, IO, Sequence, Tuple
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 import pandas as pd
+import xlsxwriter
 
-async def export_to_excel(data: List[Dict[str, Any]]) -> BytesIO:
+from ..resources.render_pool import render_pool
+
+# Acima deste tamanho o arquivo gerado deixa a memória e passa para o disco
+EXPORT_SPOOL_MAX_BYTES = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", str(5 * 1024 * 1024)))
+STREAM_CHUNK_SIZE = 64 * 1024
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def render_excel(data: List[Dict[str, Any]]) -> bytes:
     """
-    Exports a list of dictionaries to an Excel file in memory.
+    Gera o conteúdo de um arquivo Excel a partir de uma lista de dicionários.
+    Função síncrona (CPU), executada no pool de renderização.
     """
     df = pd.DataFrame(data)
     output = BytesIO()
     writer = pd.ExcelWriter(output, engine='xlsxwriter')
     df.to_excel(writer, index=False, sheet_name='Relatorio')
     writer.close() # Use close() instead of save() for newer pandas versions
+    return output.getvalue()
+
+async def export_to_excel(data: List[Dict[str, Any]]) -> BytesIO:
+    """
+    Exports a list of dictionaries to an Excel file in memory.
+    A renderização roda no pool de renderização, fora do event loop.
+    """
+    return BytesIO(await render_pool.run(render_excel, data))
+
+def _write_rows(worksheet, start_row: int, keys: List[str], batch: List[Dict[str, Any]]) -> None:
+    for offset, item in enumerate(batch):
+        worksheet.write_row(start_row + offset, 0, [item.get(key) for key in keys])
+
+def _write_batch(worksheet, start_row: int, keys: List[str], batch: List[Dict[str, Any]], agregadores) -> None:
+    _write_rows(worksheet, start_row, keys, batch)
+    for agregador in agregadores:
+        for item in batch:
+            agregador.adicionar(item)
+
+def _rotulo(valor: Any) -> Any:
+    return valor.value if isinstance(valor, Enum) else valor
+
+
+class ResumoPorGrupo:
+    """
+    Agrega as linhas de um relatório por grupo (ex: lotação) à medida que são gravadas,
+    sem guardar as linhas, gerando duas planilhas:
+
+    - resumo: contagem grupo × categoria (ex: status), com totais por linha e coluna;
+    - por grupo: total de linhas, pessoas distintas, linhas concluídas (% do total)
+      e linhas marcadas (ex: certificado enviado).
+    """
+    def __init__(
+        self,
+        grupo: str,
+        categoria: str,
+        categorias: Iterable[Any] = (),
+        concluidas: Iterable[Any] = (),
+        pessoa: str | None = None,
+        marcado: Tuple[str, Any] | None = None,
+        rotulo_grupo: str = "Grupo",
+        rotulo_marcado: str = "Marcados",
+        titulos: Tuple[str, str] = ("Resumo", "Por grupo"),
+        sem_grupo: str = "Não informado"
+    ):
+        self.grupo = grupo
+        self.categoria = categoria
+        self.categorias = [_rotulo(c) for c in categorias]
+        self.concluidas = {_rotulo(c) for c in concluidas}
+        self.pessoa = pessoa
+        self.marcado = marcado
+        self.rotulo_grupo = rotulo_grupo
+        self.rotulo_marcado = rotulo_marcado
+        self.titulos = titulos
+        self.sem_grupo = sem_grupo
+        self._contagens: Dict[Any, Counter] = defaultdict(Counter)
+        self._pessoas: Dict[Any, set] = defaultdict(set)
+        self._marcados: Counter = Counter()
+
+    def adicionar(self, item: Dict[str, Any]) -> None:
+        grupo = item.get(self.grupo) or self.sem_grupo
+        self._contagens[grupo][_rotulo(item.get(self.categoria))] += 1
+        if self.pessoa:
+            self._pessoas[grupo].add(item.get(self.pessoa))
+        if self.marcado and item.get(self.marcado[0]) == self.marcado[1]:
+            self._marcados[grupo] += 1
+
+    def planilhas(self) -> List[Tuple[str, List[str], List[List[Any]]]]:
+        """
+        Conteúdo das planilhas agregadas: (título, cabeçalho, linhas).
+        """
+        categorias = list(self.categorias)
+        for contagem in self._contagens.values():
+            categorias.extend(c for c in contagem if c not in categorias)
+        grupos = sorted(self._contagens, key=str)
+
+        resumo = []
+        for grupo in grupos:
+            contagem = self._contagens[grupo]
+            resumo.append([grupo, *(contagem[c] for c in categorias), sum(contagem.values())])
+        totais = [sum(linha[i] for linha in resumo) for i in range(1, len(categorias) + 2)]
+        resumo.append(["Total", *totais])
+
+        por_grupo = []
+        for grupo in grupos:
+            contagem = self._contagens[grupo]
+            total = sum(contagem.values())
+            concluidas = sum(n for c, n in contagem.items() if c in self.concluidas)
+            por_grupo.append([
+                grupo, total, len(self._pessoas[grupo]), concluidas,
+                round(concluidas / total * 100, 1) if total else 0.0, self._marcados[grupo],
+            ])
+
+        return [
+            (self.titulos[0], [self.rotulo_grupo, *map(str, categorias), "Total"], resumo),
+            (self.titulos[1], [self.rotulo_grupo, "Total", "Pessoas", "Concluídas", "% Concluído", self.rotulo_marcado], por_grupo),
+        ]
+
+
+def _write_sheet(worksheet, header: List[str], linhas: List[List[Any]], header_format) -> None:
+    worksheet.write_row(0, 0, header, header_format)
+    for idx, linha in enumerate(linhas, start=1):
+        worksheet.write_row(idx, 0, linha)
+
+async def stream_to_excel(
+    rows: AsyncIterator[Dict[str, Any]],
+    sheet_name: str = 'Relatorio',
+    batch_size: int = 1000,
+    agregadores: Sequence[Any] = ()
+) -> IO[bytes]:
+    """
+    Escreve as linhas recebidas de forma incremental em um arquivo Excel.
+
+    Usa o modo 'constant_memory' do xlsxwriter (cada linha é descarregada assim que
+    a próxima começa) e grava o resultado em um SpooledTemporaryFile, de modo que o
+    consumo de memória não cresce com o número de linhas do relatório.
+    As linhas são escritas em lotes de `batch_size` em uma thread do pool de
+    renderização, assim como a compactação final do arquivo.
+
+    Cada agregador (ex: `ResumoPorGrupo`) recebe as linhas na mesma passada e gera
+    planilhas próprias, posicionadas antes da planilha de detalhe e preenchidas ao
+    final, sem uma segunda consulta.
+    O arquivo retornado já está posicionado no início e deve ser fechado pelo chamador
+    (ver `iter_file`).
+    """
+    output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    try:
+        planilhas_agregadas = [
+            (agregador, [workbook.add_worksheet(titulo) for titulo in agregador.titulos])
+            for agregador in agregadores
+        ]
+        worksheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format({'bold': True, 'border': 1})
+
+        keys: List[str] | None = None
+        row_idx = 1
+        batch: List[Dict[str, Any]] = []
+        async for item in rows:
+            if keys is None:
+                # Cabeçalho igual ao gerado pelo pandas: as próprias chaves do dicionário
+                keys = list(item.keys())
+                worksheet.write_row(0, 0, keys, header_format)
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await render_pool.run_local(_write_batch, worksheet, row_idx, keys, batch, agregadores)
+                row_idx += len(batch)
+                batch = []
+        if batch:
+            await render_pool.run_local(_write_batch, worksheet, row_idx, keys, batch, agregadores)
+
+        for agregador, planilhas in planilhas_agregadas:
+            for planilha, (_, header, linhas) in zip(planilhas, agregador.planilhas()):
+                await render_pool.run_local(_write_sheet, planilha, header, linhas, header_format)
+    finally:
+        await render_pool.run_local(workbook.close)
+
     output.seek(0)
-    return output
\ No newline at end of file
+    return output
+
+def iter_file(fileobj: IO[bytes], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Lê um arquivo em blocos para uso com StreamingResponse, fechando-o ao final.
+    """
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
@@ -0,0 +1,22 @@
+# src/helpers/ndjson_helper.py
+import json
+from typing import Any, AsyncIterator, Dict
+from fastapi import Request
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def accepts_ndjson(request: Request) -> bool:
+    """
+    Indica se o cliente pediu a resposta em NDJSON (`Accept: application/x-ndjson`).
+    """
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def iter_ndjson(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    Serializa as linhas uma a uma, um objeto JSON por linha, à medida que chegam do banco.
+    Datas e demais tipos não nativos do JSON são convertidos para texto.
+    """
+    async for row in rows:
+        yield (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8")
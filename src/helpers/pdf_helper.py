@@ -9,6 +9,8 @@ from reportlab.lib.units import inch
 from reportlab.platypus import KeepTogether
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 
+from ..resources.render_pool import render_pool
+
 # Mapeamento de chaves de dados para rótulos legíveis em português
 COLUMN_LABELS = {
     "nome_profissional": "Nome",
@@ -44,7 +46,7 @@ COLUMN_WEIGHTS = {
 DEFAULT_WEIGHT = 10
 
 
-def _get_column_headers(keys: List[str]) -> List[str]:
+def get_column_headers(keys: List[str]) -> List[str]:
     """Retorna rótulos legíveis para cada chave de coluna."""
     return [COLUMN_LABELS.get(k, k.replace("_", " ").title()) for k in keys]
 
@@ -70,6 +72,15 @@ def _cell_value(item: Dict[str, Any], key: str) -> str:
 async def export_to_pdf(data: List[Dict[str, Any]], filename: str = "report.pdf") -> BytesIO:
     """
     Exports a list of dictionaries to a PDF file in memory.
+    A renderização roda no pool de renderização, fora do event loop.
+    """
+    return BytesIO(await render_pool.run(render_pdf, data))
+
+
+def render_pdf(data: List[Dict[str, Any]]) -> bytes:
+    """
+    Gera o conteúdo de um PDF a partir de uma lista de dicionários.
+    Função síncrona (CPU), executada no pool de renderização.
     
     Layout:
     - Página Letter (8.5 x 11 polegadas = 612 x 792 pts)
@@ -102,7 +113,7 @@ async def export_to_pdf(data: List[Dict[str, Any]], filename: str = "report.pdf"
         story.append(Paragraph("Nenhum dado para exibir.", styles["Normal"]))
     else:
         keys = list(data[0].keys())
-        headers = _get_column_headers(keys)
+        headers = get_column_headers(keys)
         col_widths = _calculate_col_widths(headers, page_width, left_margin + right_margin)
 
         # Cabeçalho da tabela
@@ -153,10 +164,8 @@ async def export_to_pdf(data: List[Dict[str, Any]], filename: str = "report.pdf"
             else:
                 style_commands.append(("ALIGN", (i, 1), (i, -1), "LEFT"))
         
-        # Zebra striping
-        for row_idx in range(1, len(all_table_data)):
-            if row_idx % 2 == 0:
-                style_commands.append(("BACKGROUND", (0, row_idx), (-1, row_idx), colors.HexColor("#F8F9FA")))
+        # Zebra striping (linhas pares em cinza), válido para tabelas de qualquer tamanho
+        style_commands.append(("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F8F9FA")]))
 
         # Se poucos dados, tabela única
         if len(data_rows) <= rows_per_page:
@@ -176,5 +185,4 @@ async def export_to_pdf(data: List[Dict[str, Any]], filename: str = "report.pdf"
                 story.append(table)
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
@@ -0,0 +1,184 @@
+# src/helpers/report_engine.py
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Tuple
+import base64
+import json
+
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass(frozen=True)
+class Coluna:
+    """
+    Coluna de um relatório: chave de saída, expressão SQL e formatação opcional do valor.
+    Colunas com `exportar=False` são lidas do banco (ex: desempate da ordenação),
+    mas não aparecem nas linhas entregues.
+    """
+    chave: str
+    expressao: Any
+    formatar: Callable[[Any], Any] | None = None
+    exportar: bool = True
+
+
+@dataclass(frozen=True)
+class Juncao:
+    """
+    Tabela ligada à origem do relatório (LEFT JOIN quando `externa`).
+    """
+    alvo: Any
+    condicao: Any
+    externa: bool = False
+
+
+@dataclass(frozen=True, eq=False)
+class DefinicaoRelatorio:
+    """
+    Definição declarativa de um relatório: colunas, junções, filtros e ordenação.
+
+    A definição compila para uma única query; a mesma query alimenta qualquer saída
+    (lista JSON, página por cursor, NDJSON, CSV, Excel, PDF, datasets colunares).
+
+    - `filtros`: nome do filtro -> função que recebe o valor e devolve a condição SQL.
+      Valores vazios (None, "") são ignorados.
+    - `ordem`: chaves das colunas que definem a ordenação (ascendente). Também formam
+      a posição do cursor na paginação, então devem identificar a linha de forma única
+      e ter valores serializáveis em JSON.
+    - `escopo`: filtro que restringe o relatório a uma lotação; para a Chefia, a
+      aplicação força esse filtro com a lotação do usuário.
+    - `perfis`: perfis autorizados a consultar o relatório.
+    - `resumo`: fábrica do agregador das planilhas de resumo da exportação
+      'excel_resumo' (ver `excel_helper.ResumoPorGrupo`); None se o relatório não tem resumo.
+    """
+    nome: str
+    origem: Any
+    colunas: Tuple[Coluna, ...]
+    juncoes: Tuple[Juncao, ...] = ()
+    filtros: Mapping[str, Callable[[Any], Any]] = field(default_factory=dict)
+    ordem: Tuple[str, ...] = ()
+    escopo: str | None = None
+    perfis: Tuple[str, ...] = ()
+    arquivo: str | None = None
+    resumo: Callable[[], Any] | None = None
+
+    def __post_init__(self):
+        chaves = {coluna.chave for coluna in self.colunas}
+        desconhecidas = [chave for chave in self.ordem if chave not in chaves]
+        if desconhecidas:
+            raise ValueError(f"Colunas de ordenação desconhecidas em '{self.nome}': {', '.join(desconhecidas)}")
+        if self.escopo and self.escopo not in self.filtros:
+            raise ValueError(f"Filtro de escopo desconhecido em '{self.nome}': {self.escopo}")
+        # Pré-calcula o mapeamento das linhas (chamado uma vez por linha do relatório)
+        object.__setattr__(self, "_saida", tuple(
+            (coluna.chave, coluna.formatar) for coluna in self.colunas if coluna.exportar
+        ))
+        object.__setattr__(self, "_colunas_ordem", tuple(
+            coluna.expressao for chave in self.ordem for coluna in self.colunas if coluna.chave == chave
+        ))
+
+    @property
+    def nome_arquivo(self) -> str:
+        return self.arquivo or f"relatorio_{self.nome}"
+
+    def normalizar_filtros(self, **valores) -> Dict[str, Any]:
+        """
+        Valores de todos os filtros do relatório (None para os ausentes), na ordem da definição.
+        Levanta ValueError para filtros que o relatório não possui.
+        """
+        desconhecidos = [nome for nome, valor in valores.items() if valor and nome not in self.filtros]
+        if desconhecidos:
+            raise ValueError(f"Filtros não suportados pelo relatório '{self.nome}': {', '.join(desconhecidos)}")
+        return {nome: valores.get(nome) or None for nome in self.filtros}
+
+    def compilar(self, **valores):
+        """
+        Monta a query do relatório com os filtros informados aplicados.
+        """
+        stmt = select(*(coluna.expressao.label(coluna.chave) for coluna in self.colunas)).select_from(self.origem)
+        for juncao in self.juncoes:
+            if juncao.externa:
+                stmt = stmt.outerjoin(juncao.alvo, juncao.condicao)
+            else:
+                stmt = stmt.join(juncao.alvo, juncao.condicao)
+
+        for nome, valor in self.normalizar_filtros(**valores).items():
+            if valor:
+                stmt = stmt.where(self.filtros[nome](valor))
+
+        return stmt.order_by(*self._colunas_ordem)
+
+    def mapear(self, row) -> Dict[str, Any]:
+        """
+        Converte uma linha do banco no formato entregue pelo relatório.
+        """
+        return {
+            chave: formatar(row[chave]) if formatar else row[chave]
+            for chave, formatar in self._saida
+        }
+
+    def encode_cursor(self, row) -> str:
+        """
+        Cursor opaco com a posição (colunas de ordenação) da última linha entregue.
+        """
+        payload = json.dumps([row[chave] for chave in self.ordem])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            posicao = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (ValueError, TypeError):
+            raise ValueError("Cursor de paginação inválido.")
+        if not isinstance(posicao, list) or len(posicao) != len(self.ordem):
+            raise ValueError("Cursor de paginação inválido.")
+        return posicao
+
+    async def listar(self, db: AsyncSession, **filtros) -> List[Dict[str, Any]]:
+        result = await db.execute(self.compilar(**filtros))
+        return [self.mapear(row) for row in result.mappings()]
+
+    async def stream_lotes(
+        self,
+        db: AsyncSession,
+        batch_size: int,
+        **filtros
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Lê o resultado do banco em lotes de `batch_size` linhas, entregando um lote por vez.
+        """
+        stmt = self.compilar(**filtros)
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions():
+            yield [self.mapear(row) for row in partition]
+
+    async def stream(self, db: AsyncSession, batch_size: int, **filtros) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Versão em fluxo de `listar`: entrega uma linha por vez, sem montar a lista completa.
+        """
+        async for lote in self.stream_lotes(db, batch_size, **filtros):
+            for row in lote:
+                yield row
+
+    async def contar(self, db: AsyncSession, **filtros) -> int:
+        stmt = self.compilar(**filtros).order_by(None)
+        return (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar_one()
+
+    async def pagina(
+        self,
+        db: AsyncSession,
+        limit: int,
+        cursor: str | None = None,
+        **filtros
+    ) -> Tuple[List[Dict[str, Any]], str | None]:
+        """
+        Página por cursor (keyset) sobre a ordenação do relatório: cada página parte da
+        posição da anterior, sem OFFSET. Retorna (linhas, próximo cursor).
+        Levanta ValueError se o cursor for inválido.
+        """
+        stmt = self.compilar(**filtros)
+        if cursor:
+            stmt = stmt.where(tuple_(*self._colunas_ordem) > tuple_(*self.decode_cursor(cursor)))
+
+        # Uma linha a mais indica se existe próxima página
+        rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+        next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [self.mapear(row) for row in rows[:limit]], next_cursor
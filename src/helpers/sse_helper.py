@@ -0,0 +1,38 @@
+# src/helpers/sse_helper.py
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Cabeçalhos das respostas em fluxo: sem cache e sem buffer em proxies (nginx)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Intervalo (ms) que o cliente aguarda antes de reconectar após uma queda
+SSE_RETRY_MS = 5000
+
+
+def formatar_evento(nome: str, dados: Any) -> bytes:
+    """
+    Serializa um evento no formato Server-Sent Events, com os dados em JSON.
+    """
+    return f"event: {nome}\ndata: {json.dumps(dados, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+
+async def iter_eventos(
+    fila: asyncio.Queue,
+    desconectado: Callable[[], Awaitable[bool]],
+    heartbeat: float
+) -> AsyncIterator[bytes]:
+    """
+    Envia os eventos da fila à medida que chegam (o campo 'tipo' vira o nome do evento),
+    até o cliente desconectar. Em conexões ociosas, envia um comentário a cada
+    `heartbeat` segundos, o que mantém proxies abertos e detecta clientes que saíram.
+    """
+    yield f"retry: {SSE_RETRY_MS}\n\n".encode("utf-8")
+    yield formatar_evento("pronto", {})
+    while not await desconectado():
+        try:
+            evento = await asyncio.wait_for(fila.get(), timeout=heartbeat)
+        except asyncio.TimeoutError:
+            yield b": keep-alive\n\n"
+            continue
+        yield formatar_evento(evento["tipo"], evento)
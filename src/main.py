@@ -1,4 +1,5 @@
 from fastapi import FastAPI, Request, Response, HTTPException
+import asyncio
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.responses import FileResponse
@@ -11,7 +12,11 @@ from dotenv import load_dotenv
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
-from .resources.database import DatabaseManager
+from .resources.database import DatabaseManager, PoolConfig, SQLITE_OPTIMIZE_INTERVAL_HOURS
+from .resources.render_pool import render_pool
+from .resources.export_jobs import export_job_manager
+from .resources.report_snapshots import REPORT_SNAPSHOT_HOUR, executar_diariamente
+from .controllers import resumo_controller, snapshot_controller
 from .models.base import Base
 from .models import * # Import all models for SQLAlchemy to discover
 
@@ -27,33 +32,67 @@ async def lifespan(app: FastAPI):
     # Initialize AGHU DB Manager and store in app.state
     aghu_dsn = os.getenv("POSTGRES_DSN")
     if aghu_dsn:
-        app.state.aghu_db = DatabaseManager(aghu_dsn)
+        app.state.aghu_db = DatabaseManager(aghu_dsn, pool=PoolConfig.from_env("AGHU_DB"))
         print("AGHU PostgreSQL connection pool initialized.")
     else:
         print("WARNING: POSTGRES_DSN not found. Skipping AGHU DB initialization.")
 
-    # Initialize App DB Manager (SQLite) and store in app.state
+    # Initialize App DB Manager (SQLite or PostgreSQL) and store in app.state
     app_dsn = os.getenv("SQLITE_DSN")
     if not app_dsn:
         raise ValueError("SQLITE_DSN not found in environment variables.")
-    app.state.app_db = DatabaseManager(app_dsn)
-    print("App SQLite connection pool initialized.")
-
-    # Create tables for App DB (if they don't exist) - for development only, Alembic handles this in production
-    async with app.state.app_db.engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("App SQLite tables checked/created.")
+    app.state.app_db = DatabaseManager(app_dsn, pool=PoolConfig.from_env("APP_DB"))
+    print(f"App DB connection pool initialized ({app.state.app_db.engine.dialect.name}).")
+
+    # Create tables for App DB (if they don't exist) - SQLite only, for development.
+    # Other databases (PostgreSQL) are managed exclusively by Alembic (`alembic upgrade head`).
+    if app.state.app_db.sqlite:
+        async with app.state.app_db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        print("App SQLite tables checked/created.")
+
+    # Carrega o resumo de atribuições se a tabela acabou de ser criada (bancos sem a migração)
+    async with app.state.app_db.async_session_maker() as session:
+        if await resumo_controller.resumo_vazio_com_atribuicoes(session):
+            linhas = await resumo_controller.reconstruir_resumo(session)
+            print(f"Assignment summary rebuilt ({linhas} rows).")
+
+    # Remove arquivos de exportação expirados deixados por execuções anteriores
+    export_job_manager.purge_orphans()
+
+    # Agenda a geração diária dos snapshots de relatórios, se configurada
+    snapshot_task = None
+    if REPORT_SNAPSHOT_HOUR:
+        async def gerar_snapshots():
+            async with app.state.app_db.read_session_maker() as session:
+                total = await snapshot_controller.gerar_snapshots(session)
+            print(f"Report snapshots generated ({total} files).")
+
+        snapshot_task = asyncio.create_task(executar_diariamente(int(REPORT_SNAPSHOT_HOUR), gerar_snapshots))
+        print(f"Report snapshots scheduled daily at {int(REPORT_SNAPSHOT_HOUR):02d}:00.")
+
+    # Atualiza periodicamente as estatísticas do planejador de consultas (SQLite)
+    optimize_task = None
+    if app.state.app_db.sqlite and SQLITE_OPTIMIZE_INTERVAL_HOURS > 0:
+        optimize_task = asyncio.create_task(app.state.app_db.otimizar_periodicamente(SQLITE_OPTIMIZE_INTERVAL_HOURS))
 
     yield
 
     # Shutdown
     print("Shutting down...")
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+    if optimize_task is not None:
+        optimize_task.cancel()
     if hasattr(app.state, 'aghu_db') and app.state.aghu_db:
         await app.state.aghu_db.close_connection()
         print("AGHU PostgreSQL connection pool closed.")
     if hasattr(app.state, 'app_db') and app.state.app_db:
         await app.state.app_db.close_connection()
-        print("App SQLite connection pool closed.")
+        print("App DB connection pool closed.")
+    await export_job_manager.shutdown()
+    render_pool.shutdown()
+    print("Report rendering pool closed.")
 
 app = FastAPI(
     title="Esqueleto de Aplicação Web Full-Stack",
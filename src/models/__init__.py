@@ -1,7 +1,9 @@
 from .base import Base
 from .refresh_token import RefreshToken
-from .usuario import Usuario, PerfilUsuario
+from .usuario import Usuario, PerfilUsuario, normalizar_user_id
 from .curso import Curso
 from .certificado import Certificado
 from .atribuicao import Atribuicao, StatusAtribuicao
 from .inscricao import Inscricao
+from .resumo_atribuicao import ResumoAtribuicao
+from .alteracao_atribuicao import AlteracaoAtribuicao
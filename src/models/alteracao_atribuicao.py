@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from .base import Base
+
+class AlteracaoAtribuicao(Base):
+    """
+    Registro sequencial das atribuições criadas, alteradas ou removidas, base do feed
+    incremental de capacitações. Gravado na mesma transação da alteração
+    (ver controllers/alteracao_controller.py); `seq` é a posição do cursor do feed.
+    """
+    __tablename__ = 'alteracoes_atribuicoes'
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    atribuicao_id = Column(String, nullable=False, doc="ID da atribuição alterada")
+    operacao = Column(String, nullable=False, doc="'upsert' (criada/alterada) ou 'delete' (removida)")
+    alterado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AlteracaoAtribuicao(seq={self.seq}, atribuicao_id='{self.atribuicao_id}', operacao='{self.operacao}')>"
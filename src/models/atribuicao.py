@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Boolean, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Boolean, Index, func
+from sqlalchemy.orm import relationship, validates
 from .base import Base
+from .usuario import normalizar_user_id
 import enum
 from datetime import datetime
 
@@ -14,6 +15,13 @@ class StatusAtribuicao(str, enum.Enum):
 
 class Atribuicao(Base):
     __tablename__ = 'atribuicoes'
+    __table_args__ = (
+        # Uma atribuição por usuário e curso; também atende às buscas só por user_id
+        Index('ix_atribuicoes_user_id_curso_id', 'user_id', 'curso_id', unique=True),
+        # Atribuições de um curso (por status) e pendências de validação por data de envio
+        Index('ix_atribuicoes_curso_id_status', 'curso_id', 'status'),
+        Index('ix_atribuicoes_status_data_conclusao', 'status', 'data_conclusao'),
+    )
 
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey('usuarios.id'), nullable=False)
@@ -30,5 +38,9 @@ class Atribuicao(Base):
     curso = relationship("Curso")
     certificado = relationship("Certificado") # New relationship
 
+    @validates("user_id")
+    def _normalizar_user_id(self, key, value):
+        return normalizar_user_id(value)
+
     def __repr__(self):
         return f"<Atribuicao(id={self.id}, user_id='{self.user_id}', curso_id={self.curso_id}, status='{self.status.value}')>"
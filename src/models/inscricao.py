@@ -1,18 +1,27 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, func
+from sqlalchemy.orm import relationship, validates
 from .base import Base
+from .usuario import normalizar_user_id
 
 class Inscricao(Base):
     __tablename__ = 'inscricoes'
+    __table_args__ = (
+        # Uma inscrição por usuário e curso; também atende às buscas só por user_id
+        Index('ix_inscricoes_user_id_curso_id', 'user_id', 'curso_id', unique=True),
+    )
 
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey('usuarios.id'), nullable=False)
-    curso_id = Column(String, ForeignKey('cursos.id'), nullable=False)
+    curso_id = Column(String, ForeignKey('cursos.id'), nullable=False, index=True)
     
     inscrito_em = Column(DateTime, server_default=func.now())
 
     usuario = relationship("Usuario")
     curso = relationship("Curso")
 
+    @validates("user_id")
+    def _normalizar_user_id(self, key, value):
+        return normalizar_user_id(value)
+
     def __repr__(self):
         return f"<Inscricao(id={self.id}, user_id='{self.user_id}', curso_id={self.curso_id})>"
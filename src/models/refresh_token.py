@@ -1,6 +1,8 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
 from sqlalchemy.sql import func
+from sqlalchemy.orm import validates
 from .base import Base
+from .usuario import normalizar_user_id
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
@@ -11,3 +13,7 @@ class RefreshToken(Base):
     groups = Column(JSON, nullable=True) # Store user groups
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
+
+    @validates("user_id")
+    def _normalizar_user_id(self, key, value):
+        return normalizar_user_id(value)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Enum
+from .base import Base
+from .atribuicao import StatusAtribuicao
+
+class ResumoAtribuicao(Base):
+    """
+    Contagem de atribuições por lotação, vínculo, ano GD e status.
+    Mantida incrementalmente pelos controllers que alteram atribuições
+    (ver controllers/resumo_controller.py). Valores nulos são gravados como ''.
+    """
+    __tablename__ = 'resumo_atribuicoes'
+
+    lotacao = Column(String, primary_key=True, default='', doc="Lotação do usuário")
+    vinculo = Column(String, primary_key=True, default='', doc="Vínculo do usuário")
+    ano_gd = Column(String, primary_key=True, default='', doc="Ano GD do curso")
+    status = Column(Enum(StatusAtribuicao), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ResumoAtribuicao(lotacao='{self.lotacao}', vinculo='{self.vinculo}', ano_gd='{self.ano_gd}', status='{self.status.value}', total={self.total})>"
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Enum
+from sqlalchemy import Column, String, Enum, Index
+from sqlalchemy.orm import validates
 from .base import Base
 
 import enum
@@ -8,8 +9,19 @@ class PerfilUsuario(enum.Enum):
     CHEFIA = "Chefia"
     UDP = "UDP"
 
+def normalizar_user_id(user_id: str | None) -> str | None:
+    """
+    Forma canônica do ID de usuário (sAMAccountName): sem espaços nas pontas e em minúsculas.
+    Todo ID é gravado nessa forma, então as buscas são por igualdade simples (usando índice).
+    """
+    return user_id.strip().lower() if user_id else user_id
+
 class Usuario(Base):
     __tablename__ = 'usuarios'
+    __table_args__ = (
+        # Relatórios por lotação (com ou sem filtro de vínculo) e relatórios gerais por vínculo
+        Index('ix_usuarios_lotacao_vinculo', 'lotacao', 'vinculo'),
+    )
 
     id = Column(String, primary_key=True, doc="sAMAccountName do usuário no AD")
     nome = Column(String, nullable=False, doc="displayName do usuário no AD")
@@ -20,7 +32,11 @@ class Usuario(Base):
     cargo = Column(String, nullable=True, doc="Cargo do usuário, vindo do AD (title)")
     matricula = Column(String, nullable=True, doc="Matrícula do usuário, vindo do AD (employeeNumber)")
     cpf = Column(String, nullable=True, unique=True, doc="CPF do usuário")
-    vinculo = Column(String, nullable=True, doc="Vínculo do usuário (RJU, EBSERH, etc.)")
+    vinculo = Column(String, nullable=True, index=True, doc="Vínculo do usuário (RJU, EBSERH, etc.)")
+
+    @validates("id")
+    def _normalizar_id(self, key, value):
+        return normalizar_user_id(value)
 
     def __repr__(self):
         return f"<Usuario(id='{self.id}', nome='{self.nome}', perfil='{self.perfil.value}')>"
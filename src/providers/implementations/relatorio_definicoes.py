@@ -0,0 +1,130 @@
+from typing import Any, Dict
+
+from ...helpers.report_engine import Coluna, Juncao, DefinicaoRelatorio
+from ...helpers.excel_helper import ResumoPorGrupo
+from ...models import Usuario, Curso, Atribuicao, Certificado, PerfilUsuario, StatusAtribuicao
+
+# Junções comuns aos relatórios de atribuições: usuário, curso e certificado (opcional)
+JUNCOES_ATRIBUICAO = (
+    Juncao(Usuario, Atribuicao.user_id == Usuario.id),
+    Juncao(Curso, Atribuicao.curso_id == Curso.id),
+    Juncao(Certificado, Atribuicao.certificado_id == Certificado.id, externa=True),
+)
+
+FILTRO_LOTACAO = {"lotacao": lambda lotacao: Usuario.lotacao == lotacao}
+FILTROS_ANO_VINCULO = {
+    "ano": lambda ano: Curso.ano_gd == str(ano),
+    "vinculo": lambda vinculo: Usuario.vinculo == vinculo,
+}
+
+# Atribuicao.id desempata linhas com mesmo nome e curso, tornando a ordem estável para paginação
+ORDEM_ATRIBUICAO = ("nome", "nome_curso", "atribuicao_id")
+
+
+def _ou_nao_informado(valor: Any) -> Any:
+    return valor or "Não informado"
+
+
+def _sim_nao(valor: Any) -> str:
+    return "Sim" if valor else "Não"
+
+
+def _isoformat(valor: Any) -> str | None:
+    return valor.isoformat() if valor else None
+
+
+def _resumo_consolidado() -> ResumoPorGrupo:
+    """
+    Planilhas de resumo do consolidado: status × lotação e indicadores por lotação.
+    """
+    return ResumoPorGrupo(
+        grupo="setor",
+        categoria="status",
+        categorias=StatusAtribuicao,
+        concluidas=(StatusAtribuicao.REALIZADO, StatusAtribuicao.CONCLUIDO, StatusAtribuicao.VALIDADO),
+        pessoa="id",
+        marcado=("certificado_enviado", "Sim"),
+        rotulo_grupo="Lotação",
+        rotulo_marcado="Certificados enviados",
+        titulos=("Resumo", "Por lotação"),
+    )
+
+
+CONSOLIDADO = DefinicaoRelatorio(
+    nome="consolidado",
+    origem=Atribuicao,
+    colunas=(
+        Coluna("id", Usuario.id),
+        Coluna("nome", Usuario.nome),
+        Coluna("vinculo", Usuario.vinculo, _ou_nao_informado),
+        Coluna("setor", Usuario.lotacao),
+        Coluna("nome_curso", Curso.titulo),
+        Coluna("certificadora", Curso.certificadora),
+        Coluna("carga_horaria", Curso.carga_horaria),
+        Coluna("ano_gd", Curso.ano_gd),
+        Coluna("status", Atribuicao.status),
+        Coluna("data_envio_certificado", Atribuicao.data_conclusao, _isoformat),
+        Coluna("vinculo_display", Usuario.vinculo, _ou_nao_informado),
+        Coluna("certificado_enviado", Certificado.id, _sim_nao),
+        Coluna("certificado_id", Certificado.id),
+        Coluna("certificado_file_path", Certificado.file_path),
+        Coluna("certificado_link", Certificado.link),
+        Coluna("atribuicao_id", Atribuicao.id, exportar=False),
+    ),
+    juncoes=JUNCOES_ATRIBUICAO,
+    filtros={**FILTRO_LOTACAO, **FILTROS_ANO_VINCULO},
+    ordem=ORDEM_ATRIBUICAO,
+    escopo="lotacao",
+    perfis=(PerfilUsuario.CHEFIA.value, PerfilUsuario.UDP.value),
+    resumo=_resumo_consolidado,
+)
+
+CAPACITACOES = DefinicaoRelatorio(
+    nome="capacitacoes",
+    origem=Atribuicao,
+    colunas=(
+        Coluna("id", Usuario.id),
+        Coluna("cpf", Usuario.cpf),
+        Coluna("vinculo", Usuario.vinculo),
+        Coluna("setor", Usuario.lotacao),
+        Coluna("nome_profissional", Usuario.nome),
+        Coluna("ano_gd", Curso.ano_gd),
+        Coluna("nome_curso", Curso.titulo),
+        Coluna("carga_horaria", Curso.carga_horaria),
+        Coluna("plataforma", Curso.certificadora),
+        Coluna("tema", Curso.tema),
+        # Apenas indica se há certificado; o caminho do arquivo não sai no relatório
+        Coluna("certificado", Certificado.file_path, _sim_nao),
+        Coluna("atribuicao_id", Atribuicao.id, exportar=False),
+    ),
+    juncoes=JUNCOES_ATRIBUICAO,
+    filtros=FILTROS_ANO_VINCULO,
+    ordem=("nome_profissional", "nome_curso", "atribuicao_id"),
+    perfis=(PerfilUsuario.UDP.value,),
+)
+
+# Dataset analítico das capacitações: as colunas do relatório acrescidas dos dados da
+# atribuição, com os tipos originais (datas, inteiros, booleanos) para o Parquet/Arrow
+DATASET_CAPACITACOES = DefinicaoRelatorio(
+    nome="dataset_capacitacoes",
+    origem=Atribuicao,
+    colunas=(
+        *(coluna for coluna in CAPACITACOES.colunas if coluna.exportar and coluna.chave != "certificado"),
+        Coluna("atribuicao_id", Atribuicao.id),
+        Coluna("curso_id", Atribuicao.curso_id),
+        Coluna("status", Atribuicao.status, lambda status: status.value if status else None),
+        Coluna("atribuido_em", Atribuicao.atribuido_em),
+        Coluna("data_conclusao", Atribuicao.data_conclusao),
+        Coluna("data_validacao", Atribuicao.data_validacao),
+        Coluna("certificado", Certificado.file_path, lambda path: path is not None),
+    ),
+    juncoes=JUNCOES_ATRIBUICAO,
+    filtros=FILTROS_ANO_VINCULO,
+    ordem=("atribuicao_id",),
+    perfis=(PerfilUsuario.UDP.value,),
+)
+
+# Relatórios disponíveis pelo nome, em todos os formatos de saída
+RELATORIOS: Dict[str, DefinicaoRelatorio] = {
+    definicao.nome: definicao for definicao in (CONSOLIDADO, CAPACITACOES)
+}
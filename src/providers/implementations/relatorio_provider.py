@@ -1,10 +1,36 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Tuple
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, case
-from sqlalchemy.orm import selectinload
 
 from ..interfaces.relatorio_provider_interface import RelatorioProviderInterface
-from ...models import Usuario, Curso, Atribuicao, Certificado
+from .relatorio_definicoes import CAPACITACOES, DATASET_CAPACITACOES
+from ...models import Usuario, Curso, Atribuicao, ResumoAtribuicao, StatusAtribuicao
+
+# Status considerados concluídos no progresso da equipe
+STATUS_CONCLUIDOS = (StatusAtribuicao.REALIZADO, StatusAtribuicao.CONCLUIDO, StatusAtribuicao.VALIDADO)
+
+
+def _intervalo_do_ano(ano: str) -> Tuple[datetime, datetime]:
+    """
+    [1º de janeiro, 1º de janeiro do ano seguinte) do ano informado.
+    Levanta ValueError se o ano não for numérico ou estiver fora do intervalo de datas.
+    """
+    try:
+        inicio = datetime(int(ano), 1, 1)
+        return inicio, inicio.replace(year=inicio.year + 1)
+    except OverflowError:
+        # Anos grandes demais para o C (ex: 99999999999) não chegam ao ValueError de datetime
+        raise ValueError(f"Ano fora do intervalo: {ano}")
+
+
+def _no_ano(coluna, ano: str):
+    """
+    Condição "data no ano" como intervalo, que aproveita índices na coluna
+    (ao contrário de extrair o ano com strftime). Levanta ValueError se o ano for inválido.
+    """
+    inicio, fim = _intervalo_do_ano(ano)
+    return (coluna >= inicio) & (coluna < fim)
 
 class RelatorioProvider(RelatorioProviderInterface):
     """
@@ -24,46 +50,33 @@ class RelatorioProvider(RelatorioProviderInterface):
         para o relatório de capacitações.
         Suporta filtros opcionais por ano e vínculo.
         """
-        # Define a query principal, começando por Atribuicao para ligar Usuario e Curso
-        query = (
-            select(
-                Usuario.id,
-                Usuario.cpf,
-                Usuario.vinculo,
-                Usuario.lotacao.label("setor"),
-                Usuario.nome.label("nome_profissional"),
-                Curso.ano_gd,
-                Curso.titulo.label("nome_curso"),
-                Curso.carga_horaria,
-                Curso.certificadora.label("plataforma"),
-                Curso.tema,
-                Certificado.file_path.label("certificado_path"),
-            )
-            .select_from(Atribuicao) # Define explicitamente o ponto de partida da query
-            .join(Usuario, Atribuicao.user_id == Usuario.id)
-            .join(Curso, Atribuicao.curso_id == Curso.id)
-            .outerjoin(Certificado, Atribuicao.certificado_id == Certificado.id) # LEFT JOIN para incluir cursos sem certificado
-        )
+        return await CAPACITACOES.listar(self.session, ano=ano, vinculo=vinculo)
 
-        # Aplicar filtro por vínculo
-        if vinculo:
-            query = query.where(Usuario.vinculo == vinculo)
+    def stream_dados_capacitacoes(
+        self,
+        ano: str | None = None,
+        vinculo: str | None = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Entrega as linhas do relatório de capacitações uma a uma, lendo o banco
+        em lotes de `batch_size` linhas.
+        Suporta filtros opcionais por ano e vínculo.
+        """
+        return CAPACITACOES.stream(self.session, batch_size, ano=ano, vinculo=vinculo)
 
-        # Aplicar filtro por ano
-        if ano:
-            query = query.where(Curso.ano_gd == str(ano))
-        
-        result = await self.session.execute(query)
-        
-        report_data = []
-        for row in result.mappings():
-            # Mapeia o resultado para o formato desejado, tratando a presença do certificado
-            data = dict(row)
-            data["certificado"] = "Sim" if data["certificado_path"] else "Não"
-            del data["certificado_path"] # Remove o path interno do relatório final
-            report_data.append(data)
-            
-        return report_data
+    def stream_lotes_dataset_capacitacoes(
+        self,
+        ano: str | None = None,
+        vinculo: str | None = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Dataset analítico das capacitações, em lotes de até `batch_size` linhas.
+        Parte das mesmas colunas do relatório de capacitações, acrescentando os dados
+        da atribuição e mantendo os tipos originais (datas, inteiros, booleanos).
+        """
+        return DATASET_CAPACITACOES.stream_lotes(self.session, batch_size, ano=ano, vinculo=vinculo)
 
     async def get_status_lotacao(
         self,
@@ -74,7 +87,20 @@ class RelatorioProvider(RelatorioProviderInterface):
         """
         Retorna o status consolidado das atribuições para uma lotação específica (KPIs).
         Suporta filtros opcionais por ano e vínculo.
+        Sem filtro de ano, a contagem vem do resumo de atribuições; o filtro de ano usa
+        a data de conclusão de cada atribuição, que o resumo não guarda.
         """
+        if not ano:
+            resumo = (
+                select(ResumoAtribuicao.status, func.sum(ResumoAtribuicao.total).label("total"))
+                .where(ResumoAtribuicao.lotacao == lotacao)
+                .group_by(ResumoAtribuicao.status)
+            )
+            if vinculo:
+                resumo = resumo.where(ResumoAtribuicao.vinculo == vinculo)
+            result = await self.session.execute(resumo)
+            return [{"name": row.status.value, "value": row.total} for row in result.all()]
+
         query = (
             select(
                 Atribuicao.status,
@@ -89,7 +115,7 @@ class RelatorioProvider(RelatorioProviderInterface):
 
         # Filtro por ano via data_conclusao
         if ano:
-            query = query.where(func.strftime('%Y', Atribuicao.data_conclusao) == str(ano))
+            query = query.where(_no_ano(Atribuicao.data_conclusao, ano))
 
         query = query.group_by(Atribuicao.status)
         result = await self.session.execute(query)
@@ -104,10 +130,18 @@ class RelatorioProvider(RelatorioProviderInterface):
     ) -> List[Dict[str, Any]]:
         """
         Retorna o progresso individual detalhado dos membros da equipe da lotação.
-        Suporta filtros opcionais por ano e vínculo.
+        Suporta filtros opcionais por ano e vínculo; com ano, contam as atribuições
+        dos cursos daquele ano GD (pendentes inclusive), como nos demais relatórios.
+        Levanta ValueError se o ano for inválido.
         """
-        # Calcula o progresso por usuário no setor
-        # Status considerados concluídos: 'Realizado', 'Concluído', 'Validado'
+        # Uma única agregação condicional por usuário. O filtro de ano fica na condição
+        # do LEFT JOIN: membros sem atribuições no ano continuam na lista, com progresso 0
+        condicao_juncao = Usuario.id == Atribuicao.user_id
+        if ano:
+            _intervalo_do_ano(ano)  # mesma validação dos filtros por data
+            cursos_do_ano = select(Curso.id).where(Curso.ano_gd == str(ano))
+            condicao_juncao = condicao_juncao & Atribuicao.curso_id.in_(cursos_do_ano)
+
         stmt = (
             select(
                 Usuario.id,
@@ -118,21 +152,15 @@ class RelatorioProvider(RelatorioProviderInterface):
                 func.count(Atribuicao.id).label("total_atribuicoes"),
                 func.sum(
                     case(
-                        (Atribuicao.status.in_(['Realizado', 'Concluído', 'Validado']), 1),
+                        (Atribuicao.status.in_(STATUS_CONCLUIDOS), 1),
                         else_=0
                     )
                 ).label("total_concluido")
             )
-            .outerjoin(Atribuicao, Usuario.id == Atribuicao.user_id)
+            .outerjoin(Atribuicao, condicao_juncao)
             .where(Usuario.lotacao == lotacao)
         )
 
-        # Aplicar filtro por ano (usando data_conclusao da Atribuicao)
-        if ano:
-            stmt = stmt.outerjoin(
-                Atribuicao, (Usuario.id == Atribuicao.user_id) & (Atribuicao.data_conclusao != None)
-            )
-
         # Aplicar filtro por vínculo
         if vinculo:
             stmt = stmt.where(Usuario.vinculo == vinculo)
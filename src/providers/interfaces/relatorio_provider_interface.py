@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 
 class RelatorioProviderInterface(ABC):
     """
@@ -21,6 +21,32 @@ class RelatorioProviderInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def stream_dados_capacitacoes(
+        self,
+        ano: str | None = None,
+        vinculo: str | None = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Versão em fluxo de `listar_dados_capacitacoes`: entrega as linhas uma a uma,
+        lendo a fonte de dados em lotes, sem acumular o relatório em memória.
+        """
+        pass
+
+    @abstractmethod
+    def stream_lotes_dataset_capacitacoes(
+        self,
+        ano: str | None = None,
+        vinculo: str | None = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Dataset analítico das capacitações (usuário, curso, atribuição e certificado),
+        com valores tipados, entregue em lotes de até `batch_size` linhas.
+        """
+        pass
+
     @abstractmethod
     async def get_status_lotacao(
         self,
@@ -1,20 +1,184 @@
 # src/resources/database.py
 
-from typing import AsyncGenerator
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict
 from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
+from .pool_metrics import MonitoredQueuePool, estado_do_pool
+
+logger = logging.getLogger(__name__)
+
+# Perfil das conexões SQLite (aplicado a cada nova conexão do pool).
+# WAL permite leituras simultâneas a uma escrita; busy_timeout faz a conexão aguardar
+# o bloqueio de outra escrita em vez de falhar com "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Valor negativo = tamanho em KiB por conexão (padrão: 64 MiB)
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+SQLITE_FOREIGN_KEYS = os.getenv("SQLITE_FOREIGN_KEYS", "true").lower() in ("1", "true", "yes", "on")
+# Intervalo (horas) entre execuções de PRAGMA optimize; 0 = apenas ao encerrar
+SQLITE_OPTIMIZE_INTERVAL_HOURS = float(os.getenv("SQLITE_OPTIMIZE_INTERVAL_HOURS", "6"))
+
+# Valores numéricos devolvidos pelo SQLite para os pragmas com nomes
+_SYNCHRONOUS = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+_TEMP_STORE = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    Pragmas aplicados a cada conexão SQLite, na ordem de aplicação. O busy_timeout vem
+    primeiro para que a troca do journal_mode também aguarde bloqueios de outros processos.
+    """
+    return {
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": SQLITE_JOURNAL_MODE,
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "cache_size": SQLITE_CACHE_SIZE,
+        "mmap_size": SQLITE_MMAP_SIZE,
+        "temp_store": SQLITE_TEMP_STORE,
+        "foreign_keys": "ON" if SQLITE_FOREIGN_KEYS else "OFF",
+    }
+
+
+def _env_bool(nome: str, padrao: bool) -> bool:
+    return os.getenv(nome, str(padrao)).lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """
+    Parâmetros do pool de conexões de um banco. Os padrões são os do SQLAlchemy;
+    `from_env` lê cada um de `<PREFIXO>_POOL_SIZE`, `<PREFIXO>_MAX_OVERFLOW`,
+    `<PREFIXO>_POOL_TIMEOUT` (s), `<PREFIXO>_POOL_PRE_PING`, `<PREFIXO>_POOL_RECYCLE` (s,
+    -1 = nunca) e `<PREFIXO>_STATEMENT_TIMEOUT_MS` (0 = sem limite).
+    """
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_pre_ping: bool = False
+    pool_recycle: int = -1
+    statement_timeout_ms: int = 0
+
+    @classmethod
+    def from_env(cls, prefixo: str) -> "PoolConfig":
+        return cls(
+            pool_size=int(os.getenv(f"{prefixo}_POOL_SIZE", cls.pool_size)),
+            max_overflow=int(os.getenv(f"{prefixo}_MAX_OVERFLOW", cls.max_overflow)),
+            pool_timeout=float(os.getenv(f"{prefixo}_POOL_TIMEOUT", cls.pool_timeout)),
+            pool_pre_ping=_env_bool(f"{prefixo}_POOL_PRE_PING", cls.pool_pre_ping),
+            pool_recycle=int(os.getenv(f"{prefixo}_POOL_RECYCLE", cls.pool_recycle)),
+            statement_timeout_ms=int(os.getenv(f"{prefixo}_STATEMENT_TIMEOUT_MS", cls.statement_timeout_ms)),
+        )
+
+
+def _statement_timeout_args(url: URL, timeout_ms: int) -> Dict[str, Any]:
+    """
+    `connect_args` que limitam a duração de cada comando no servidor. Suportado no
+    PostgreSQL (asyncpg e psycopg); nos demais bancos o limite é ignorado.
+    """
+    if not timeout_ms:
+        return {}
+    if url.get_backend_name() == "postgresql":
+        if url.get_driver_name() == "asyncpg":
+            return {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        return {"options": f"-c statement_timeout={timeout_ms}"}
+    logger.warning("statement_timeout não suportado em %s; ignorado", url.get_backend_name())
+    return {}
+
+
+def _sqlite_em_arquivo(url: URL) -> bool:
+    return url.database not in (None, "", ":memory:") and url.query.get("mode") != "memory"
+
+
 class DatabaseManager:
     """
     Manages asynchronous database connections and sessions for a specific DSN.
+    Em bancos SQLite, aplica o perfil de pragmas (`sqlite_pragmas`) a cada conexão.
+
+    Em SQLite com arquivo, mantém dois pools: `engine`, com uma única conexão, por onde
+    passam todas as escritas do processo (que assim aguardam a vez na fila do pool, em
+    vez de disputar o bloqueio do arquivo), e `read_engine`, com conexões somente
+    leitura (PRAGMA query_only) para relatórios e listagens. Em WAL, as leituras não
+    esperam pela escrita em andamento e veem o último estado confirmado.
+    Nos demais bancos (e no SQLite em memória), os dois apontam para o mesmo pool.
+
+    Os pools seguem `pool` (PoolConfig; no pool de escrita do SQLite, o tamanho é
+    sempre 1) e registram métricas de uso, consultadas em `metricas_pool`.
     """
-    def __init__(self, dsn: str):
-        self.engine: AsyncEngine = create_async_engine(dsn, echo=False) # Set echo=False to reduce log verbosity
+    def __init__(self, dsn: str, pragmas: Dict[str, Any] | None = None, pool: PoolConfig | None = None):
+        url = make_url(dsn)
+        self.sqlite = url.get_backend_name() == "sqlite"
+        self.pool_leitura_separado = self.sqlite and _sqlite_em_arquivo(url)
+        self.pool_config = pool or PoolConfig()
+
+        opcoes_escrita = self._opcoes_pool(url)
+        if self.pool_leitura_separado:
+            opcoes_escrita.update(pool_size=1, max_overflow=0)
+        self.engine: AsyncEngine = create_async_engine(dsn, echo=False, **opcoes_escrita) # Set echo=False to reduce log verbosity
         self.async_session_maker = sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
+        self.read_engine: AsyncEngine = self.engine
+        self.read_session_maker = self.async_session_maker
+        if self.pool_leitura_separado:
+            self.read_engine = create_async_engine(dsn, echo=False, **self._opcoes_pool(url))
+            self.read_session_maker = sessionmaker(
+                self.read_engine, class_=AsyncSession, expire_on_commit=False
+            )
+
+        self.pragmas: Dict[str, Any] = {}
+        self.ultimo_optimize: datetime | None = None
+        if self.sqlite:
+            self.pragmas = sqlite_pragmas() if pragmas is None else pragmas
+            event.listen(self.engine.sync_engine, "connect", self._aplicar_pragmas)
+            if self.pool_leitura_separado:
+                event.listen(self.read_engine.sync_engine, "connect", self._aplicar_pragmas_leitura)
+
+    def _opcoes_pool(self, url: URL) -> Dict[str, Any]:
+        """
+        Argumentos de `create_async_engine` para o pool monitorado, conforme `pool_config`.
+        O SQLite em memória mantém o pool padrão do SQLAlchemy (uma única conexão).
+        """
+        if self.sqlite and not _sqlite_em_arquivo(url):
+            return {}
+        config = self.pool_config
+        opcoes: Dict[str, Any] = {
+            "poolclass": MonitoredQueuePool,
+            "pool_size": config.pool_size,
+            "max_overflow": config.max_overflow,
+            "pool_timeout": config.pool_timeout,
+            "pool_pre_ping": config.pool_pre_ping,
+            "pool_recycle": config.pool_recycle,
+        }
+        connect_args = _statement_timeout_args(url, config.statement_timeout_ms)
+        if connect_args:
+            opcoes["connect_args"] = connect_args
+        return opcoes
+
+    def _aplicar_pragmas(self, dbapi_connection, connection_record, somente_leitura: bool = False):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in self.pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+            if somente_leitura:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+    def _aplicar_pragmas_leitura(self, dbapi_connection, connection_record):
+        self._aplicar_pragmas(dbapi_connection, connection_record, somente_leitura=True)
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         """
@@ -26,11 +190,97 @@ class DatabaseManager:
             finally:
                 await session.close()
 
+    async def get_read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Sessão do pool de leitura, para rotas que apenas consultam dados.
+        """
+        async with self.read_session_maker() as session:
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    async def otimizar(self):
+        """
+        Executa PRAGMA optimize (SQLite): atualiza as estatísticas usadas pelo planejador
+        de consultas nas tabelas que mudaram desde a última execução. Sem efeito em outros bancos.
+        """
+        if not self.sqlite:
+            return
+        async with self.engine.connect() as conn:
+            await conn.exec_driver_sql("PRAGMA optimize")
+        self.ultimo_optimize = datetime.now()
+
+    async def otimizar_periodicamente(self, intervalo_horas: float = SQLITE_OPTIMIZE_INTERVAL_HOURS):
+        """
+        Executa `otimizar` a cada `intervalo_horas`, até ser cancelada.
+        Falhas são registradas no log e não interrompem o agendamento.
+        """
+        while True:
+            await asyncio.sleep(intervalo_horas * 3600)
+            try:
+                await self.otimizar()
+            except Exception:
+                logger.exception("Erro ao executar PRAGMA optimize")
+
+    async def diagnostico(self) -> Dict[str, Any]:
+        """
+        Configuração efetiva do banco, lida de uma conexão do pool: em SQLite, o valor
+        atual de cada pragma do perfil (ao lado do configurado), a versão do SQLite e
+        o horário do último PRAGMA optimize.
+        """
+        dados: Dict[str, Any] = {"dialeto": self.engine.dialect.name}
+        if not self.sqlite:
+            return dados
+
+        async with self.read_engine.connect() as conn:
+            efetivos = {
+                nome: (await conn.exec_driver_sql(f"PRAGMA {nome}")).scalar()
+                for nome in self.pragmas
+            }
+            versao = (await conn.exec_driver_sql("SELECT sqlite_version()")).scalar()
+        if "synchronous" in efetivos:
+            efetivos["synchronous"] = _SYNCHRONOUS.get(efetivos["synchronous"], efetivos["synchronous"])
+        if "temp_store" in efetivos:
+            efetivos["temp_store"] = _TEMP_STORE.get(efetivos["temp_store"], efetivos["temp_store"])
+        if "foreign_keys" in efetivos:
+            efetivos["foreign_keys"] = "ON" if efetivos["foreign_keys"] else "OFF"
+
+        dados.update({
+            "sqlite_version": versao,
+            "pragmas": efetivos,
+            "pragmas_configurados": self.pragmas,
+            "ultimo_optimize": self.ultimo_optimize.isoformat() if self.ultimo_optimize else None,
+            "pool_leitura_separado": self.pool_leitura_separado,
+        })
+        return dados
+
+    def metricas_pool(self) -> Dict[str, Any]:
+        """
+        Configuração e estado atual dos pools (escrita e, quando separado, leitura):
+        conexões em uso, requisições aguardando e o histograma de latência de checkout.
+        """
+        dados: Dict[str, Any] = {
+            "dialeto": self.engine.dialect.name,
+            "configuracao": asdict(self.pool_config),
+            "escrita": estado_do_pool(self.engine.pool),
+        }
+        if self.pool_leitura_separado:
+            dados["leitura"] = estado_do_pool(self.read_engine.pool)
+        return dados
+
     async def close_connection(self):
         """
         Closes all connections in the engine's connection pool.
+        Em SQLite, executa antes um PRAGMA optimize (recomendado ao encerrar a aplicação).
         """
+        try:
+            await self.otimizar()
+        except Exception:
+            logger.exception("Erro ao executar PRAGMA optimize")
         await self.engine.dispose()
+        if self.read_engine is not self.engine:
+            await self.read_engine.dispose()
 
 async def get_aghu_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
@@ -47,3 +297,12 @@ async def get_app_db_session(request: Request) -> AsyncGenerator[AsyncSession, N
     app_db_manager: DatabaseManager = request.app.state.app_db
     async for session in app_db_manager.get_session():
         yield session
+
+async def get_app_db_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for FastAPI to get a read-only application database session.
+    Usada por relatórios e listagens: não disputa o pool de escrita (login, uploads, validações).
+    """
+    app_db_manager: DatabaseManager = request.app.state.app_db
+    async for session in app_db_manager.get_read_session():
+        yield session
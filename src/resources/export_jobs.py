@@ -0,0 +1,198 @@
+# src/resources/export_jobs.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Diretório onde os arquivos gerados ficam guardados até expirarem
+EXPORTS_DIR = os.getenv("EXPORTS_DIR", "exports")
+# Tempo (segundos) que um arquivo pronto continua disponível e reaproveitável
+EXPORT_JOB_TTL_SECONDS = int(os.getenv("EXPORT_JOB_TTL_SECONDS", "600"))
+
+STATUS_PENDENTE = "pendente"
+STATUS_PROCESSANDO = "processando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+
+Producer = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class ExportJob:
+    """
+    Uma exportação de relatório gerada em segundo plano.
+    `lotacao` é o escopo dos dados do arquivo (None = todas as lotações).
+    """
+    id: str
+    key: str
+    relatorio: str
+    formato: str
+    filename: str
+    media_type: str
+    lotacao: str | None
+    path: str
+    status: str = STATUS_PENDENTE
+    erro: str | None = None
+    criado_em: float = field(default_factory=time.time)
+    concluido_em: float | None = None
+    _done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def expira_em(self) -> float | None:
+        if self.concluido_em is None:
+            return None
+        return self.concluido_em + EXPORT_JOB_TTL_SECONDS
+
+    def expirado(self, agora: float | None = None) -> bool:
+        expira_em = self.expira_em
+        return expira_em is not None and (agora or time.time()) >= expira_em
+
+
+def job_key(**params: Any) -> str:
+    """
+    Gera a chave de deduplicação a partir dos parâmetros que definem o conteúdo do arquivo.
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExportJobManager:
+    """
+    Registro em memória das exportações assíncronas.
+
+    Pedidos com a mesma chave (relatório, formato e filtros efetivos, incluindo o escopo
+    de lotação) compartilham uma única renderização: enquanto o job está em andamento ou o
+    arquivo ainda não expirou, o mesmo job é devolvido. Arquivos expirados são removidos
+    do disco na próxima operação.
+    """
+    def __init__(self, directory: str = EXPORTS_DIR):
+        self.directory = directory
+        self._jobs: Dict[str, ExportJob] = {}
+        self._by_key: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        key: str,
+        relatorio: str,
+        formato: str,
+        filename: str,
+        media_type: str,
+        lotacao: str | None,
+        producer: Producer
+    ) -> ExportJob:
+        """
+        Retorna o job existente para `key` ou agenda um novo, executando `producer(path)`
+        para gravar o arquivo no caminho indicado.
+        """
+        self.purge_expired()
+
+        existing_id = self._by_key.get(key)
+        if existing_id:
+            existing = self._jobs.get(existing_id)
+            if existing and existing.status != STATUS_ERRO:
+                return existing
+
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = str(uuid4())
+        extension = os.path.splitext(filename)[1]
+        job = ExportJob(
+            id=job_id,
+            key=key,
+            relatorio=relatorio,
+            formato=formato,
+            filename=filename,
+            media_type=media_type,
+            lotacao=lotacao,
+            path=os.path.join(self.directory, f"{job_id}{extension}"),
+        )
+        self._jobs[job_id] = job
+        self._by_key[key] = job_id
+        self._tasks[job_id] = asyncio.create_task(self._run(job, producer))
+        return job
+
+    async def _run(self, job: ExportJob, producer: Producer):
+        job.status = STATUS_PROCESSANDO
+        tmp_path = f"{job.path}.part"
+        try:
+            await producer(tmp_path)
+            os.replace(tmp_path, job.path)
+            job.status = STATUS_CONCLUIDO
+        except Exception as e:
+            logger.exception(f"Erro ao gerar exportação {job.id}")
+            job.status = STATUS_ERRO
+            job.erro = str(e)
+            _remove_file(tmp_path)
+        finally:
+            job.concluido_em = time.time()
+            job._done.set()
+            self._tasks.pop(job.id, None)
+
+    def get(self, job_id: str) -> ExportJob | None:
+        self.purge_expired()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: ExportJob, timeout: float) -> ExportJob:
+        """
+        Aguarda a conclusão do job por até `timeout` segundos (long polling).
+        """
+        if timeout > 0 and not job._done.is_set():
+            try:
+                await asyncio.wait_for(job._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def purge_expired(self):
+        """
+        Remove do registro e do disco os jobs cujo arquivo já expirou.
+        """
+        agora = time.time()
+        for job in [j for j in self._jobs.values() if j.expirado(agora)]:
+            self._jobs.pop(job.id, None)
+            if self._by_key.get(job.key) == job.id:
+                self._by_key.pop(job.key, None)
+            _remove_file(job.path)
+
+    def purge_orphans(self):
+        """
+        Remove arquivos deixados por execuções anteriores da aplicação e já expirados.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        known = {job.path for job in self._jobs.values()}
+        limite = time.time() - EXPORT_JOB_TTL_SECONDS
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path not in known and os.path.isfile(path) and os.path.getmtime(path) < limite:
+                _remove_file(path)
+
+    async def shutdown(self):
+        """
+        Cancela as exportações em andamento.
+        """
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _remove_file(path: str):
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        # Ignora erros ao remover arquivos temporários (ex: já removido)
+        pass
+
+
+export_job_manager = ExportJobManager()
@@ -0,0 +1,94 @@
+# src/resources/live_events.py
+
+import asyncio
+import os
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Eventos guardados por conexão enquanto o cliente não os consome; ao exceder,
+# a fila é descartada e o cliente recebe um pedido de recarga ('resync')
+LIVE_EVENTS_QUEUE_SIZE = int(os.getenv("LIVE_EVENTS_QUEUE_SIZE", "100"))
+# Intervalo (segundos) dos comentários de keep-alive enviados em conexões ociosas
+LIVE_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("LIVE_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# Evento que substitui a fila de um assinante lento: o cliente deve recarregar os contadores
+RESYNC = {"tipo": "resync"}
+
+_PENDENTES = "live_events_pendentes"
+
+
+class EventBroker:
+    """
+    Distribuição de eventos em memória (por processo) para as conexões abertas,
+    separada por escopo (ex: 'usuario:<id>', 'lotacao:<nome>', 'geral').
+
+    Cada assinante tem uma fila limitada. Um assinante que não acompanha o ritmo
+    não atrasa os demais: sua fila é trocada por um único evento de 'resync'.
+    """
+    def __init__(self, queue_size: int = LIVE_EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._assinantes: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    @contextmanager
+    def assinar(self, escopos: Iterable[str]) -> Iterator[asyncio.Queue]:
+        """
+        Registra uma fila nos escopos informados enquanto o bloco estiver aberto.
+        """
+        fila: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        escopos = set(escopos)
+        for escopo in escopos:
+            self._assinantes[escopo].add(fila)
+        try:
+            yield fila
+        finally:
+            for escopo in escopos:
+                self._assinantes[escopo].discard(fila)
+                if not self._assinantes[escopo]:
+                    del self._assinantes[escopo]
+
+    def publicar(self, escopo: str, evento: Dict[str, Any]) -> int:
+        """
+        Entrega o evento às filas do escopo. Retorna quantas o receberam.
+        """
+        filas = self._assinantes.get(escopo, ())
+        for fila in filas:
+            try:
+                fila.put_nowait(evento)
+            except asyncio.QueueFull:
+                while not fila.empty():
+                    fila.get_nowait()
+                fila.put_nowait(RESYNC)
+        return len(filas)
+
+    def total_assinantes(self) -> int:
+        return len({fila for filas in self._assinantes.values() for fila in filas})
+
+
+event_broker = EventBroker()
+
+
+def agendar_contadores(session: Any, escopo: str, deltas: Dict[str, int]) -> None:
+    """
+    Acumula variações de contadores de um escopo na sessão. Elas só são publicadas
+    quando a transação é confirmada (commit) e são descartadas em caso de rollback.
+    Aceita tanto a AsyncSession quanto a Session síncrona (ambas expõem o mesmo `info`).
+    """
+    pendentes: Dict[str, Counter] = session.info.setdefault(_PENDENTES, defaultdict(Counter))
+    pendentes[escopo].update(deltas)
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_pendentes(session: Session) -> None:
+    for escopo, deltas in session.info.pop(_PENDENTES, {}).items():
+        deltas = {chave: valor for chave, valor in deltas.items() if valor}
+        if deltas:
+            event_broker.publicar(escopo, {"tipo": "contadores", "escopo": escopo.split(":", 1)[0], "deltas": deltas})
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendentes(session: Session) -> None:
+    session.info.pop(_PENDENTES, None)
@@ -0,0 +1,99 @@
+# src/resources/pool_metrics.py
+
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+# Limites superiores (ms) das faixas do histograma de latência de checkout
+LATENCIA_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """
+    Contadores de uso de um pool de conexões: quantas requisições aguardam uma
+    conexão agora, picos, checkouts, timeouts e o histograma do tempo de checkout
+    (espera na fila do pool + abertura de conexão nova + pre-ping, quando ativo).
+    """
+    def __init__(self):
+        self.aguardando = 0
+        self.pico_aguardando = 0
+        self.pico_em_uso = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.latencia_total_ms = 0.0
+        self.latencia_maxima_ms = 0.0
+        # Uma posição por faixa de LATENCIA_BUCKETS_MS, mais a faixa acima da última
+        self.histograma = [0] * (len(LATENCIA_BUCKETS_MS) + 1)
+
+    def registrar_checkout(self, latencia_ms: float, em_uso: int):
+        self.checkouts += 1
+        self.latencia_total_ms += latencia_ms
+        self.latencia_maxima_ms = max(self.latencia_maxima_ms, latencia_ms)
+        self.pico_em_uso = max(self.pico_em_uso, em_uso)
+        for i, limite in enumerate(LATENCIA_BUCKETS_MS):
+            if latencia_ms <= limite:
+                self.histograma[i] += 1
+                break
+        else:
+            self.histograma[-1] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        faixas = [str(limite) for limite in LATENCIA_BUCKETS_MS] + ["+Inf"]
+        return {
+            "aguardando": self.aguardando,
+            "pico_aguardando": self.pico_aguardando,
+            "pico_em_uso": self.pico_em_uso,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "latencia_ms": {
+                "media": round(self.latencia_total_ms / self.checkouts, 3) if self.checkouts else None,
+                "maxima": round(self.latencia_maxima_ms, 3),
+                # Contagem por faixa (ms): cada checkout entra na primeira faixa cujo limite não ultrapassa
+                "histograma": dict(zip(faixas, self.histograma)),
+            },
+        }
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool que mede cada checkout em `metricas` (ver PoolMetrics).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas = PoolMetrics()
+
+    def connect(self):
+        metricas = self.metricas
+        metricas.aguardando += 1
+        metricas.pico_aguardando = max(metricas.pico_aguardando, metricas.aguardando)
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except PoolTimeoutError:
+            metricas.timeouts += 1
+            raise
+        finally:
+            metricas.aguardando -= 1
+        metricas.registrar_checkout((time.perf_counter() - inicio) * 1000, self.checkedout())
+        return conexao
+
+
+def estado_do_pool(pool: Pool) -> Dict[str, Any]:
+    """
+    Estado atual do pool (conexões em uso, ociosas e em overflow) e, em pools
+    monitorados, as métricas acumuladas desde a criação.
+    """
+    dados: Dict[str, Any] = {"classe": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        dados.update({
+            "tamanho": pool.size(),
+            "em_uso": pool.checkedout(),
+            "ociosas": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, MonitoredQueuePool):
+        dados.update(pool.metricas.to_dict())
+    return dados
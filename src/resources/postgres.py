@@ -2,7 +2,7 @@
 
 import os
 from dotenv import load_dotenv
-from .database import DatabaseManager
+from .database import DatabaseManager, PoolConfig
 
 load_dotenv() # Load environment variables from .env file
 
@@ -12,7 +12,7 @@ POSTGRES_DSN = os.getenv("POSTGRES_DSN")
 if not POSTGRES_DSN:
     raise ValueError("POSTGRES_DSN environment variable not set.")
 
-postgres_db_manager = DatabaseManager(POSTGRES_DSN)
+postgres_db_manager = DatabaseManager(POSTGRES_DSN, pool=PoolConfig.from_env("AGHU_DB"))
 
 async def get_postgres_session():
     """
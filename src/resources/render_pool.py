@@ -0,0 +1,79 @@
+# src/resources/render_pool.py
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+# Tipo de executor usado na renderização de relatórios: "thread" ou "process"
+RENDER_EXECUTOR = os.getenv("RENDER_EXECUTOR", "thread").lower()
+# Quantidade máxima de renderizações (PDF/Excel) executando ao mesmo tempo
+RENDER_MAX_WORKERS = int(os.getenv("RENDER_MAX_WORKERS", "2"))
+
+
+class RenderPool:
+    """
+    Executa o trabalho de CPU das exportações (reportlab, pandas, xlsxwriter) fora do
+    event loop, em um pool com limite de concorrência.
+
+    - `run` usa o executor configurado (threads ou processos). A função e os argumentos
+      precisam ser serializáveis quando o executor é de processos.
+    - `run_local` sempre usa threads, para trabalho sobre objetos que não podem sair do
+      processo (ex: um Workbook do xlsxwriter sendo escrito em fluxo).
+    Os executores são criados sob demanda na primeira exportação.
+    """
+    def __init__(self, kind: str = "thread", max_workers: int = 2):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"RENDER_EXECUTOR inválido: '{kind}'. Use 'thread' ou 'process'.")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._executor: Executor | None = None
+        self._local_executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = self.local_executor
+        return self._executor
+
+    @property
+    def local_executor(self) -> ThreadPoolExecutor:
+        if self._local_executor is None:
+            self._local_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="render"
+            )
+        return self._local_executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Executa `fn` no executor de renderização configurado e aguarda o resultado.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def run_local(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Executa `fn` em uma thread do pool de renderização, no mesmo processo.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.local_executor, partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        """
+        Encerra os executores, aguardando as renderizações em andamento.
+        """
+        if self._executor is not None and self._executor is not self._local_executor:
+            self._executor.shutdown(wait=True)
+        if self._local_executor is not None:
+            self._local_executor.shutdown(wait=True)
+        self._executor = None
+        self._local_executor = None
+
+
+render_pool = RenderPool(RENDER_EXECUTOR, RENDER_MAX_WORKERS)
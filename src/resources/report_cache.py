@@ -0,0 +1,159 @@
+# src/resources/report_cache.py
+
+import json
+import os
+import time
+from uuid import uuid4
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# Limites do cache de resultados de relatórios (por processo)
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "256"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Validade máxima de uma entrada, como proteção contra escritas feitas fora da aplicação
+# (scripts de importação, manutenção manual no banco)
+REPORT_CACHE_TTL_SECONDS = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "300"))
+
+# Identifica o processo atual: os contadores de versão recomeçam do zero a cada início
+PROCESS_EPOCH = uuid4().hex
+
+
+class DataVersion:
+    """
+    Contadores de versão dos dados usados pelos relatórios.
+
+    - `bump(lotacao)` marca que os dados de uma lotação mudaram (atribuições, certificados,
+      inscrições de usuários daquela lotação).
+    - `bump()` marca uma mudança que afeta todas as lotações (ex: cadastro de cursos).
+
+    Resultados com escopo de lotação dependem da versão global e da versão da lotação;
+    resultados sem escopo (visão UDP) dependem de qualquer mudança.
+    """
+    def __init__(self):
+        self._global = 0
+        self._any = 0
+        self._lotacoes: Dict[str, int] = defaultdict(int)
+
+    def bump(self, lotacao: str | None = None):
+        self._any += 1
+        if lotacao is None:
+            self._global += 1
+        else:
+            self._lotacoes[lotacao] += 1
+
+    def token(self, lotacao: str | None = None) -> Tuple[int, int]:
+        if lotacao is None:
+            return (self._global, self._any)
+        return (self._global, self._lotacoes[lotacao])
+
+
+class ReportCache:
+    """
+    Cache LRU de resultados de relatórios, indexado pelo nome do relatório e pelos filtros.
+
+    Cada entrada guarda a versão dos dados vigente quando o cálculo começou; uma entrada
+    cuja versão não é mais a atual é tratada como ausente. O cache é limitado pelo número
+    de entradas e por uma estimativa do tamanho serializado dos resultados.
+    """
+    def __init__(
+        self,
+        max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+        max_bytes: int = REPORT_CACHE_MAX_BYTES,
+        ttl_seconds: int = REPORT_CACHE_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.versions = DataVersion()
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, int], float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(report: str, filters: Dict[str, Any]) -> Hashable:
+        return (report, tuple(sorted(filters.items())))
+
+    def version_token(self, lotacao: str | None = None) -> Tuple[int, int]:
+        return self.versions.token(lotacao)
+
+    def validator(self, lotacao: str | None = None) -> Tuple[str, Tuple[int, int], int]:
+        """
+        Versão dos dados de um escopo para validação de respostas HTTP (ETag).
+        Combina a época do processo, a versão do escopo e a janela de TTL corrente:
+        assim como uma entrada em cache, um validador deixa de valer após o TTL,
+        cobrindo escritas feitas fora da aplicação ou por outro processo.
+        """
+        return PROCESS_EPOCH, self.versions.token(lotacao), int(time.time() // self.ttl_seconds)
+
+    def get(self, report: str, filters: Dict[str, Any], lotacao: str | None = None) -> Tuple[bool, Any]:
+        key = self._key(report, filters)
+        entry = self._entries.get(key)
+        if entry is not None:
+            token, expires_at, _, value = entry
+            if token == self.versions.token(lotacao) and time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            self._remove(key)
+        self.misses += 1
+        return False, None
+
+    def put(self, report: str, filters: Dict[str, Any], value: Any, token: Tuple[int, int]):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        key = self._key(report, filters)
+        self._remove(key)
+        self._entries[key] = (token, time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    async def get_or_compute(
+        self,
+        report: str,
+        filters: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]],
+        lotacao: str | None = None
+    ) -> Any:
+        """
+        Retorna o resultado em cache ou executa `compute` e guarda o resultado.
+        `lotacao` define o escopo de invalidação (None = todas as lotações).
+        """
+        found, value = self.get(report, filters, lotacao)
+        if found:
+            return value
+        # A versão é lida antes do cálculo: se os dados mudarem durante a consulta,
+        # a entrada já nasce desatualizada e não será servida.
+        token = self.versions.token(lotacao)
+        value = await compute()
+        self.put(report, filters, value, token)
+        return value
+
+    def invalidate(self, lotacao: str | None = None):
+        self.versions.bump(lotacao)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+report_cache = ReportCache()
+
+
+def bump_data_version(*lotacoes: str | None):
+    """
+    Registra que os dados dos relatórios mudaram para as lotações informadas.
+    Sem argumentos (ou com None), invalida os relatórios de todas as lotações.
+    """
+    if not lotacoes:
+        report_cache.invalidate()
+        return
+    for lotacao in set(lotacoes):
+        report_cache.invalidate(lotacao)
@@ -0,0 +1,139 @@
+# src/resources/report_snapshots.py
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Diretório dos snapshots de relatórios (compartilhado entre processos e com o cron)
+REPORT_SNAPSHOTS_DIR = os.getenv("REPORT_SNAPSHOTS_DIR", "snapshots")
+# Snapshots mais antigos que isso não são servidos (ex: o agendamento parou de rodar)
+REPORT_SNAPSHOT_MAX_AGE_HOURS = int(os.getenv("REPORT_SNAPSHOT_MAX_AGE_HOURS", "36"))
+# Hora do dia (0-23) em que a aplicação gera os snapshots; vazio = apenas via CLI/cron
+REPORT_SNAPSHOT_HOUR = os.getenv("REPORT_SNAPSHOT_HOUR", "")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Resultado de um relatório pré-calculado e o instante em que foi gerado.
+    """
+    relatorio: str
+    filtros: Dict[str, Any]
+    gerado_em: datetime
+    dados: Any
+
+
+class SnapshotStore:
+    """
+    Snapshots de relatórios gravados como JSON compactado (gzip), um arquivo por
+    relatório e combinação de filtros.
+
+    A gravação é atômica (arquivo temporário + rename), então leitores em outros
+    processos nunca veem um arquivo pela metade. O último snapshot lido de cada
+    arquivo fica em memória até o arquivo mudar.
+    """
+    def __init__(self, directory: str = REPORT_SNAPSHOTS_DIR, max_age_hours: int = REPORT_SNAPSHOT_MAX_AGE_HOURS):
+        self.directory = directory
+        self.max_age = timedelta(hours=max_age_hours)
+        self._lidos: Dict[str, Tuple[float, Snapshot]] = {}
+
+    def _path(self, relatorio: str, filtros: Dict[str, Any]) -> str:
+        chave = json.dumps([relatorio, filtros], sort_keys=True, default=str)
+        nome = hashlib.sha256(chave.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{relatorio}-{nome}.json.gz")
+
+    def salvar(self, relatorio: str, filtros: Dict[str, Any], dados: Any, gerado_em: datetime | None = None) -> str:
+        """
+        Grava o snapshot, substituindo o anterior com os mesmos filtros. Retorna o caminho.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(relatorio, filtros)
+        payload = {
+            "relatorio": relatorio,
+            "filtros": filtros,
+            "gerado_em": (gerado_em or datetime.now()).isoformat(),
+            "dados": dados,
+        }
+        tmp_path = f"{path}.part"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as output:
+            json.dump(payload, output, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def carregar(self, relatorio: str, filtros: Dict[str, Any]) -> Snapshot | None:
+        """
+        Retorna o snapshot do relatório com esses filtros, ou None se não existir
+        ou estiver mais velho que o limite.
+        """
+        path = self._path(relatorio, filtros)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        lido = self._lidos.get(path)
+        if lido is not None and lido[0] == mtime:
+            snapshot = lido[1]
+        else:
+            with gzip.open(path, "rt", encoding="utf-8") as arquivo:
+                payload = json.load(arquivo)
+            snapshot = Snapshot(
+                relatorio=payload["relatorio"],
+                filtros=payload["filtros"],
+                gerado_em=datetime.fromisoformat(payload["gerado_em"]),
+                dados=payload["dados"],
+            )
+            self._lidos[path] = (mtime, snapshot)
+
+        if datetime.now() - snapshot.gerado_em > self.max_age:
+            return None
+        return snapshot
+
+    def purge(self) -> int:
+        """
+        Remove os arquivos mais velhos que o limite (ex: lotações que deixaram de existir).
+        Retorna quantos foram removidos.
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        limite = time.time() - self.max_age.total_seconds()
+        removidos = 0
+        for nome in os.listdir(self.directory):
+            path = os.path.join(self.directory, nome)
+            if os.path.isfile(path) and os.stat(path).st_mtime < limite:
+                os.remove(path)
+                self._lidos.pop(path, None)
+                removidos += 1
+        return removidos
+
+
+snapshot_store = SnapshotStore()
+
+
+def _segundos_ate(hora: int, agora: datetime) -> float:
+    proxima = agora.replace(hour=hora, minute=0, second=0, microsecond=0)
+    if proxima <= agora:
+        proxima += timedelta(days=1)
+    return (proxima - agora).total_seconds()
+
+
+async def executar_diariamente(hora: int, tarefa: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Executa `tarefa` todos os dias na hora informada (horário local), até ser cancelada.
+    Falhas são registradas no log e não interrompem o agendamento.
+    """
+    while True:
+        await asyncio.sleep(_segundos_ate(hora, datetime.now()))
+        try:
+            await tarefa()
+        except Exception:
+            logger.exception("Erro ao gerar os snapshots de relatórios")
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List
 
 from ..auth.dependencies import is_udp
-from ..resources.database import get_app_db_session
+from ..resources.database import get_app_db_session, get_app_db_read_session
 from ..controllers import usuario_controller
 from ..models import PerfilUsuario, Usuario
 
@@ -57,10 +57,33 @@ async def listar_todos_usuarios(
     lotacao: str | None = None,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Lista todos os usuários cadastrados no sistema de forma paginada, com filtros opcionais. 
     (Requer perfil de UDP)
     """
     return await usuario_controller.listar_usuarios(db, nome=nome, lotacao=lotacao, skip=skip, limit=limit)
+
+@router.get("/diagnostico/banco", response_model=Dict[str, Any], dependencies=[Depends(is_udp)])
+async def diagnostico_banco(request: Request):
+    """
+    Configuração efetiva do banco da aplicação: pragmas do SQLite em vigor nas conexões
+    (journal_mode, synchronous, busy_timeout...), versão e último PRAGMA optimize.
+    (Requer perfil de UDP)
+    """
+    return await request.app.state.app_db.diagnostico()
+
+@router.get("/diagnostico/pools", response_model=Dict[str, Any], dependencies=[Depends(is_udp)])
+async def diagnostico_pools(request: Request):
+    """
+    Métricas dos pools de conexões do banco da aplicação e do AGHU (quando configurado):
+    conexões em uso e ociosas, requisições aguardando conexão, timeouts e o histograma
+    de latência de checkout, para dimensionar os pools no pico de acessos.
+    (Requer perfil de UDP)
+    """
+    pools = {"app": request.app.state.app_db.metricas_pool()}
+    aghu_db = getattr(request.app.state, "aghu_db", None)
+    if aghu_db:
+        pools["aghu"] = aghu_db.metricas_pool()
+    return pools
@@ -7,7 +7,7 @@ from datetime import datetime
 from ..controllers import atribuicao_controller, usuario_controller
 from ..auth.auth import auth_handler
 from ..auth.dependencies import get_current_user, is_chefia
-from ..resources.database import get_app_db_session
+from ..resources.database import get_app_db_session, get_app_db_read_session
 from ..models import StatusAtribuicao, Usuario
 from sqlalchemy import select
 
@@ -71,7 +71,7 @@ router = APIRouter(
 @router.get("/me", response_model=List[AtribuicaoResponse], dependencies=[Depends(auth_handler.decode_token)])
 async def listar_minhas_atribuicoes(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Lista todas as atribuições de cursos para o usuário logado.
@@ -82,7 +82,7 @@ async def listar_minhas_atribuicoes(
 @router.get("/pendentes-validacao", response_model=List[AtribuicaoPendenteResponse], dependencies=[Depends(is_chefia)])
 async def get_atribuicoes_pendentes_validacao(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     (Chefia) Lista as atribuições com certificados submetidos que aguardam validação.
@@ -129,7 +129,7 @@ async def atribuir_curso_seletivo(
 @router.get("/lotacao/usuarios", response_model=List[LotacaoUserResponse], dependencies=[Depends(is_chefia)])
 async def listar_usuarios_lotacao_chefia(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     (Chefia) Lista todos os usuários da própria lotação.
@@ -6,7 +6,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from starlette.concurrency import run_in_threadpool
 
 from ..auth.auth import auth_handler, JWT_EXP_HOURS, REFRESH_TOKEN_EXP_DAYS
-from ..resources.database import get_app_db_session
+from ..resources.database import get_app_db_session, get_app_db_read_session
 from ..controllers import usuario_controller # Import the new controller
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -134,7 +134,7 @@ async def logout(response: Response, request: Request, db: AsyncSession = Depend
 @router.get("/users/me")
 async def read_users_me(
     current_user: dict = Depends(auth_handler.decode_token),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Returns the current user's information from the local database.
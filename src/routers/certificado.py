@@ -8,7 +8,7 @@ import uuid
 
 from ..controllers import certificado_controller, atribuicao_controller
 from ..auth.auth import auth_handler
-from ..resources.database import get_app_db_session
+from ..resources.database import get_app_db_session, get_app_db_read_session
 from ..auth.dependencies import is_chefia
 from ..models import Certificado, StatusAtribuicao
 
@@ -177,7 +177,7 @@ async def registrar_certificado_link(
 @router.get("/{certificado_id}", response_model=CertificadoResponse, dependencies=[Depends(auth_handler.decode_token)])
 async def obter_certificado(
     certificado_id: str,
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """Obtém um certificado pelo ID."""
     certificado = await certificado_controller.obter_certificado_por_id(db, certificado_id)
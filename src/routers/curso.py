@@ -4,7 +4,7 @@ from typing import List
 
 from ..controllers import curso_controller
 from ..auth.auth import auth_handler
-from ..resources.database import get_app_db_session
+from ..resources.database import get_app_db_session, get_app_db_read_session
 from ..schemas.curso_schema import CursoCreate, CursoResponse, PaginatedCursoResponse
 from ..models import Curso
 from ..auth.dependencies import is_chefia, get_current_user, is_udp
@@ -23,7 +23,7 @@ async def listar_cursos(
     limit: int = 10,
     titulo: str | None = None,
     tema: str | None = None,
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """Lista todos os cursos da fonte de dados interna com paginação e filtros."""
     return await curso_controller.listar_cursos(db, skip=skip, limit=limit, titulo=titulo, tema=tema)
@@ -87,7 +87,7 @@ async def importar_cursos_csv(
 @router.get("/recommended", response_model=List[CursoResponse], dependencies=[Depends(auth_handler.decode_token)])
 async def listar_cursos_recomendados(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Lista cursos recomendados para a lotação do usuário logado, excluindo os que ele já se inscreveu.
@@ -121,7 +121,7 @@ async def listar_cursos_recomendados(
 @router.get("/genericos", response_model=List[CursoResponse], dependencies=[Depends(auth_handler.decode_token)])
 async def listar_cursos_genericos(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Lista cursos genéricos (sem lotação específica), excluindo os que o usuário já se inscreveu ou que já foram atribuídos.
@@ -146,7 +146,7 @@ async def listar_cursos_genericos(
 @router.get("/{curso_id}", response_model=CursoResponse, dependencies=[Depends(auth_handler.decode_token)])
 async def obter_curso(
     curso_id: str,
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """Obtém um curso pelo ID a partir da fonte de dados interna."""
     curso = await curso_controller.obter_curso_por_id(db, curso_id)
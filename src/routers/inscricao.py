@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from typing import List
 from pydantic import BaseModel
 from datetime import datetime
@@ -7,7 +8,7 @@ from datetime import datetime
 from ..controllers import inscricao_controller
 from ..auth.auth import auth_handler
 from ..auth.dependencies import get_current_user
-from ..resources.database import get_app_db_session
+from ..resources.database import get_app_db_session, get_app_db_read_session
 
 from ..models import Inscricao, StatusAtribuicao
 
@@ -70,7 +71,15 @@ async def inscrever_em_curso(
             detail="Usuário já inscrito neste curso."
         )
 
-    new_inscricao, new_atribuicao = await inscricao_controller.inscrever_usuario_em_curso(db, usuario_id, inscricao_data.curso_id)
+    try:
+        new_inscricao, new_atribuicao = await inscricao_controller.inscrever_usuario_em_curso(db, usuario_id, inscricao_data.curso_id)
+    except IntegrityError:
+        # Inscrição simultânea no mesmo curso: o índice único de (user_id, curso_id) barra a segunda
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Usuário já inscrito neste curso."
+        )
     
     # Manually construct the response to include all necessary fields
     response_data = {
@@ -113,7 +122,7 @@ async def desinscrever_de_curso(
 @router.get("/me", response_model=List[InscricaoResponse])
 async def listar_minhas_inscricoes(
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Lista todas as inscrições do usuário logado.
@@ -1,21 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal, Tuple
+from datetime import datetime
+from pydantic import BaseModel
 
-from ..controllers import relatorio_controller, usuario_controller
+from ..controllers import relatorio_controller, usuario_controller, snapshot_controller, alteracao_controller
 from ..auth.auth import auth_handler
-from ..resources.database import get_app_db_session
+from ..resources.database import get_app_db_read_session
 from ..auth.dependencies import is_udp, is_chefia, get_current_user
 from ..models import PerfilUsuario
 from ..providers.implementations.relatorio_provider import RelatorioProvider
 from ..providers.interfaces.relatorio_provider_interface import RelatorioProviderInterface
-from ..models import Usuario
-from ..helpers import excel_helper
+from ..providers.implementations.relatorio_definicoes import CONSOLIDADO, CAPACITACOES, RELATORIOS
+from ..helpers.report_engine import DefinicaoRelatorio
+from ..models import Usuario, normalizar_user_id
+from ..helpers import excel_helper, ndjson_helper, csv_helper, arrow_helper, etag_helper
+from ..resources.export_jobs import export_job_manager, job_key, ExportJob, STATUS_CONCLUIDO
+from ..resources.report_cache import report_cache
+from ..schemas.pagination_schema import CursorPage, ChangeFeedPage
 from sqlalchemy import select as sa_select
 
+# --- Pydantic Schemas for Request/Response ---
+
+class ExportJobRequest(BaseModel):
+    relatorio: Literal["capacitacoes", "consolidado"]
+    formato: Literal["excel", "excel_resumo", "pdf"]
+    ano: str | None = None
+    vinculo: str | None = None
+    lotacao: str | None = None # Apenas UDP; para a Chefia vale sempre a própria lotação
+
+class ExportJobResponse(BaseModel):
+    job_id: str
+    relatorio: str
+    formato: str
+    status: str
+    erro: str | None = None
+    criado_em: datetime
+    concluido_em: datetime | None = None
+    expira_em: datetime | None = None
+    download_url: str | None = None
+
+# Tempo máximo (segundos) que uma consulta de status pode aguardar a conclusão do job
+EXPORT_JOB_MAX_WAIT_SECONDS = 30
+
 # --- Dependency Factory ---
-def get_relatorio_provider(db: AsyncSession = Depends(get_app_db_session)) -> RelatorioProviderInterface:
+def get_relatorio_provider(db: AsyncSession = Depends(get_app_db_read_session)) -> RelatorioProviderInterface:
     return RelatorioProvider(db)
 
 # --- Router Definition ---
@@ -39,110 +69,195 @@ def is_chefia_or_udp(current_user: dict = Depends(get_current_user)) -> dict:
         )
     return current_user
 
+
+def _etag(request: Request, response: Response | None, lotacao: str | None = None) -> Dict[str, str]:
+    """
+    Valida a resposta pela versão dos dados do escopo (a lotação ou, sem ela, todas).
+    Levanta 304 quando o cliente já tem a versão atual, sem executar a consulta do relatório.
+    """
+    return etag_helper.verificar_etag(request, response, lotacao, report_cache.validator(lotacao))
+
+
+def _snapshot(request: Request, response: Response, relatorio: str, filtros: Dict[str, Any]) -> Any | None:
+    """
+    Dados do snapshot pré-calculado do relatório, quando houver um válido para esses filtros.
+    A resposta leva o instante de geração (X-Snapshot-Timestamp) e um ETag próprio do snapshot.
+    Sem snapshot, retorna None e a rota segue com os dados atuais.
+    """
+    snapshot = snapshot_controller.obter_snapshot(relatorio, filtros)
+    if snapshot is None:
+        return None
+    gerado_em = snapshot.gerado_em.isoformat()
+    etag_helper.verificar_etag(request, response, "snapshot", gerado_em)
+    response.headers["X-Snapshot-Timestamp"] = gerado_em
+    return snapshot.dados
+
 @router.get("/capacitacoes", response_model=List[Dict[str, Any]], dependencies=[Depends(is_udp)])
 async def get_relatorio_capacitacoes(
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
-    provider: RelatorioProviderInterface = Depends(get_relatorio_provider)
+    snapshot: bool = False,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório completo de capacitações EAD.
     Requer perfil UDP.
     Suporta filtros opcionais por ano e vínculo.
+    Com `Accept: application/x-ndjson`, as linhas são enviadas em fluxo, uma por linha.
+    Com `snapshot=true`, responde com o snapshot noturno quando houver (ver X-Snapshot-Timestamp).
     """
-    return await relatorio_controller.gerar_relatorio_capacitacoes(provider, ano=ano, vinculo=vinculo)
+    filtros = {"ano": ano, "vinculo": vinculo}
+    return await _responder_relatorio(request, response, db, CAPACITACOES, "json", filtros, snapshot)
 
-@router.get("/capacitacoes/export/excel", dependencies=[Depends(is_udp)])
-async def export_relatorio_excel(
+@router.get("/capacitacoes/export/dataset", dependencies=[Depends(is_udp)])
+async def export_dataset_capacitacoes(
+    request: Request,
+    formato: Literal["parquet", "arrow"] = "parquet",
     ano: str | None = None,
     vinculo: str | None = None,
     provider: RelatorioProviderInterface = Depends(get_relatorio_provider)
 ):
     """
-    Exporta o relatório de capacitações para Excel.
+    Exporta o dataset de capacitações (usuário, curso, atribuição e certificado) em formato
+    colunar tipado, para uso em ferramentas de análise: Parquet (padrão) ou Arrow IPC.
     Suporta filtros opcionais por ano e vínculo.
     """
-    file_stream = await relatorio_controller.exportar_relatorio_excel(provider, ano=ano, vinculo=vinculo)
-    headers = {
-        'Content-Disposition': 'attachment; filename="relatorio_capacitacoes.xlsx"'
-    }
-    return StreamingResponse(file_stream, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers=headers)
-
-@router.get("/capacitacoes/export/pdf", dependencies=[Depends(is_udp)])
-async def export_relatorio_pdf(
+    headers = _etag(request, None)
+    extensao, media_type = arrow_helper.DATASET_FORMATS[formato]
+    file_stream = await relatorio_controller.exportar_dataset_capacitacoes(provider, formato, ano=ano, vinculo=vinculo)
+    headers['Content-Disposition'] = f'attachment; filename="dataset_capacitacoes.{extensao}"'
+    return StreamingResponse(excel_helper.iter_file(file_stream), media_type=media_type, headers=headers)
+
+@router.get("/capacitacoes/export/{formato}", dependencies=[Depends(is_udp)])
+async def export_relatorio_capacitacoes(
+    formato: Literal["excel", "pdf", "csv"],
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
-    provider: RelatorioProviderInterface = Depends(get_relatorio_provider)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
-    Exporta o relatório de capacitações para PDF.
+    Exporta o relatório de capacitações para Excel, PDF ou CSV (';', UTF-8 com BOM).
+    Excel e CSV são gerados em fluxo.
     Suporta filtros opcionais por ano e vínculo.
     """
-    file_stream = await relatorio_controller.exportar_relatorio_pdf(provider, ano=ano, vinculo=vinculo)
-    headers = {
-        'Content-Disposition': 'attachment; filename="relatorio_capacitacoes.pdf"'
-    }
-    return StreamingResponse(file_stream, media_type='application/pdf', headers=headers)
+    filtros = {"ano": ano, "vinculo": vinculo}
+    return await _responder_relatorio(request, response, db, CAPACITACOES, formato, filtros)
+
+# Tamanho máximo de página do feed de alterações
+ALTERACOES_MAX_PAGE_SIZE = 5000
+
+@router.get("/capacitacoes/alteracoes", response_model=ChangeFeedPage[Dict[str, Any]], dependencies=[Depends(is_udp)])
+async def get_alteracoes_capacitacoes(
+    cursor: str | None = None,
+    limit: int = Query(1000, ge=1, le=ALTERACOES_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_app_db_read_session)
+):
+    """
+    Feed incremental do dataset de capacitações, para sincronização de consumidores (ex: BI).
+    Sem cursor, entrega a carga completa; depois, apenas as atribuições criadas/alteradas
+    ('upsert') e removidas ('delete') desde o `next_cursor` anterior.
+    Requer perfil UDP.
+    """
+    try:
+        return await alteracao_controller.listar_alteracoes(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/udp/cursos-populares", response_model=List[Dict[str, Any]], dependencies=[Depends(is_udp)])
 async def get_cursos_mais_inscritos_udp(
-    db: AsyncSession = Depends(get_app_db_session),
-    limit: int = 10
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_app_db_read_session),
+    limit: int = Query(10, ge=1, le=100),
+    dias: int | None = None,
+    por_lotacao: bool = False
 ):
     """
     Relatório para a UDP: Lista os cursos mais inscritos/atribuídos.
     Requer perfil UDP.
+    `dias` (30, 90 ou 365) limita a contagem ao período recente; `por_lotacao`
+    retorna o ranking de cada lotação.
     """
-    return await relatorio_controller.listar_cursos_mais_inscritos_udp(db, limit)
+    _etag(request, response)
+    try:
+        return await relatorio_controller.listar_cursos_mais_inscritos_udp(
+            db, limit, dias=dias, por_lotacao=por_lotacao
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 # Placeholder para outros endpoints de relatório
 @router.get("/udp/status-geral", response_model=List[Dict[str, Any]], dependencies=[Depends(is_udp)])
 async def get_status_geral_udp(
-    db: AsyncSession = Depends(get_app_db_session)
+    request: Request,
+    response: Response,
+    snapshot: bool = False,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório para a UDP: Status geral das capacitações.
     Requer perfil UDP.
+    Com `snapshot=true`, responde com o snapshot noturno quando houver (ver X-Snapshot-Timestamp).
     """
+    if snapshot:
+        dados = _snapshot(request, response, snapshot_controller.STATUS_GERAL, {})
+        if dados is not None:
+            return dados
+    _etag(request, response)
     return await relatorio_controller.get_relatorio_status_geral_udp(db)
 
 @router.get("/udp/conformidade-lotacao", response_model=List[Dict[str, Any]], dependencies=[Depends(is_udp)])
 async def get_conformidade_lotacao_udp(
-    db: AsyncSession = Depends(get_app_db_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório para a UDP: Conformidade por lotação.
     Requer perfil UDP.
     """
+    _etag(request, response)
     return await relatorio_controller.get_relatorio_conformidade_lotacao_udp(db)
 
 @router.get("/udp/certificados-pendentes", response_model=List[Dict[str, Any]], dependencies=[Depends(is_udp)])
 async def get_certificados_pendentes_udp(
-    db: AsyncSession = Depends(get_app_db_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório para a UDP: Certificados pendentes de validação.
     Requer perfil UDP.
     """
+    _etag(request, response)
     return await relatorio_controller.get_relatorio_certificados_pendentes_udp(db)
 
 @router.get("/udp/usuarios-perfil-lotacao", response_model=List[Dict[str, Any]], dependencies=[Depends(is_udp)])
 async def get_usuarios_perfil_lotacao_udp(
-    db: AsyncSession = Depends(get_app_db_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório para a UDP: Usuários por perfil e lotação.
     Requer perfil UDP.
     """
+    _etag(request, response)
     return await relatorio_controller.get_relatorio_usuarios_por_perfil_lotacao_udp(db)
 
 @router.get("/chefia/status-lotacao", response_model=List[Dict[str, Any]], dependencies=[Depends(is_chefia)])
 async def get_status_lotacao_chefia(
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
     current_user: dict = Depends(get_current_user),
     provider: RelatorioProviderInterface = Depends(get_relatorio_provider),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório para a Chefia: Status de cursos da minha lotação.
@@ -154,16 +269,22 @@ async def get_status_lotacao_chefia(
     
     if not user or not user.lotacao:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lotação do usuário não encontrada.")
-        
-    return await relatorio_controller.get_relatorio_status_lotacao_chefia(provider, user.lotacao, ano=ano, vinculo=vinculo)
+
+    _etag(request, response, user.lotacao)
+    try:
+        return await relatorio_controller.get_relatorio_status_lotacao_chefia(provider, user.lotacao, ano=ano, vinculo=vinculo)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ano inválido.")
 
 @router.get("/chefia/progresso-individual", response_model=List[Dict[str, Any]], dependencies=[Depends(is_chefia)])
 async def get_progresso_individual_chefia(
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
     current_user: dict = Depends(get_current_user),
     provider: RelatorioProviderInterface = Depends(get_relatorio_provider),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório para a Chefia: Progresso individual de subordinados.
@@ -175,13 +296,19 @@ async def get_progresso_individual_chefia(
     
     if not user or not user.lotacao:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lotação do usuário não encontrada.")
-        
-    return await relatorio_controller.get_relatorio_progresso_individual_chefia(provider, user.lotacao, ano=ano, vinculo=vinculo)
+
+    _etag(request, response, user.lotacao)
+    try:
+        return await relatorio_controller.get_relatorio_progresso_individual_chefia(provider, user.lotacao, ano=ano, vinculo=vinculo)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ano inválido.")
 
 @router.get("/chefia/certificados-pendentes", response_model=List[Dict[str, Any]], dependencies=[Depends(is_chefia)])
 async def get_certificados_pendentes_chefia(
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório para a Chefia: Certificados pendentes de validação.
@@ -190,19 +317,23 @@ async def get_certificados_pendentes_chefia(
     lotacao = current_user.get("lotacao")
     if not lotacao:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lotação do usuário não encontrada.")
+    _etag(request, response, lotacao)
     return await relatorio_controller.get_relatorio_certificados_pendentes_chefia(db, lotacao)
 
 
 @router.get("/chefia/subordinado/{subordinado_id}", response_model=List[Dict[str, Any]], dependencies=[Depends(is_chefia)])
 async def get_subordinado_detalhes(
     subordinado_id: str,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Retorna os detalhes de um subordinado específico: cursos, status, certificados.
     Chefia só pode acessar subordinados da própria lotação.
     """
+    subordinado_id = normalizar_user_id(subordinado_id)
     user_id = current_user.get("sub")
     user = await usuario_controller.get_user_by_username(db, user_id)
 
@@ -223,6 +354,8 @@ async def get_subordinado_detalhes(
     if sub_row["lotacao"] != user.lotacao:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você só pode acessar subordinados da sua lotação.")
 
+    _etag(request, response, user.lotacao)
+
     # Buscar atribuições com detalhes do curso e certificado
     atrib_stmt = (
         sa_select(Atribuicao, Curso, Certificado)
@@ -259,11 +392,14 @@ async def get_subordinado_detalhes(
 
 @router.get("/vinculos", response_model=List[str], dependencies=[Depends(auth_handler.decode_token)])
 async def get_vinculos_disponiveis(
-    db: AsyncSession = Depends(get_app_db_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Lista todos os vínculos únicos disponíveis no sistema.
     """
+    _etag(request, response)
     stmt = sa_select(Usuario.vinculo).where(Usuario.vinculo.isnot(None)).distinct().order_by(Usuario.vinculo)
     result = await db.execute(stmt)
     return [row[0] for row in result.all()]
@@ -272,134 +408,409 @@ async def get_vinculos_disponiveis(
 @router.get("/usuario/{user_id}/detalhes", response_model=List[Dict[str, Any]], dependencies=[Depends(is_chefia_or_udp)])
 async def get_usuario_detalhes(
     user_id: str,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Retorna os detalhes de um usuário: cursos, status, certificados.
     Chefia só pode acessar usuários da mesma lotação; UDP pode acessar qualquer usuário.
     """
+    user_id = normalizar_user_id(user_id)
     await relatorio_controller.can_access_user_details(db, current_user, user_id)
+    _etag(request, response)
     return await relatorio_controller.get_usuario_detalhes(db, user_id)
 
 
+# --- Relatórios definidos (consolidado, capacitações) ---
+
+# Formatos de saída disponíveis para qualquer relatório definido
+FormatoRelatorio = Literal["json", "ndjson", "csv", "excel", "excel_resumo", "pdf"]
+
+
+def _anexo(nome_arquivo: str) -> Dict[str, str]:
+    return {'Content-Disposition': f'attachment; filename="{nome_arquivo}"'}
+
+
+def _etag_relatorio(
+    request: Request,
+    response: Response,
+    definicao: DefinicaoRelatorio,
+    filtros: Dict[str, Any]
+) -> Dict[str, str]:
+    lotacao = filtros.get(definicao.escopo) if definicao.escopo else None
+    return _etag(request, response, lotacao)
+
+
+async def _responder_relatorio(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    definicao: DefinicaoRelatorio,
+    formato: str,
+    filtros: Dict[str, Any],
+    snapshot: bool = False
+):
+    """
+    Entrega o relatório definido no formato pedido, a partir da mesma query compilada.
+    Em 'json', responde em NDJSON (fluxo) quando o cliente envia `Accept: application/x-ndjson`,
+    ou com o snapshot noturno quando `snapshot` é pedido e existe um para esses filtros.
+    Responde 304 se o cliente já tem a versão atual; filtros inválidos resultam em 400.
+    """
+    try:
+        if snapshot and formato == "json" and not ndjson_helper.accepts_ndjson(request):
+            dados = _snapshot(request, response, definicao.nome, definicao.normalizar_filtros(**filtros))
+            if dados is not None:
+                return dados
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = _etag_relatorio(request, response, definicao, filtros)
+    try:
+        if formato == "ndjson" or (formato == "json" and ndjson_helper.accepts_ndjson(request)):
+            rows = relatorio_controller.stream_relatorio(db, definicao, **filtros)
+            return StreamingResponse(ndjson_helper.iter_ndjson(rows), media_type=ndjson_helper.NDJSON_MEDIA_TYPE, headers=headers)
+        if formato == "json":
+            return await relatorio_controller.listar_relatorio(db, definicao, **filtros)
+        if formato == "csv":
+            rows = relatorio_controller.stream_relatorio(db, definicao, **filtros)
+            headers.update(_anexo(f"{definicao.nome_arquivo}.csv"))
+            return StreamingResponse(csv_helper.stream_csv(rows), media_type=csv_helper.CSV_MEDIA_TYPE, headers=headers)
+        file_stream = await relatorio_controller.exportar_relatorio(db, definicao, formato, **filtros)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    extensao, media_type = relatorio_controller.EXPORT_FORMATS[formato]
+    headers.update(_anexo(f"{definicao.nome_arquivo}.{extensao}"))
+    return StreamingResponse(excel_helper.iter_file(file_stream), media_type=media_type, headers=headers)
+
+
+async def _paginar_relatorio(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    definicao: DefinicaoRelatorio,
+    filtros: Dict[str, Any],
+    limit: int,
+    cursor: str | None,
+    incluir_total: bool
+) -> Dict[str, Any]:
+    _etag_relatorio(request, response, definicao, filtros)
+    try:
+        return await relatorio_controller.paginar_relatorio(
+            db, definicao, limit=limit, cursor=cursor, incluir_total=incluir_total, **filtros
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def _get_relatorio_autorizado(
+    nome: str,
+    current_user: dict,
+    db: AsyncSession,
+    filtros: Dict[str, Any]
+) -> Tuple[DefinicaoRelatorio, Dict[str, Any]]:
+    """
+    Resolve o relatório pelo nome e aplica o escopo do perfil: a Chefia consulta
+    apenas os relatórios liberados para ela, sempre restritos à própria lotação.
+    """
+    definicao = RELATORIOS.get(nome)
+    if definicao is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Relatório não encontrado.")
+
+    perfil = current_user.get("perfil")
+    if perfil not in definicao.perfis:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado a este relatório.")
+
+    if perfil != PerfilUsuario.UDP.value and definicao.escopo:
+        filtros = {**filtros, definicao.escopo: await _get_chefia_lotacao(db, current_user)}
+    return definicao, filtros
+
+
+@router.get("/definidos/{nome}", dependencies=[Depends(is_chefia_or_udp)])
+async def get_relatorio_definido(
+    nome: str,
+    request: Request,
+    response: Response,
+    formato: FormatoRelatorio = "json",
+    ano: str | None = None,
+    vinculo: str | None = None,
+    lotacao: str | None = None,
+    snapshot: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_app_db_read_session)
+):
+    """
+    Qualquer relatório definido ('consolidado', 'capacitacoes') em qualquer formato:
+    json (ou NDJSON via Accept), ndjson, csv, excel, excel_resumo ou pdf.
+    Para a Chefia, o filtro de lotação é sempre a própria lotação.
+    Em json, `snapshot=true` usa o snapshot noturno quando houver (ver X-Snapshot-Timestamp).
+    """
+    definicao, filtros = await _get_relatorio_autorizado(
+        nome, current_user, db, {"ano": ano, "vinculo": vinculo, "lotacao": lotacao}
+    )
+    return await _responder_relatorio(request, response, db, definicao, formato, filtros, snapshot)
+
+
+@router.get("/definidos/{nome}/paginado", response_model=CursorPage[Dict[str, Any]], dependencies=[Depends(is_chefia_or_udp)])
+async def get_relatorio_definido_paginado(
+    nome: str,
+    request: Request,
+    response: Response,
+    ano: str | None = None,
+    vinculo: str | None = None,
+    lotacao: str | None = None,
+    limit: int = Query(100, ge=1, le=relatorio_controller.CONSOLIDADO_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    incluir_total: bool = False,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_app_db_read_session)
+):
+    """
+    Qualquer relatório definido, paginado por cursor.
+    Passe o `next_cursor` da resposta anterior para obter a próxima página.
+    """
+    definicao, filtros = await _get_relatorio_autorizado(
+        nome, current_user, db, {"ano": ano, "vinculo": vinculo, "lotacao": lotacao}
+    )
+    return await _paginar_relatorio(request, response, db, definicao, filtros, limit, cursor, incluir_total)
+
+
 @router.get("/chefia/consolidado", response_model=List[Dict[str, Any]], dependencies=[Depends(is_chefia)])
 async def get_consolidado_chefia(
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
+    snapshot: bool = False,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório consolidado para a Chefia.
     Filtra por lotação da chefia + filtros opcionais por ano e vínculo.
+    Com `Accept: application/x-ndjson`, as linhas são enviadas em fluxo, uma por linha.
+    Com `snapshot=true`, responde com o snapshot noturno quando houver (ver X-Snapshot-Timestamp).
     """
-    user_id = current_user.get("sub")
-    user = await usuario_controller.get_user_by_username(db, user_id)
-
-    if not user or not user.lotacao:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lotação do usuário não encontrada.")
-
-    return await relatorio_controller.get_relatorio_consolidado(
-        db, lotacao=user.lotacao, ano=ano, vinculo=vinculo
-    )
+    lotacao = await _get_chefia_lotacao(db, current_user)
+    filtros = {"lotacao": lotacao, "ano": ano, "vinculo": vinculo}
+    return await _responder_relatorio(request, response, db, CONSOLIDADO, "json", filtros, snapshot)
 
 
 @router.get("/udp/consolidado", response_model=List[Dict[str, Any]], dependencies=[Depends(is_udp)])
 async def get_consolidado_udp(
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
     lotacao: str | None = None,
-    db: AsyncSession = Depends(get_app_db_session)
+    snapshot: bool = False,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Relatório consolidado para a UDP (todas as lotações).
     Suporta filtros opcionais por ano, vínculo e lotação/setor.
+    Com `Accept: application/x-ndjson`, as linhas são enviadas em fluxo, uma por linha.
+    Com `snapshot=true`, responde com o snapshot noturno quando houver (ver X-Snapshot-Timestamp).
     """
-    return await relatorio_controller.get_relatorio_consolidado(
-        db, lotacao=lotacao, ano=ano, vinculo=vinculo
-    )
+    filtros = {"lotacao": lotacao, "ano": ano, "vinculo": vinculo}
+    return await _responder_relatorio(request, response, db, CONSOLIDADO, "json", filtros, snapshot)
 
 
-@router.get("/chefia/consolidado/export/excel", dependencies=[Depends(is_chefia)])
-async def export_consolidado_excel_chefia(
+@router.get("/chefia/consolidado/paginado", response_model=CursorPage[Dict[str, Any]], dependencies=[Depends(is_chefia)])
+async def get_consolidado_paginado_chefia(
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
+    limit: int = Query(100, ge=1, le=relatorio_controller.CONSOLIDADO_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    incluir_total: bool = False,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
-    Exporta o relatório consolidado para Excel (Chefia).
+    Relatório consolidado da Chefia, paginado por cursor.
+    Passe o `next_cursor` da resposta anterior para obter a próxima página.
     """
-    user_id = current_user.get("sub")
-    user = await usuario_controller.get_user_by_username(db, user_id)
+    lotacao = await _get_chefia_lotacao(db, current_user)
+    filtros = {"lotacao": lotacao, "ano": ano, "vinculo": vinculo}
+    return await _paginar_relatorio(request, response, db, CONSOLIDADO, filtros, limit, cursor, incluir_total)
 
-    if not user or not user.lotacao:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lotação do usuário não encontrada.")
 
-    data = await relatorio_controller.get_relatorio_consolidado(
-        db, lotacao=user.lotacao, ano=ano, vinculo=vinculo
-    )
-    file_stream = await excel_helper.export_to_excel(data)
-    headers = {'Content-Disposition': 'attachment; filename="relatorio_consolidado.xlsx"'}
-    return StreamingResponse(file_stream, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers=headers)
+@router.get("/udp/consolidado/paginado", response_model=CursorPage[Dict[str, Any]], dependencies=[Depends(is_udp)])
+async def get_consolidado_paginado_udp(
+    request: Request,
+    response: Response,
+    ano: str | None = None,
+    vinculo: str | None = None,
+    lotacao: str | None = None,
+    limit: int = Query(100, ge=1, le=relatorio_controller.CONSOLIDADO_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    incluir_total: bool = False,
+    db: AsyncSession = Depends(get_app_db_read_session)
+):
+    """
+    Relatório consolidado da UDP, paginado por cursor.
+    Passe o `next_cursor` da resposta anterior para obter a próxima página.
+    """
+    filtros = {"lotacao": lotacao, "ano": ano, "vinculo": vinculo}
+    return await _paginar_relatorio(request, response, db, CONSOLIDADO, filtros, limit, cursor, incluir_total)
 
 
-@router.get("/chefia/consolidado/export/pdf", dependencies=[Depends(is_chefia)])
-async def export_consolidado_pdf_chefia(
+@router.get("/chefia/consolidado/export/{formato}", dependencies=[Depends(is_chefia)])
+async def export_consolidado_chefia(
+    formato: Literal["excel", "excel_resumo", "pdf", "csv"],
+    request: Request,
+    response: Response,
     ano: str | None = None,
     vinculo: str | None = None,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
-    Exporta o relatório consolidado para PDF (Chefia).
+    Exporta o relatório consolidado da Chefia para Excel, PDF ou CSV (';', UTF-8 com BOM).
+    Excel e CSV são gerados em fluxo. 'excel_resumo' acrescenta as planilhas de resumo
+    (status × lotação e indicadores por lotação) antes do detalhe.
     """
-    user_id = current_user.get("sub")
-    user = await usuario_controller.get_user_by_username(db, user_id)
+    lotacao = await _get_chefia_lotacao(db, current_user)
+    filtros = {"lotacao": lotacao, "ano": ano, "vinculo": vinculo}
+    return await _responder_relatorio(request, response, db, CONSOLIDADO, formato, filtros)
+
+
+@router.get("/udp/consolidado/export/{formato}", dependencies=[Depends(is_udp)])
+async def export_consolidado_udp(
+    formato: Literal["excel", "excel_resumo", "pdf", "csv"],
+    request: Request,
+    response: Response,
+    ano: str | None = None,
+    vinculo: str | None = None,
+    lotacao: str | None = None,
+    db: AsyncSession = Depends(get_app_db_read_session)
+):
+    """
+    Exporta o relatório consolidado da UDP para Excel, PDF ou CSV (';', UTF-8 com BOM).
+    Excel e CSV são gerados em fluxo. 'excel_resumo' acrescenta as planilhas de resumo
+    (status × lotação e indicadores por lotação) antes do detalhe.
+    """
+    filtros = {"lotacao": lotacao, "ano": ano, "vinculo": vinculo}
+    return await _responder_relatorio(request, response, db, CONSOLIDADO, formato, filtros)
+
+# --- Exportações assíncronas ---
+
+def _export_job_response(job: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        job_id=job.id,
+        relatorio=job.relatorio,
+        formato=job.formato,
+        status=job.status,
+        erro=job.erro,
+        criado_em=datetime.fromtimestamp(job.criado_em),
+        concluido_em=datetime.fromtimestamp(job.concluido_em) if job.concluido_em else None,
+        expira_em=datetime.fromtimestamp(job.expira_em) if job.status == STATUS_CONCLUIDO else None,
+        download_url=f"{router.prefix}/exports/{job.id}/download" if job.status == STATUS_CONCLUIDO else None,
+    )
+
 
+async def _get_chefia_lotacao(db: AsyncSession, current_user: dict) -> str:
+    user = await usuario_controller.get_user_by_username(db, current_user.get("sub"))
     if not user or not user.lotacao:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lotação do usuário não encontrada.")
+    return user.lotacao
+
+
+async def _get_export_job_autorizado(job_id: str, current_user: dict, db: AsyncSession) -> ExportJob:
+    """
+    Retorna o job se o usuário pode acessá-lo: a UDP acessa qualquer job; a Chefia apenas
+    os dos relatórios liberados para ela e da própria lotação.
+    """
+    job = export_job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exportação não encontrada ou expirada.")
+
+    perfil = current_user.get("perfil")
+    if perfil not in RELATORIOS[job.relatorio].perfis:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado a este relatório.")
+    if perfil != PerfilUsuario.UDP.value:
+        if job.lotacao != await _get_chefia_lotacao(db, current_user):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Você só pode acessar exportações da sua lotação.")
+    return job
+
+
+@router.post("/exports", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(is_chefia_or_udp)])
+async def criar_exportacao(
+    pedido: ExportJobRequest,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_app_db_read_session)
+):
+    """
+    Inicia a geração de uma exportação em segundo plano e retorna o id do job.
+    Pedidos idênticos (mesmo relatório, formato, filtros e escopo de lotação) reaproveitam
+    o job em andamento ou o arquivo já gerado, enquanto ele não expirar.
+    A Chefia só exporta o consolidado da própria lotação.
+    """
+    if current_user.get("perfil") not in RELATORIOS[pedido.relatorio].perfis:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado a este relatório.")
+    if pedido.formato == "excel_resumo" and RELATORIOS[pedido.relatorio].resumo is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Este relatório não possui planilhas de resumo.")
+
+    lotacao = None
+    if pedido.relatorio == "consolidado":
+        if current_user.get("perfil") == PerfilUsuario.UDP.value:
+            lotacao = pedido.lotacao
+        else:
+            lotacao = await _get_chefia_lotacao(db, current_user)
+
+    extensao, media_type = relatorio_controller.EXPORT_FORMATS[pedido.formato]
+    # A versão dos dados faz parte da chave: após uma alteração, um novo arquivo é gerado
+    key = job_key(
+        relatorio=pedido.relatorio, formato=pedido.formato,
+        ano=pedido.ano, vinculo=pedido.vinculo, lotacao=lotacao,
+        versao=report_cache.version_token(lotacao),
+    )
+    session_maker = request.app.state.app_db.read_session_maker
+
+    async def producer(destino: str):
+        await relatorio_controller.salvar_exportacao(
+            session_maker, destino, pedido.relatorio, pedido.formato,
+            lotacao=lotacao, ano=pedido.ano, vinculo=pedido.vinculo,
+        )
 
-    data = await relatorio_controller.get_relatorio_consolidado(
-        db, lotacao=user.lotacao, ano=ano, vinculo=vinculo
+    job = export_job_manager.submit(
+        key, pedido.relatorio, pedido.formato,
+        f"relatorio_{pedido.relatorio}.{extensao}", media_type, lotacao, producer,
     )
-    file_stream = await relatorio_controller.export_consolidado_to_pdf(data)
-    headers = {'Content-Disposition': 'attachment; filename="relatorio_consolidado.pdf"'}
-    return StreamingResponse(file_stream, media_type='application/pdf', headers=headers)
+    return _export_job_response(job)
 
 
-@router.get("/udp/consolidado/export/excel", dependencies=[Depends(is_udp)])
-async def export_consolidado_excel_udp(
-    ano: str | None = None,
-    vinculo: str | None = None,
-    lotacao: str | None = None,
-    db: AsyncSession = Depends(get_app_db_session)
+@router.get("/exports/{job_id}", response_model=ExportJobResponse, dependencies=[Depends(is_chefia_or_udp)])
+async def obter_exportacao(
+    job_id: str,
+    wait: float = 0,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
-    Exporta o relatório consolidado para Excel (UDP).
+    Consulta o status de uma exportação.
+    Com `wait`, aguarda a conclusão por até esse número de segundos (máximo 30).
     """
-    data = await relatorio_controller.get_relatorio_consolidado(
-        db, lotacao=lotacao, ano=ano, vinculo=vinculo
-    )
-    file_stream = await excel_helper.export_to_excel(data)
-    headers = {'Content-Disposition': 'attachment; filename="relatorio_consolidado.xlsx"'}
-    return StreamingResponse(file_stream, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers=headers)
+    job = await _get_export_job_autorizado(job_id, current_user, db)
+    job = await export_job_manager.wait(job, min(max(wait, 0), EXPORT_JOB_MAX_WAIT_SECONDS))
+    return _export_job_response(job)
 
 
-@router.get("/udp/consolidado/export/pdf", dependencies=[Depends(is_udp)])
-async def export_consolidado_pdf_udp(
-    ano: str | None = None,
-    vinculo: str | None = None,
-    lotacao: str | None = None,
-    db: AsyncSession = Depends(get_app_db_session)
+@router.get("/exports/{job_id}/download", dependencies=[Depends(is_chefia_or_udp)])
+async def baixar_exportacao(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
-    Exporta o relatório consolidado para PDF (UDP).
+    Baixa o arquivo de uma exportação concluída.
     """
-    data = await relatorio_controller.get_relatorio_consolidado(
-        db, lotacao=lotacao, ano=ano, vinculo=vinculo
-    )
-    file_stream = await relatorio_controller.export_consolidado_to_pdf(data)
-    headers = {'Content-Disposition': 'attachment; filename="relatorio_consolidado.pdf"'}
-    return StreamingResponse(file_stream, media_type='application/pdf', headers=headers)
+    job = await _get_export_job_autorizado(job_id, current_user, db)
+    if job.status != STATUS_CONCLUIDO:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Exportação ainda não disponível (status: {job.status}).")
+    return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from pydantic import BaseModel
 
 from ..auth.auth import auth_handler
-from ..resources.database import get_app_db_session
-from ..controllers import usuario_controller, dashboard_controller
+from ..resources.database import get_app_db_read_session
+from ..controllers import usuario_controller, dashboard_controller, evento_controller
+from ..helpers import etag_helper, sse_helper
+from ..resources.report_cache import report_cache
+from ..resources.live_events import event_broker, LIVE_EVENTS_HEARTBEAT_SECONDS
 
 router = APIRouter(
     prefix="/api/utils",
@@ -23,20 +27,56 @@ class DashboardStatsResponse(BaseModel):
 
 @router.get("/lotacoes", response_model=List[str], dependencies=[Depends(auth_handler.decode_token)])
 async def get_lotacoes_unicas(
-    db: AsyncSession = Depends(get_app_db_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Retorna uma lista de todas as lotações (setores) únicas cadastradas no sistema.
     """
+    etag_helper.verificar_etag(request, response, report_cache.validator())
     return await usuario_controller.listar_lotacoes_unicas(db)
 
 @router.get("/stats", response_model=DashboardStatsResponse)
 async def get_stats(
+    request: Request,
+    response: Response,
     current_user: dict = Depends(auth_handler.decode_token),
-    db: AsyncSession = Depends(get_app_db_session)
+    db: AsyncSession = Depends(get_app_db_read_session)
 ):
     """
     Retorna estatísticas gerais e pessoais para o dashboard.
+    Responde 304 enquanto nenhum dado mudar desde a versão que o cliente já possui.
     """
     user_id = current_user.get("sub") or current_user.get("username")
+    # As estatísticas pessoais variam por usuário
+    etag_helper.verificar_etag(request, response, user_id, report_cache.validator())
     return await dashboard_controller.get_dashboard_stats(db, user_id=user_id)
+
+@router.get("/eventos")
+async def stream_eventos(
+    request: Request,
+    current_user: dict = Depends(auth_handler.decode_token),
+    db: AsyncSession = Depends(get_app_db_read_session)
+):
+    """
+    Fluxo Server-Sent Events com as variações dos contadores de atribuições por status,
+    enviadas assim que uma alteração é confirmada (certificado enviado, validação, nova
+    atribuição...), em substituição à consulta periódica de /stats e das pendências.
+
+    Cada evento 'contadores' traz o `escopo` ('usuario', 'lotacao' ou 'geral') e os
+    `deltas` por status (ex: {"Realizado": 1, "Pendente": -1}); as pendências de
+    validação da Chefia correspondem ao status 'Realizado' no escopo da lotação.
+    O evento 'pronto' indica que a assinatura está ativa: o cliente carrega os valores
+    iniciais a partir daí. Um evento 'resync' pede que os valores sejam recarregados.
+    """
+    escopos = await evento_controller.escopos_do_usuario(db, current_user)
+    # A conexão com o banco é liberada antes do fluxo, que pode durar horas
+    await db.close()
+
+    async def eventos():
+        with event_broker.assinar(escopos) as fila:
+            async for chunk in sse_helper.iter_eventos(fila, request.is_disconnected, LIVE_EVENTS_HEARTBEAT_SECONDS):
+                yield chunk
+
+    return StreamingResponse(eventos(), media_type=sse_helper.SSE_MEDIA_TYPE, headers=sse_helper.SSE_HEADERS)
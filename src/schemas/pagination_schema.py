@@ -1,8 +1,18 @@
 from pydantic import BaseModel
-from typing import List, TypeVar, Generic
+from typing import List, TypeVar, Generic, Optional
 
 DataType = TypeVar('DataType')
 
 class PaginatedResponse(BaseModel, Generic[DataType]):
     total_count: int
     data: List[DataType]
+
+class CursorPage(BaseModel, Generic[DataType]):
+    data: List[DataType]
+    next_cursor: Optional[str] = None # None quando não há mais páginas
+    total_count: Optional[int] = None # Preenchido apenas quando solicitado
+
+class ChangeFeedPage(BaseModel, Generic[DataType]):
+    data: List[DataType]
+    next_cursor: str # Sempre preenchido: posição a partir da qual buscar as próximas alterações
+    has_more: bool # Já existe outra página disponível
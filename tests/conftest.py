@@ -7,6 +7,7 @@ from typing import AsyncGenerator
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -17,8 +18,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from src.models.base import Base
 from src.resources.database import DatabaseManager
 
-# Use an in-memory SQLite database for tests
-TEST_DSN = "sqlite+aiosqlite:///:memory:"
+# In-memory SQLite by default; TEST_DATABASE_URL runs the suite against another
+# backend (e.g. postgresql+asyncpg://... on an empty database that can be reset)
+TEST_DSN = os.getenv("TEST_DATABASE_URL") or "sqlite+aiosqlite:///:memory:"
+TEST_SQLITE = TEST_DSN.startswith("sqlite")
 
 
 @pytest.fixture(scope="session")
@@ -29,10 +32,19 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_report_cache():
+    """Each test uses a fresh database, so cached report results must not leak between tests."""
+    from src.resources.report_cache import report_cache
+    report_cache.clear()
+    yield
+    report_cache.clear()
+
+
 @pytest.fixture
 async def test_db() -> AsyncGenerator[DatabaseManager, None]:
     """
-    Creates an in-memory SQLite database with all tables.
+    Creates the test database (in-memory SQLite by default) with all tables.
     Yields the DatabaseManager and tears down after each test.
     """
     engine = create_async_engine(TEST_DSN, echo=False)
@@ -59,7 +71,7 @@ async def db_session(test_db) -> AsyncGenerator[AsyncSession, None]:
 @pytest.fixture
 async def app():
     """
-    Creates a test FastAPI app with an in-memory SQLite database.
+    Creates a test FastAPI app on the test database.
     """
     os.environ.setdefault("SQLITE_DSN", TEST_DSN)
 
@@ -76,9 +88,44 @@ async def app():
 
     yield app
 
+    async with test_manager.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
     await test_manager.close_connection()
 
 
+@pytest.fixture
+def query_plans():
+    """
+    Runs a coroutine factory against a session and returns the SQLite plan
+    (EXPLAIN QUERY PLAN, details joined by " | ") of each SELECT it emitted.
+    """
+    if not TEST_SQLITE:
+        pytest.skip("query plan assertions are written for SQLite's EXPLAIN QUERY PLAN")
+
+    async def planos(db, executar):
+        consultas = []
+
+        def capturar(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                consultas.append((statement, parameters))
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", capturar)
+        try:
+            await executar()
+        finally:
+            event.remove(engine, "before_cursor_execute", capturar)
+
+        conn = await db.connection()
+        resultado = []
+        for statement, parameters in consultas:
+            rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+            resultado.append(" | ".join(row[-1] for row in rows))
+        return resultado
+
+    return planos
+
+
 @pytest.fixture
 async def async_client(app) -> AsyncGenerator[AsyncClient, None]:
     """Provides an async HTTP client against the test app."""
@@ -0,0 +1,202 @@
+"""Tests for the incremental ("changes since") feed of the capacitações dataset."""
+import asyncio
+import os
+import jwt
+import pytest
+from uuid import uuid4
+from sqlalchemy import update
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao, AlteracaoAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import alteracao_controller, atribuicao_controller, curso_controller, resumo_controller, usuario_controller
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+async def _seed(db, n_users=3):
+    users = [
+        Usuario(id=f"feed-{i}", nome=f"Servidor {i}", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+        for i in range(n_users)
+    ]
+    curso = Curso(id=str(uuid4()), titulo="Curso Feed", ano_gd="2025")
+    db.add_all(users + [curso])
+    await db.commit()
+    return users, curso
+
+
+async def _sincronizar(db, cursor=None, limit=1000):
+    """Consome o feed até o fim, como um consumidor faria; retorna (itens, cursor)."""
+    itens = []
+    while True:
+        pagina = await alteracao_controller.listar_alteracoes(db, cursor=cursor, limit=limit)
+        itens.extend(pagina["data"])
+        cursor = pagina["next_cursor"]
+        if not pagina["has_more"]:
+            return itens, cursor
+
+
+@pytest.mark.asyncio
+async def test_full_load_then_only_changes(db_session):
+    users, curso = await _seed(db_session)
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+
+    # Carga inicial em páginas: todas as atribuições atuais
+    itens, cursor = await _sincronizar(db_session, limit=2)
+    assert len(itens) == 3
+    assert {item["operacao"] for item in itens} == {"upsert"}
+
+    # Sem alterações, nada a sincronizar
+    itens, cursor = await _sincronizar(db_session, cursor)
+    assert itens == []
+
+    alterada = (await db_session.execute(
+        Atribuicao.__table__.select().where(Atribuicao.user_id == users[0].id)
+    )).mappings().one()["id"]
+    await atribuicao_controller.validar_atribuicao(db_session, alterada, StatusAtribuicao.VALIDADO)
+
+    itens, cursor = await _sincronizar(db_session, cursor)
+    assert [(item["operacao"], item["atribuicao_id"]) for item in itens] == [("upsert", alterada)]
+    assert itens[0]["dados"]["status"] == StatusAtribuicao.VALIDADO.value
+
+
+@pytest.mark.asyncio
+async def test_deletions_are_published(db_session):
+    users, curso = await _seed(db_session, n_users=2)
+    _, cursor = await _sincronizar(db_session)
+
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+    await curso_controller.deletar_curso(db_session, curso.id)
+
+    # Criadas e removidas depois do cursor: publicadas só como remoção
+    itens, _ = await _sincronizar(db_session, cursor)
+    assert len(itens) == 2
+    assert {item["operacao"] for item in itens} == {"delete"}
+    assert all(item["dados"] is None for item in itens)
+
+
+@pytest.mark.asyncio
+async def test_only_changed_rows_are_recorded(db_session):
+    users, curso = await _seed(db_session)
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+
+    async def _registradas():
+        return len((await db_session.execute(AlteracaoAtribuicao.__table__.select())).all())
+    assert await _registradas() == 3
+
+    # Bloco sem alteração efetiva nas linhas do dataset: nada é registrado
+    async with resumo_controller.atualizando_resumo(db_session, Atribuicao.curso_id == curso.id):
+        pass
+    await db_session.commit()
+    assert await _registradas() == 3
+
+    # Mudança no curso altera a linha de todas as atribuições do curso
+    async with resumo_controller.atualizando_resumo(db_session, Atribuicao.curso_id == curso.id):
+        curso.titulo = "Curso Feed (revisado)"
+    await db_session.commit()
+    assert await _registradas() == 6
+
+
+@pytest.mark.asyncio
+async def test_course_csv_import_publishes_course_assignments(db_session):
+    users, curso = await _seed(db_session, n_users=2)
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+    _, cursor = await _sincronizar(db_session)
+
+    csv_content = f"id_curso;nome_curso;carga_horaria\n{curso.id};Curso Feed (CSV);40\n"
+    resultado = await curso_controller.importar_cursos_csv(csv_content.encode("utf-8"), db_session)
+    assert resultado["atualizados"] == 1
+
+    itens, cursor = await _sincronizar(db_session, cursor)
+    assert len(itens) == 2
+    assert {item["operacao"] for item in itens} == {"upsert"}
+    assert {(item["dados"]["nome_curso"], item["dados"]["carga_horaria"]) for item in itens} == {("Curso Feed (CSV)", 40)}
+
+    # Reimportar o mesmo arquivo não altera nada
+    await curso_controller.importar_cursos_csv(csv_content.encode("utf-8"), db_session)
+    itens, _ = await _sincronizar(db_session, cursor)
+    assert itens == []
+
+
+@pytest.mark.asyncio
+async def test_user_rename_from_ad_publishes_user_assignments(db_session):
+    users, curso = await _seed(db_session, n_users=2)
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+    _, cursor = await _sincronizar(db_session)
+
+    # Só o nome muda (mesma lotação): as linhas do usuário no dataset mudam
+    await usuario_controller.sincronizar_usuario(db_session, {
+        "sAMAccountName": [users[0].id],
+        "displayName": ["Servidor 0 (novo nome)"],
+        "department": ["SETOR A"],
+    })
+
+    itens, cursor = await _sincronizar(db_session, cursor)
+    assert len(itens) == 1
+    assert itens[0]["operacao"] == "upsert"
+    assert itens[0]["dados"]["nome_profissional"] == "Servidor 0 (novo nome)"
+
+    # Sincronização sem mudanças não gera alterações
+    await usuario_controller.sincronizar_usuario(db_session, {
+        "sAMAccountName": [users[0].id],
+        "displayName": ["Servidor 0 (novo nome)"],
+        "department": ["SETOR A"],
+    })
+    itens, _ = await _sincronizar(db_session, cursor)
+    assert itens == []
+
+
+@pytest.mark.asyncio
+async def test_feed_writes_become_visible_in_seq_order(db_session, test_db):
+    if db_session.get_bind().dialect.name != "postgresql":
+        pytest.skip("no SQLite há um único escritor; a ordem de commit já segue o seq")
+    curso = Curso(id=str(uuid4()), titulo="Curso Feed", ano_gd="2025")
+    db_session.add_all([
+        curso,
+        Usuario(id="feed-a", nome="Servidor A", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A"),
+        Usuario(id="feed-b", nome="Servidor B", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR B"),
+    ])
+    await db_session.commit()
+    for lotacao in ("SETOR A", "SETOR B"):
+        await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, lotacao)
+    ids = {row["user_id"]: row["id"] for row in (await db_session.execute(Atribuicao.__table__.select())).mappings()}
+    _, cursor = await _sincronizar(db_session)
+
+    async def concluir(session, user_id):
+        async with resumo_controller.atualizando_resumo(session, Atribuicao.id == ids[user_id]):
+            await session.execute(
+                update(Atribuicao).where(Atribuicao.id == ids[user_id]).values(status=StatusAtribuicao.REALIZADO)
+            )
+
+    async with test_db() as primeira, test_db() as segunda:
+        # A primeira transação gera o menor seq e ainda não fez commit
+        await concluir(primeira, "feed-a")
+
+        async def escrever_segunda():
+            await concluir(segunda, "feed-b")
+            await segunda.commit()
+
+        tarefa = asyncio.create_task(escrever_segunda())
+        await asyncio.sleep(0.3)
+        # A segunda aguarda o commit da primeira: um leitor não vê um seq maior antes do menor
+        assert not tarefa.done()
+        itens, _ = await _sincronizar(db_session, cursor)
+        assert itens == []
+
+        await primeira.commit()
+        await asyncio.wait_for(tarefa, 5)
+
+    itens, _ = await _sincronizar(db_session, cursor)
+    assert [item["atribuicao_id"] for item in itens] == [ids["feed-a"], ids["feed-b"]]
+
+
+@pytest.mark.asyncio
+async def test_feed_endpoint_rejects_invalid_cursor(async_client):
+    token = jwt.encode({"sub": "admin.user", "perfil": PerfilUsuario.UDP.value}, JWT_SECRET, algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get("/api/relatorios/capacitacoes/alteracoes", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["has_more"] is False
+
+    response = await async_client.get("/api/relatorios/capacitacoes/alteracoes?cursor=xyz", headers=headers)
+    assert response.status_code == 400
@@ -8,6 +8,18 @@ from src.models import Atribuicao, StatusAtribuicao, Usuario, Curso, Certificado
 from src.controllers import atribuicao_controller
 
 
+async def _referencias(db, user_id=None, curso_id=None, certificado_id=None):
+    """Creates the rows an assignment references (foreign keys are enforced outside SQLite)."""
+    if user_id:
+        db.add(Usuario(id=user_id, nome="Usuário Teste"))
+    if curso_id:
+        db.add(Curso(id=curso_id, titulo="Curso Teste", ano_gd="2025"))
+    await db.flush()
+    if certificado_id:
+        db.add(Certificado(id=certificado_id, curso_id=curso_id))
+    await db.commit()
+
+
 @pytest.mark.asyncio
 async def test_criar_atribuicoes_para_lotacao(db_session, test_user_data):
     """Creating assignments should insert records with PENDENTE status."""
@@ -61,6 +73,7 @@ async def test_atualizar_atribuicao_com_certificado(db_session, test_user_data):
     atribuicao_id = str(uuid4())
     curso_id = str(uuid4())
     cert_id = str(uuid4())
+    await _referencias(db_session, curso_id=curso_id, certificado_id=cert_id)
 
     atrib = Atribuicao(
         id=atribuicao_id,
@@ -88,10 +101,12 @@ async def test_atualizar_atribuicao_com_certificado(db_session, test_user_data):
 async def test_validar_atribuicao(db_session):
     """Validating attribution should update status and set data_validacao."""
     atribuicao_id = str(uuid4())
+    curso_id = str(uuid4())
+    await _referencias(db_session, user_id="u-teste", curso_id=curso_id)
     atrib = Atribuicao(
         id=atribuicao_id,
         user_id="u-teste",
-        curso_id=str(uuid4()),
+        curso_id=curso_id,
         status=StatusAtribuicao.REALIZADO,
     )
     db_session.add(atrib)
@@ -113,10 +128,12 @@ async def test_validar_atribuicao(db_session):
 async def test_validar_atribuicao_recusado(db_session):
     """Rejecting attribution should set status to RECUSADO."""
     atribuicao_id = str(uuid4())
+    curso_id = str(uuid4())
+    await _referencias(db_session, user_id="u-teste", curso_id=curso_id)
     atrib = Atribuicao(
         id=atribuicao_id,
         user_id="u-teste",
-        curso_id=str(uuid4()),
+        curso_id=curso_id,
         status=StatusAtribuicao.REALIZADO,
     )
     db_session.add(atrib)
@@ -139,6 +156,7 @@ async def test_listar_atribuicoes_por_usuario(db_session, test_curso_data):
     curso = Curso(**test_curso_data)
     db_session.add(curso)
     await db_session.commit()
+    await _referencias(db_session, user_id="u-teste")
 
     cert = Certificado(id="cert-1", curso_id=curso.id, file_path="/uploads/cert.pdf", link="https://example.com/cert")
     db_session.add(cert)
@@ -172,6 +190,7 @@ async def test_listar_atribuicoes_sem_certificado(db_session, test_curso_data):
     curso = Curso(**test_curso_data)
     db_session.add(curso)
     await db_session.commit()
+    await _referencias(db_session, user_id="u-teste")
 
     atrib = Atribuicao(
         id=str(uuid4()),
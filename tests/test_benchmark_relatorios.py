@@ -0,0 +1,33 @@
+"""Smoke test of the report benchmark suite at a tiny scale."""
+import json
+import pytest
+
+import benchmark_relatorios
+
+
+@pytest.mark.asyncio
+async def test_benchmark_measures_every_case(tmp_path):
+    execucao = await benchmark_relatorios.executar_benchmark(
+        usuarios=40, cursos=5, atribuicoes=120, repeticoes=1, db_path=str(tmp_path / "bench.db")
+    )
+
+    casos = {r["caso"]: r for r in execucao["resultados"]}
+    assert {"consulta.consolidado", "export.consolidado.excel_resumo", "export.capacitacoes.pdf", "export.dataset.arrow"} <= casos.keys()
+    assert casos["consulta.consolidado"]["linhas"] == 120
+    assert all(r["latencia_ms"] > 0 and r["pico_rss_mb"] > 0 for r in casos.values())
+    assert casos["export.dataset.parquet"]["bytes"] > 0
+    json.dumps(execucao)
+
+
+def test_compare_flags_regressions():
+    anterior = {"commit": "a", "executado_em": "", "resultados": [
+        {"caso": "consulta.x", "latencia_ms": 100.0, "acrescimo_rss_mb": 10.0},
+        {"caso": "consulta.y", "latencia_ms": 100.0, "acrescimo_rss_mb": 10.0},
+    ]}
+    atual = {"commit": "b", "executado_em": "", "resultados": [
+        {"caso": "consulta.x", "latencia_ms": 150.0, "acrescimo_rss_mb": 10.0},
+        {"caso": "consulta.y", "latencia_ms": 105.0, "acrescimo_rss_mb": 9.0},
+    ]}
+
+    regressoes = benchmark_relatorios.comparar(anterior, atual, limite=0.2)
+    assert len(regressoes) == 1 and regressoes[0].startswith("consulta.x")
@@ -0,0 +1,93 @@
+"""Tests for keyset pagination of the consolidated report."""
+import os
+import jwt
+import pytest
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import relatorio_controller
+from src.providers.implementations.relatorio_definicoes import CONSOLIDADO
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+def _create_token(sub: str, perfil: str) -> str:
+    return jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+
+
+async def _seed(session):
+    # Nomes repetidos e dois cursos com o mesmo título exercitam o desempate por atribuição
+    users = [
+        Usuario(id=f"pag-{i}", nome=f"Servidor {i % 3}", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+        for i in range(5)
+    ]
+    cursos = [Curso(id=str(uuid4()), titulo="Curso Igual", ano_gd="2025") for _ in range(2)]
+    session.add_all(users + cursos)
+    await session.flush()
+    session.add_all([
+        Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE)
+        for user in users for curso in cursos
+    ])
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_full_report_in_order(db_session):
+    await _seed(db_session)
+    completo = await relatorio_controller.get_relatorio_consolidado(db_session, lotacao="SETOR A")
+
+    paginas = []
+    cursor = None
+    while True:
+        pagina = await relatorio_controller.paginar_relatorio(
+            db_session, CONSOLIDADO, lotacao="SETOR A", limit=3, cursor=cursor, incluir_total=cursor is None
+        )
+        paginas.append(pagina)
+        cursor = pagina["next_cursor"]
+        if cursor is None:
+            break
+
+    assert paginas[0]["total_count"] == 10
+    assert paginas[1]["total_count"] is None
+    assert [len(p["data"]) for p in paginas] == [3, 3, 3, 1]
+    assert [row for p in paginas for row in p["data"]] == completo
+
+
+@pytest.mark.asyncio
+async def test_exact_page_boundary_has_no_next_cursor(db_session):
+    await _seed(db_session)
+    pagina = await relatorio_controller.paginar_relatorio(db_session, CONSOLIDADO, limit=10)
+    assert len(pagina["data"]) == 10
+    assert pagina["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_raises(db_session):
+    with pytest.raises(ValueError):
+        await relatorio_controller.paginar_relatorio(db_session, CONSOLIDADO, cursor="nao-e-um-cursor")
+
+
+@pytest.mark.asyncio
+async def test_paginated_endpoint(async_client, app):
+    async with app.state.app_db.async_session_maker() as session:
+        await _seed(session)
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    response = await async_client.get("/api/relatorios/udp/consolidado/paginado?limit=4&incluir_total=true", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["data"]) == 4
+    assert body["total_count"] == 10
+
+    seguinte = await async_client.get(
+        f"/api/relatorios/udp/consolidado/paginado?limit=4&cursor={body['next_cursor']}", headers=headers
+    )
+    assert seguinte.status_code == 200
+    assert seguinte.json()["data"][0] != body["data"][-1]
+
+    invalido = await async_client.get("/api/relatorios/udp/consolidado/paginado?cursor=x", headers=headers)
+    assert invalido.status_code == 400
+
+    grande = await async_client.get("/api/relatorios/udp/consolidado/paginado?limit=100000", headers=headers)
+    assert grande.status_code == 422
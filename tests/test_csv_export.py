@@ -0,0 +1,76 @@
+"""Tests for the streaming CSV export of reports."""
+import csv
+import io
+import os
+import jwt
+import pytest
+from datetime import datetime
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.helpers import csv_helper
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+def _create_token(sub: str, perfil: str) -> str:
+    return jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+
+
+async def _rows(items):
+    for item in items:
+        yield item
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+@pytest.mark.asyncio
+async def test_stream_csv_format():
+    content = await _collect(csv_helper.stream_csv(_rows([
+        {"nome_profissional": "José; da Silva", "status": StatusAtribuicao.CONCLUIDO,
+         "data_envio_certificado": datetime(2025, 3, 1, 10, 0), "cpf": None},
+    ])))
+
+    assert content.startswith(csv_helper.UTF8_BOM)
+    linhas = list(csv.reader(io.StringIO(content.decode("utf-8-sig")), delimiter=";"))
+    assert linhas == [
+        ["Nome", "Status", "Data Envio", "CPF"],
+        ["José; da Silva", "Concluído", "2025-03-01T10:00:00", ""],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_csv_flushes_in_chunks(monkeypatch):
+    monkeypatch.setattr(csv_helper, "CSV_FLUSH_SIZE", 100)
+    chunks = [c async for c in csv_helper.stream_csv(_rows([{"nome_curso": "x" * 50}] * 10))]
+    assert len(chunks) > 3
+
+
+@pytest.mark.asyncio
+async def test_stream_csv_empty_report():
+    assert await _collect(csv_helper.stream_csv(_rows([]))) == csv_helper.UTF8_BOM
+
+
+@pytest.mark.asyncio
+async def test_consolidado_csv_endpoint(async_client, app):
+    async with app.state.app_db.async_session_maker() as session:
+        curso = Curso(id=str(uuid4()), titulo="Curso CSV", ano_gd="2025")
+        user = Usuario(id="csv-user", nome="Servidora CSV", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+        session.add_all([curso, user])
+        await session.flush()
+        session.add(Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE))
+        await session.commit()
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    response = await async_client.get("/api/relatorios/udp/consolidado/export/csv", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "relatorio_consolidado.csv" in response.headers["content-disposition"]
+    linhas = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+    assert linhas[0][1:5] == ["Nome", "Vínculo", "Setor", "Curso"]
+    assert linhas[1][1] == "Servidora CSV"
+    assert "Pendente" in linhas[1]
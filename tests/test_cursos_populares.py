@@ -0,0 +1,74 @@
+"""Tests for the popular courses ranking."""
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, Inscricao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import relatorio_controller
+
+
+async def _seed(db):
+    agora = datetime.utcnow()
+    users = [
+        Usuario(id=f"pop-{i}", nome=f"Servidor {i}", perfil=PerfilUsuario.TRABALHADOR,
+                lotacao="SETOR A" if i < 3 else "SETOR B")
+        for i in range(5)
+    ]
+    curso_a = Curso(id="curso-a", titulo="Curso A")
+    curso_b = Curso(id="curso-b", titulo="Curso B")
+    db.add_all(users + [curso_a, curso_b])
+    await db.flush()
+
+    # Curso A: 3 inscrições e 3 atribuições (SETOR A), todas recentes
+    for user in users[:3]:
+        db.add(Inscricao(id=str(uuid4()), user_id=user.id, curso_id=curso_a.id, inscrito_em=agora - timedelta(days=5)))
+        db.add(Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=curso_a.id, status=StatusAtribuicao.EM_ANDAMENTO,
+                          atribuido_em=agora - timedelta(days=5)))
+    # Curso B: 2 inscrições antigas (SETOR B) e 1 atribuição recente
+    for user in users[3:]:
+        db.add(Inscricao(id=str(uuid4()), user_id=user.id, curso_id=curso_b.id, inscrito_em=agora - timedelta(days=200)))
+    db.add(Atribuicao(id=str(uuid4()), user_id=users[3].id, curso_id=curso_b.id, status=StatusAtribuicao.PENDENTE,
+                      atribuido_em=agora - timedelta(days=200), data_atribuicao=agora - timedelta(days=10)))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_counts_are_not_inflated_by_the_join(db_session):
+    await _seed(db_session)
+    ranking = await relatorio_controller.listar_cursos_mais_inscritos_udp(db_session)
+
+    assert [(c["titulo"], c["total_inscricoes"], c["total_atribuicoes"]) for c in ranking] == [
+        ("Curso A", 3, 3),
+        ("Curso B", 2, 1),
+    ]
+    # Inteiros em qualquer banco (no PostgreSQL, SUM de COUNT seria numeric/Decimal)
+    assert all(type(c["total_inscricoes"]) is int and type(c["total_atribuicoes"]) is int for c in ranking)
+
+
+@pytest.mark.asyncio
+async def test_time_window(db_session):
+    await _seed(db_session)
+    ranking = await relatorio_controller.listar_cursos_mais_inscritos_udp(db_session, dias=30)
+
+    assert [(c["titulo"], c["total_inscricoes"], c["total_atribuicoes"]) for c in ranking] == [
+        ("Curso A", 3, 3),
+        ("Curso B", 0, 1),  # data_atribuicao recente prevalece sobre atribuido_em
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ranking_per_lotacao(db_session):
+    await _seed(db_session)
+    ranking = await relatorio_controller.listar_cursos_mais_inscritos_udp(db_session, limit=1, por_lotacao=True)
+
+    assert [(c["lotacao"], c["posicao"], c["titulo"], c["total_inscricoes"]) for c in ranking] == [
+        ("SETOR A", 1, "Curso A", 3),
+        ("SETOR B", 1, "Curso B", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalid_window(db_session):
+    with pytest.raises(ValueError):
+        await relatorio_controller.listar_cursos_mais_inscritos_udp(db_session, dias=7)
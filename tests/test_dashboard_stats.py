@@ -4,7 +4,7 @@ import jwt
 import pytest
 from uuid import uuid4
 
-from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao, Inscricao
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao, Inscricao, Certificado
 from src.models.usuario import PerfilUsuario
 
 from src.auth.auth import auth_handler
@@ -50,3 +50,45 @@ async def test_get_dashboard_stats_endpoint(async_client, app):
     assert "meus_certificados_enviados" in data
     assert "meus_certificados_validados" in data
     assert data["minhas_inscricoes"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_dashboard_stats_counts_and_global_cache(db_session):
+    from src.controllers import dashboard_controller
+    from src.resources.report_cache import bump_data_version
+
+    user = Usuario(id="Stats.User", nome="Usuario Stats", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR TESTE")
+    cursos = [Curso(id=str(uuid4()), titulo=f"Curso {i}", carga_horaria=10) for i in range(3)]
+    db_session.add_all([user, *cursos])
+    await db_session.flush()
+    certificados = [Certificado(id=str(uuid4()), curso_id=curso.id) for curso in cursos[:2]]
+    db_session.add_all(certificados)
+    await db_session.flush()
+    db_session.add_all([
+        # Inscrição e atribuição no mesmo curso contam uma vez
+        Inscricao(id=str(uuid4()), user_id=user.id, curso_id=cursos[0].id),
+        Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=cursos[0].id, status=StatusAtribuicao.VALIDADO,
+                   certificado_id=certificados[0].id),
+        Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=cursos[1].id, status=StatusAtribuicao.REALIZADO,
+                   certificado_id=certificados[1].id),
+        Inscricao(id=str(uuid4()), user_id=user.id, curso_id=cursos[2].id),
+    ])
+    await db_session.commit()
+
+    stats = await dashboard_controller.get_dashboard_stats(db_session, user_id="stats.user")
+    assert stats == {
+        "total_cursos": 3,
+        "total_inscricoes": 2,
+        "total_certificados_validados": 0,
+        "total_usuarios": 1,
+        "minhas_inscricoes": 3,
+        "meus_certificados_enviados": 2,
+        "meus_certificados_validados": 1,
+    }
+
+    # Os totais gerais só são recalculados quando os dados mudam
+    db_session.add(Curso(id=str(uuid4()), titulo="Curso novo", carga_horaria=1))
+    await db_session.commit()
+    assert (await dashboard_controller.get_dashboard_stats(db_session))["total_cursos"] == 3
+    bump_data_version()
+    assert (await dashboard_controller.get_dashboard_stats(db_session))["total_cursos"] == 4
@@ -0,0 +1,91 @@
+"""Tests for the columnar (Parquet/Arrow) training dataset export."""
+import os
+import jwt
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime
+from io import BytesIO
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, Certificado, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import relatorio_controller
+from src.providers.implementations.relatorio_provider import RelatorioProvider
+from src.helpers import arrow_helper
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+def _create_token(sub: str, perfil: str) -> str:
+    return jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+
+
+async def _seed(session):
+    curso = Curso(id=str(uuid4()), titulo="Curso Dataset", ano_gd="2025", carga_horaria=40)
+    users = [
+        Usuario(id=f"ds-{i}", nome=f"Servidor {i}", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A", vinculo="RJU")
+        for i in range(3)
+    ]
+    session.add_all(users + [curso])
+    await session.flush()
+    cert = Certificado(id=str(uuid4()), file_path="uploads/c.pdf", curso_id=curso.id)
+    session.add(cert)
+    await session.flush()
+    session.add_all([
+        Atribuicao(id=str(uuid4()), user_id=users[0].id, curso_id=curso.id, status=StatusAtribuicao.CONCLUIDO,
+                   certificado_id=cert.id, data_conclusao=datetime(2025, 5, 2, 8, 30)),
+        Atribuicao(id=str(uuid4()), user_id=users[1].id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE),
+        Atribuicao(id=str(uuid4()), user_id=users[2].id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE),
+    ])
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_parquet_dataset_is_typed(db_session, monkeypatch):
+    await _seed(db_session)
+    # Lotes pequenos para exercitar vários record batches
+    monkeypatch.setattr(relatorio_controller, "EXPORT_BATCH_SIZE", 2)
+
+    file_stream = await relatorio_controller.exportar_dataset_capacitacoes(RelatorioProvider(db_session), "parquet")
+    table = pq.read_table(BytesIO(file_stream.read()))
+
+    assert table.num_rows == 3
+    assert table.schema.field("carga_horaria").type == pa.int32()
+    assert table.schema.field("data_conclusao").type == pa.timestamp("us")
+    assert table.schema.field("certificado").type == pa.bool_()
+    linhas = sorted(table.to_pylist(), key=lambda r: r["id"])
+    assert linhas[0]["status"] == "Concluído"
+    assert linhas[0]["certificado"] is True
+    assert linhas[0]["data_conclusao"] == datetime(2025, 5, 2, 8, 30)
+    assert linhas[1]["certificado"] is False
+
+
+@pytest.mark.asyncio
+async def test_arrow_dataset_can_be_memory_mapped(db_session, tmp_path, monkeypatch):
+    await _seed(db_session)
+    # Um lote por linha, com status diferentes: o arquivo IPC exige o mesmo dicionário em todos
+    monkeypatch.setattr(relatorio_controller, "EXPORT_BATCH_SIZE", 1)
+    destino = tmp_path / "capacitacoes.arrow"
+    with open(destino, "wb") as sink:
+        await relatorio_controller.exportar_dataset_capacitacoes(RelatorioProvider(db_session), "arrow", sink=sink)
+
+    with pa.memory_map(str(destino)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.num_rows == 3
+    assert table.schema == arrow_helper.CAPACITACOES_SCHEMA
+
+
+@pytest.mark.asyncio
+async def test_dataset_endpoint(async_client, app):
+    async with app.state.app_db.async_session_maker() as session:
+        await _seed(session)
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    response = await async_client.get("/api/relatorios/capacitacoes/export/dataset?ano=2025", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == arrow_helper.PARQUET_MEDIA_TYPE
+    assert pq.read_table(BytesIO(response.content)).num_rows == 3
+
+    invalido = await async_client.get("/api/relatorios/capacitacoes/export/dataset?formato=xls", headers=headers)
+    assert invalido.status_code == 422
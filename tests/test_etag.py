@@ -0,0 +1,91 @@
+"""Tests for ETag / If-None-Match validation of report and dashboard endpoints."""
+import os
+import jwt
+import pytest
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.helpers import etag_helper
+from src.resources.report_cache import bump_data_version
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+def _headers(sub: str, perfil: str, **extra) -> dict:
+    token = jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}", **extra}
+
+
+async def _seed(app):
+    async with app.state.app_db.async_session_maker() as session:
+        curso = Curso(id=str(uuid4()), titulo="Curso ETag", ano_gd="2025")
+        chefe = Usuario(id="chefe.etag", nome="Chefe", perfil=PerfilUsuario.CHEFIA, lotacao="SETOR A")
+        user = Usuario(id="user.etag", nome="Servidor", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+        session.add_all([curso, chefe, user])
+        await session.flush()
+        session.add(Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE))
+        await session.commit()
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = etag_helper.calcular_etag("a", 1)
+    assert etag.startswith('W/"')
+    assert etag_helper._corresponde(f'"x", {etag.removeprefix("W/")}', etag)
+    assert etag_helper._corresponde("*", etag)
+    assert not etag_helper._corresponde('"x"', etag)
+
+
+@pytest.mark.asyncio
+async def test_chefia_report_returns_304_until_lotacao_changes(async_client, app):
+    await _seed(app)
+    url = "/api/relatorios/chefia/consolidado"
+    headers = _headers("chefe.etag", PerfilUsuario.CHEFIA.value)
+
+    response = await async_client.get(url, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # Mudanças em outra lotação não invalidam a resposta
+    bump_data_version("SETOR B")
+    assert (await async_client.get(url, headers={**headers, "If-None-Match": etag})).status_code == 304
+
+    bump_data_version("SETOR A")
+    response = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_etag_depends_on_query_and_accept(async_client, app):
+    await _seed(app)
+    headers = _headers("admin.user", PerfilUsuario.UDP.value)
+
+    json_etag = (await async_client.get("/api/relatorios/udp/consolidado", headers=headers)).headers["etag"]
+    filtrado = await async_client.get("/api/relatorios/udp/consolidado?ano=2025", headers=headers)
+    ndjson = await async_client.get(
+        "/api/relatorios/udp/consolidado", headers={**headers, "Accept": "application/x-ndjson"}
+    )
+
+    assert filtrado.headers["etag"] != json_etag
+    assert ndjson.headers["etag"] != json_etag
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+
+
+@pytest.mark.asyncio
+async def test_dashboard_stats_etag_is_per_user(async_client, app):
+    await _seed(app)
+    url = "/api/utils/stats"
+
+    response = await async_client.get(url, headers=_headers("user.etag", PerfilUsuario.TRABALHADOR.value))
+    etag = response.headers["etag"]
+
+    outro = _headers("chefe.etag", PerfilUsuario.CHEFIA.value, **{"If-None-Match": etag})
+    assert (await async_client.get(url, headers=outro)).status_code == 200
+    mesmo = _headers("user.etag", PerfilUsuario.TRABALHADOR.value, **{"If-None-Match": etag})
+    assert (await async_client.get(url, headers=mesmo)).status_code == 304
@@ -0,0 +1,115 @@
+"""Tests for the constant-memory streaming Excel export."""
+import pytest
+from uuid import uuid4
+from openpyxl import load_workbook
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import relatorio_controller
+from src.helpers import excel_helper
+from src.providers.implementations.relatorio_provider import RelatorioProvider
+from src.providers.implementations.relatorio_definicoes import CONSOLIDADO, CAPACITACOES
+
+
+async def _seed(db_session, total_usuarios: int = 5):
+    curso = Curso(id=str(uuid4()), titulo="Curso Export", carga_horaria=8, ano_gd="2025")
+    db_session.add(curso)
+    for i in range(total_usuarios):
+        user = Usuario(
+            id=f"user-{i:03d}",
+            nome=f"Servidor {i:03d}",
+            perfil=PerfilUsuario.TRABALHADOR,
+            lotacao="SETOR A" if i % 2 == 0 else "SETOR B",
+            vinculo="EBSERH",
+        )
+        db_session.add(user)
+        db_session.add(Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE))
+    await db_session.commit()
+
+
+async def _collect(rows):
+    return [row async for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_stream_consolidado_matches_list_across_batches(db_session):
+    """Streaming in small batches must yield the same rows, in order, as the list version."""
+    await _seed(db_session, total_usuarios=7)
+
+    expected = await relatorio_controller.get_relatorio_consolidado(db_session)
+    streamed = await _collect(relatorio_controller.stream_relatorio(db_session, CONSOLIDADO, batch_size=2))
+
+    assert streamed == expected
+    assert len(streamed) == 7
+
+
+@pytest.mark.asyncio
+async def test_stream_dados_capacitacoes_matches_list(db_session):
+    await _seed(db_session, total_usuarios=4)
+    provider = RelatorioProvider(db_session)
+
+    expected = await provider.listar_dados_capacitacoes(ano="2025")
+    streamed = await _collect(provider.stream_dados_capacitacoes(ano="2025", batch_size=3))
+
+    assert sorted(streamed, key=lambda r: r["id"]) == sorted(expected, key=lambda r: r["id"])
+    assert all(row["certificado"] == "Não" for row in streamed)
+
+
+@pytest.mark.asyncio
+async def test_exportar_consolidado_excel_writes_header_and_rows(db_session):
+    await _seed(db_session, total_usuarios=5)
+
+    file_stream = await relatorio_controller.exportar_relatorio(db_session, CONSOLIDADO, "excel", lotacao="SETOR A")
+    content = b"".join(excel_helper.iter_file(file_stream))
+    assert file_stream.closed
+
+    from io import BytesIO
+    sheet = load_workbook(BytesIO(content), read_only=True)["Relatorio"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][:2] == ("id", "nome")
+    assert len(rows) == 1 + 3
+    assert {row[3] for row in rows[1:]} == {"SETOR A"}
+
+
+@pytest.mark.asyncio
+async def test_stream_to_excel_empty_produces_valid_workbook():
+    async def no_rows():
+        return
+        yield
+
+    file_stream = await excel_helper.stream_to_excel(no_rows())
+    content = b"".join(excel_helper.iter_file(file_stream))
+
+    from io import BytesIO
+    sheet = load_workbook(BytesIO(content), read_only=True)["Relatorio"]
+    assert list(sheet.iter_rows(values_only=True)) == []
+
+
+@pytest.mark.asyncio
+async def test_exportar_consolidado_excel_resumo_sheets(db_session):
+    """Summary sheets are aggregated in the same pass that writes the detail sheet."""
+    await _seed(db_session, total_usuarios=5)
+
+    file_stream = await relatorio_controller.exportar_relatorio(db_session, CONSOLIDADO, "excel_resumo")
+    content = b"".join(excel_helper.iter_file(file_stream))
+
+    from io import BytesIO
+    workbook = load_workbook(BytesIO(content), read_only=True)
+    assert workbook.sheetnames == ["Resumo", "Por lotação", "Detalhe"]
+
+    resumo = list(workbook["Resumo"].iter_rows(values_only=True))
+    assert resumo[0][:3] == ("Lotação", "Pendente", "Em Andamento")
+    assert resumo[0][-1] == "Total"
+    assert [(linha[0], linha[1], linha[-1]) for linha in resumo[1:]] == [
+        ("SETOR A", 3, 3), ("SETOR B", 2, 2), ("Total", 5, 5),
+    ]
+
+    por_lotacao = list(workbook["Por lotação"].iter_rows(values_only=True))
+    assert por_lotacao[1] == ("SETOR A", 3, 3, 0, 0, 0)
+    assert len(list(workbook["Detalhe"].iter_rows(values_only=True))) == 1 + 5
+
+
+@pytest.mark.asyncio
+async def test_excel_resumo_requires_summary_definition(db_session):
+    with pytest.raises(ValueError):
+        await relatorio_controller.exportar_relatorio(db_session, CAPACITACOES, "excel_resumo")
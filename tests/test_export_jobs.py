@@ -0,0 +1,186 @@
+"""Tests for asynchronous report export jobs."""
+import asyncio
+import os
+import jwt
+import pytest
+from io import BytesIO
+from uuid import uuid4
+from openpyxl import load_workbook
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import relatorio_controller
+from src.resources import export_jobs
+from src.resources.export_jobs import ExportJobManager, job_key, STATUS_CONCLUIDO, STATUS_ERRO
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+def _create_token(sub: str, perfil: str) -> str:
+    return jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+
+
+def _counting_producer(calls: list, content: bytes = b"conteudo"):
+    async def producer(path: str):
+        calls.append(path)
+        await asyncio.sleep(0.01)
+        with open(path, "wb") as f:
+            f.write(content)
+    return producer
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_render(tmp_path):
+    manager = ExportJobManager(str(tmp_path))
+    calls = []
+    key = job_key(relatorio="consolidado", formato="excel", ano="2025", vinculo=None, lotacao="SETOR A")
+
+    first = manager.submit(key, "consolidado", "excel", "r.xlsx", "x", "SETOR A", _counting_producer(calls))
+    second = manager.submit(key, "consolidado", "excel", "r.xlsx", "x", "SETOR A", _counting_producer(calls))
+    assert first is second
+
+    await manager.wait(first, 5)
+    third = manager.submit(key, "consolidado", "excel", "r.xlsx", "x", "SETOR A", _counting_producer(calls))
+
+    assert third is first
+    assert len(calls) == 1
+    assert first.status == STATUS_CONCLUIDO
+    with open(first.path, "rb") as f:
+        assert f.read() == b"conteudo"
+
+
+@pytest.mark.asyncio
+async def test_different_scope_renders_separately(tmp_path):
+    manager = ExportJobManager(str(tmp_path))
+    calls = []
+    key_a = job_key(relatorio="consolidado", formato="pdf", lotacao="SETOR A")
+    key_b = job_key(relatorio="consolidado", formato="pdf", lotacao="SETOR B")
+
+    job_a = manager.submit(key_a, "consolidado", "pdf", "r.pdf", "x", "SETOR A", _counting_producer(calls))
+    job_b = manager.submit(key_b, "consolidado", "pdf", "r.pdf", "x", "SETOR B", _counting_producer(calls))
+    await asyncio.gather(manager.wait(job_a, 5), manager.wait(job_b, 5))
+
+    assert job_a.id != job_b.id
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_job_is_purged_and_file_removed(tmp_path, monkeypatch):
+    manager = ExportJobManager(str(tmp_path))
+    job = manager.submit("k", "consolidado", "excel", "r.xlsx", "x", None, _counting_producer([]))
+    await manager.wait(job, 5)
+    assert os.path.exists(job.path)
+
+    monkeypatch.setattr(export_jobs, "EXPORT_JOB_TTL_SECONDS", 0)
+    assert manager.get(job.id) is None
+    assert not os.path.exists(job.path)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_on_next_submit(tmp_path):
+    manager = ExportJobManager(str(tmp_path))
+
+    async def failing(path: str):
+        raise RuntimeError("falhou")
+
+    job = manager.submit("k", "consolidado", "pdf", "r.pdf", "x", None, failing)
+    await manager.wait(job, 5)
+    assert job.status == STATUS_ERRO
+    assert job.erro == "falhou"
+    assert not os.path.exists(f"{job.path}.part")
+
+    retry = manager.submit("k", "consolidado", "pdf", "r.pdf", "x", None, _counting_producer([]))
+    assert retry.id != job.id
+
+
+@pytest.mark.asyncio
+async def test_salvar_exportacao_writes_consolidado_file(test_db, tmp_path):
+    async with test_db() as session:
+        curso = Curso(id=str(uuid4()), titulo="Curso Job", ano_gd="2025")
+        user = Usuario(id="job-user", nome="Servidor Job", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+        session.add_all([curso, user])
+        await session.flush()
+        session.add(Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE))
+        await session.commit()
+
+    destino = str(tmp_path / "consolidado.xlsx")
+    await relatorio_controller.salvar_exportacao(test_db, destino, "consolidado", "excel", lotacao="SETOR A")
+
+    sheet = load_workbook(destino, read_only=True)["Relatorio"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert len(rows) == 2
+    assert rows[1][1] == "Servidor Job"
+
+
+@pytest.mark.asyncio
+async def test_export_job_endpoints_flow(async_client, app, tmp_path, monkeypatch):
+    monkeypatch.setattr(export_jobs.export_job_manager, "directory", str(tmp_path))
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    response = await async_client.post(
+        "/api/relatorios/exports",
+        json={"relatorio": "consolidado", "formato": "excel", "ano": "2031"},
+        headers=headers,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    # Pedido idêntico reaproveita o mesmo job
+    again = await async_client.post(
+        "/api/relatorios/exports",
+        json={"relatorio": "consolidado", "formato": "excel", "ano": "2031"},
+        headers=headers,
+    )
+    assert again.json()["job_id"] == job_id
+
+    status_response = await async_client.get(f"/api/relatorios/exports/{job_id}?wait=5", headers=headers)
+    assert status_response.status_code == 200
+    assert status_response.json()["status"] == STATUS_CONCLUIDO
+    assert status_response.json()["download_url"].endswith(f"/exports/{job_id}/download")
+
+    download = await async_client.get(f"/api/relatorios/exports/{job_id}/download", headers=headers)
+    assert download.status_code == 200
+    assert "spreadsheetml" in download.headers["content-type"]
+    load_workbook(BytesIO(download.content), read_only=True)
+
+
+@pytest.mark.asyncio
+async def test_export_job_chefia_cannot_read_other_lotacao(async_client, app, tmp_path, monkeypatch):
+    monkeypatch.setattr(export_jobs.export_job_manager, "directory", str(tmp_path))
+    async with app.state.app_db.async_session_maker() as session:
+        session.add(Usuario(id="chefia-job", nome="Chefia", perfil=PerfilUsuario.CHEFIA, lotacao="SETOR B"))
+        await session.commit()
+
+    udp_headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+    response = await async_client.post(
+        "/api/relatorios/exports",
+        json={"relatorio": "consolidado", "formato": "pdf", "lotacao": "SETOR A"},
+        headers=udp_headers,
+    )
+    job_id = response.json()["job_id"]
+
+    chefia_headers = {"Authorization": f"Bearer {_create_token('chefia-job', PerfilUsuario.CHEFIA.value)}"}
+    forbidden = await async_client.get(f"/api/relatorios/exports/{job_id}", headers=chefia_headers)
+    assert forbidden.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_export_job_capacitacoes_is_udp_only(async_client, app, tmp_path, monkeypatch):
+    monkeypatch.setattr(export_jobs.export_job_manager, "directory", str(tmp_path))
+    async with app.state.app_db.async_session_maker() as session:
+        session.add(Usuario(id="chefia-job", nome="Chefia", perfil=PerfilUsuario.CHEFIA, lotacao="SETOR B"))
+        await session.commit()
+    chefia_headers = {"Authorization": f"Bearer {_create_token('chefia-job', PerfilUsuario.CHEFIA.value)}"}
+    udp_headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    # O relatório de capacitações (com CPFs de todas as lotações) é exclusivo da UDP
+    pedido = {"relatorio": "capacitacoes", "formato": "excel"}
+    forbidden = await async_client.post("/api/relatorios/exports", json=pedido, headers=chefia_headers)
+    assert forbidden.status_code == 403
+
+    job_id = (await async_client.post("/api/relatorios/exports", json=pedido, headers=udp_headers)).json()["job_id"]
+    forbidden = await async_client.get(f"/api/relatorios/exports/{job_id}", headers=chefia_headers)
+    assert forbidden.status_code == 403
+    forbidden = await async_client.get(f"/api/relatorios/exports/{job_id}/download", headers=chefia_headers)
+    assert forbidden.status_code == 403
+    assert (await async_client.get(f"/api/relatorios/exports/{job_id}", headers=udp_headers)).status_code == 200
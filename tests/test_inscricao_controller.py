@@ -4,7 +4,7 @@ from src.controllers.inscricao_controller import (
     inscrever_usuario_em_curso,
     desinscrever_usuario_de_curso,
 )
-from src.models import Usuario, Curso, StatusAtribuicao, Atribuicao, Inscricao
+from src.models import Usuario, Curso, StatusAtribuicao, Atribuicao, Inscricao, Certificado
 
 @pytest.mark.asyncio
 async def test_desinscrever_usuario_em_andamento_sucesso(db_session, test_user_data, test_curso_data):
@@ -31,6 +31,8 @@ async def test_desinscrever_usuario_com_certificado_bloqueado(db_session, test_u
     inscricao, atribuicao = await inscrever_usuario_em_curso(db_session, user.id, curso.id)
     
     # Simula envio de certificado
+    db_session.add(Certificado(id="cert-123", curso_id=curso.id))
+    await db_session.flush()
     atribuicao.certificado_id = "cert-123"
     atribuicao.status = StatusAtribuicao.REALIZADO
     await db_session.commit()
@@ -0,0 +1,117 @@
+"""Tests for the live counters pushed over Server-Sent Events."""
+import asyncio
+import pytest
+from uuid import uuid4
+
+from sqlalchemy import update
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao, Certificado
+from src.models.usuario import PerfilUsuario
+from src.controllers import atribuicao_controller, evento_controller
+from src.controllers.resumo_controller import atualizando_resumo
+from src.helpers import sse_helper
+from src.resources.live_events import EventBroker, event_broker, RESYNC
+
+
+async def _seed(db):
+    users = [
+        Usuario(id="live-a", nome="Servidor A", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A"),
+        Usuario(id="live-b", nome="Servidor B", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR B"),
+    ]
+    curso = Curso(id=str(uuid4()), titulo="Curso Ao Vivo", ano_gd="2025")
+    atribuicoes = [
+        Atribuicao(id=f"atr-{user.id}", user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE)
+        for user in users
+    ]
+    db.add_all(users + [curso])
+    await db.flush()
+    db.add_all(atribuicoes)
+    await db.commit()
+    return atribuicoes
+
+
+def _drenar(fila):
+    eventos = []
+    while not fila.empty():
+        eventos.append(fila.get_nowait())
+    return eventos
+
+
+@pytest.mark.asyncio
+async def test_deltas_are_published_per_scope_after_commit(db_session):
+    atribuicoes = await _seed(db_session)
+
+    db_session.add(Certificado(id="cert-live-a", curso_id=atribuicoes[0].curso_id))
+    await db_session.commit()
+
+    with event_broker.assinar(["usuario:live-a"]) as do_usuario, \
+            event_broker.assinar(["lotacao:SETOR A"]) as da_lotacao, \
+            event_broker.assinar(["lotacao:SETOR B"]) as outra_lotacao, \
+            event_broker.assinar(["geral"]) as geral:
+        await atribuicao_controller.atualizar_atribuicao_com_certificado(
+            db_session, "atr-live-a", "cert-live-a", StatusAtribuicao.REALIZADO
+        )
+
+        esperado = {"Realizado": 1, "Pendente": -1}
+        assert _drenar(do_usuario) == [{"tipo": "contadores", "escopo": "usuario", "deltas": esperado}]
+        assert _drenar(da_lotacao) == [{"tipo": "contadores", "escopo": "lotacao", "deltas": esperado}]
+        assert _drenar(geral) == [{"tipo": "contadores", "escopo": "geral", "deltas": esperado}]
+        assert _drenar(outra_lotacao) == []
+
+    # Sem assinantes, nada fica registrado no broker
+    assert event_broker.total_assinantes() == 0
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_changes_are_not_published(db_session):
+    await _seed(db_session)
+
+    with event_broker.assinar(["lotacao:SETOR B"]) as fila:
+        async with atualizando_resumo(db_session, Atribuicao.id == "atr-live-b"):
+            await db_session.execute(
+                update(Atribuicao).where(Atribuicao.id == "atr-live-b").values(status=StatusAtribuicao.VALIDADO)
+            )
+        await db_session.rollback()
+        assert _drenar(fila) == []
+
+        # A transação seguinte não herda as variações descartadas
+        await atribuicao_controller.validar_atribuicao(db_session, "atr-live-b", StatusAtribuicao.RECUSADO)
+        assert [evento["deltas"] for evento in _drenar(fila)] == [{"Recusado": 1, "Pendente": -1}]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_resync_and_stream_format():
+    broker = EventBroker(queue_size=2)
+    with broker.assinar(["geral"]) as fila:
+        for i in range(3):
+            broker.publicar("geral", {"tipo": "contadores", "escopo": "geral", "deltas": {"Pendente": i}})
+        assert _drenar(fila) == [RESYNC]
+
+        broker.publicar("geral", {"tipo": "contadores", "escopo": "geral", "deltas": {"Pendente": 1}})
+        verificacoes = iter([False, False, True])
+
+        async def desconectado():
+            return next(verificacoes)
+
+        chunks = [chunk async for chunk in sse_helper.iter_eventos(fila, desconectado, heartbeat=0.01)]
+
+    assert chunks[0].startswith(b"retry: ")
+    assert chunks[1] == b"event: pronto\ndata: {}\n\n"
+    assert chunks[2] == b'event: contadores\ndata: {"tipo": "contadores", "escopo": "geral", "deltas": {"Pendente": 1}}\n\n'
+    # Fila vazia: um comentário de keep-alive até a desconexão ser percebida
+    assert chunks[3] == b": keep-alive\n\n"
+    assert len(chunks) == 4
+
+
+@pytest.mark.asyncio
+async def test_subscription_scopes_follow_profile(db_session):
+    db_session.add(Usuario(id="chefe.live", nome="Chefe", perfil=PerfilUsuario.CHEFIA, lotacao="SETOR A"))
+    await db_session.commit()
+
+    trabalhador = {"sub": "live-a", "perfil": PerfilUsuario.TRABALHADOR.value}
+    chefia = {"sub": "chefe.live", "perfil": PerfilUsuario.CHEFIA.value}
+    udp = {"sub": "chefe.live", "perfil": PerfilUsuario.UDP.value}
+
+    assert await evento_controller.escopos_do_usuario(db_session, trabalhador) == ["usuario:live-a"]
+    assert await evento_controller.escopos_do_usuario(db_session, chefia) == ["usuario:chefe.live", "lotacao:SETOR A"]
+    assert await evento_controller.escopos_do_usuario(db_session, udp) == ["usuario:chefe.live", "lotacao:SETOR A", "geral"]
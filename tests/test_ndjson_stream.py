@@ -0,0 +1,76 @@
+"""Tests for the NDJSON streaming mode of the report endpoints."""
+import json
+import os
+import jwt
+import pytest
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.helpers import ndjson_helper
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+NDJSON = {"Accept": ndjson_helper.NDJSON_MEDIA_TYPE}
+
+
+def _create_token(sub: str, perfil: str) -> str:
+    return jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+
+
+async def _seed(app, n=5):
+    async with app.state.app_db.async_session_maker() as session:
+        curso = Curso(id=str(uuid4()), titulo="Curso NDJSON", ano_gd="2025", carga_horaria=10)
+        users = [
+            Usuario(id=f"nd-{i}", nome=f"Servidor {i}", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+            for i in range(n)
+        ]
+        session.add_all(users + [curso])
+        await session.flush()
+        session.add_all([
+            Atribuicao(id=str(uuid4()), user_id=u.id, curso_id=curso.id, status=StatusAtribuicao.CONCLUIDO)
+            for u in users
+        ])
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_serializes_row_by_row():
+    consumed = []
+
+    async def rows():
+        for i in range(3):
+            consumed.append(i)
+            yield {"i": i, "status": StatusAtribuicao.PENDENTE}
+
+    stream = ndjson_helper.iter_ndjson(rows())
+    first = await stream.__anext__()
+    assert consumed == [0]
+    assert json.loads(first) == {"i": 0, "status": "Pendente"}
+    assert first.endswith(b"\n")
+
+
+@pytest.mark.asyncio
+async def test_consolidado_ndjson_matches_json(async_client, app):
+    await _seed(app)
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    as_json = await async_client.get("/api/relatorios/udp/consolidado", headers=headers)
+    as_ndjson = await async_client.get("/api/relatorios/udp/consolidado", headers={**headers, **NDJSON})
+
+    assert as_ndjson.status_code == 200
+    assert as_ndjson.headers["content-type"].startswith(ndjson_helper.NDJSON_MEDIA_TYPE)
+    linhas = [json.loads(line) for line in as_ndjson.text.splitlines()]
+    assert linhas == as_json.json()
+    assert len(linhas) == 5
+
+
+@pytest.mark.asyncio
+async def test_capacitacoes_ndjson(async_client, app):
+    await _seed(app, n=3)
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    as_json = await async_client.get("/api/relatorios/capacitacoes", headers=headers)
+    as_ndjson = await async_client.get("/api/relatorios/capacitacoes", headers={**headers, **NDJSON})
+
+    assert as_ndjson.status_code == 200
+    assert [json.loads(line) for line in as_ndjson.text.splitlines()] == as_json.json()
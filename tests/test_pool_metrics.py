@@ -0,0 +1,98 @@
+"""Tests for the per-DSN pool configuration and the connection pool metrics."""
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.auth.auth import auth_handler
+from src.models.usuario import PerfilUsuario
+from src.resources.database import DatabaseManager, PoolConfig, _statement_timeout_args
+from src.resources.pool_metrics import MonitoredQueuePool
+
+
+def test_pool_config_is_read_per_prefix(monkeypatch):
+    monkeypatch.setenv("AGHU_DB_POOL_SIZE", "20")
+    monkeypatch.setenv("AGHU_DB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("AGHU_DB_STATEMENT_TIMEOUT_MS", "30000")
+    monkeypatch.setenv("APP_DB_POOL_TIMEOUT", "2.5")
+
+    aghu = PoolConfig.from_env("AGHU_DB")
+    assert (aghu.pool_size, aghu.max_overflow, aghu.pool_pre_ping, aghu.statement_timeout_ms) == (20, 10, True, 30000)
+    app = PoolConfig.from_env("APP_DB")
+    assert app == PoolConfig(pool_timeout=2.5)
+
+
+def test_statement_timeout_per_driver():
+    assert _statement_timeout_args(make_url("postgresql+asyncpg://u:p@host/db"), 1000) == {
+        "server_settings": {"statement_timeout": "1000"}
+    }
+    assert _statement_timeout_args(make_url("postgresql+psycopg://u:p@host/db"), 1000) == {
+        "options": "-c statement_timeout=1000"
+    }
+    # Sem suporte no SQLite; 0 = sem limite
+    assert _statement_timeout_args(make_url("sqlite+aiosqlite:///app.db"), 1000) == {}
+    assert _statement_timeout_args(make_url("postgresql+asyncpg://u:p@host/db"), 0) == {}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pools_follow_config_and_record_checkouts(tmp_path):
+    manager = DatabaseManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+        pool=PoolConfig(pool_size=3, max_overflow=0, pool_recycle=600),
+    )
+    try:
+        async def escrever(i):
+            async with manager.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                # Mantém a conexão para que as demais escritas aguardem na fila
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(escrever(i) for i in range(5)))
+        metricas = manager.metricas_pool()
+
+        escrita = metricas["escrita"]
+        assert escrita["classe"] == MonitoredQueuePool.__name__
+        assert escrita["tamanho"] == 1
+        assert escrita["checkouts"] == 5
+        assert escrita["aguardando"] == 0 and escrita["em_uso"] == 0
+        assert escrita["pico_aguardando"] >= 2
+        assert escrita["pico_em_uso"] == 1
+        assert sum(escrita["latencia_ms"]["histograma"].values()) == 5
+        assert escrita["latencia_ms"]["maxima"] >= 10
+
+        assert metricas["leitura"]["tamanho"] == 3
+        assert metricas["configuracao"]["pool_recycle"] == 600
+    finally:
+        await manager.close_connection()
+
+
+@pytest.mark.asyncio
+async def test_checkout_timeouts_are_counted(tmp_path):
+    manager = DatabaseManager(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", pool=PoolConfig(pool_timeout=0.05))
+    try:
+        async with manager.engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                async with manager.engine.connect():
+                    pass
+        escrita = manager.metricas_pool()["escrita"]
+        assert escrita["timeouts"] == 1
+        assert escrita["aguardando"] == 0
+    finally:
+        await manager.close_connection()
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_endpoint_requires_udp(app, async_client):
+    udp = auth_handler.create_access_token({"sub": "admin", "perfil": PerfilUsuario.UDP.value})
+    trabalhador = auth_handler.create_access_token({"sub": "user", "perfil": PerfilUsuario.TRABALHADOR.value})
+
+    response = await async_client.get("/api/admin/diagnostico/pools", headers={"Authorization": f"Bearer {udp}"})
+    assert response.status_code == 200
+    # Sem AGHU configurado; o banco de testes (SQLite em memória ou outro) tem um único pool
+    assert set(response.json()) == {"app"}
+    assert response.json()["app"]["dialeto"] == app.state.app_db.engine.dialect.name
+    assert "leitura" not in response.json()["app"]
+
+    response = await async_client.get("/api/admin/diagnostico/pools", headers={"Authorization": f"Bearer {trabalhador}"})
+    assert response.status_code == 403
@@ -0,0 +1,98 @@
+"""Tests for the team progress aggregation (chefia 'progresso individual')."""
+import os
+import jwt
+import pytest
+from datetime import datetime
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.providers.implementations.relatorio_provider import RelatorioProvider
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+async def _seed(db_session):
+    cursos = [
+        Curso(id=str(uuid4()), titulo=f"Curso {i}", ano_gd=ano_gd)
+        for i, ano_gd in enumerate(["2024", "2025", "2025", "2025"])
+    ]
+    ana = Usuario(id="ana", nome="Ana", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+    bia = Usuario(id="bia", nome="Bia", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+    db_session.add_all([*cursos, ana, bia])
+    await db_session.flush()
+    atribuicoes = [
+        (cursos[0], StatusAtribuicao.VALIDADO, datetime(2024, 12, 31, 23, 59)),
+        (cursos[1], StatusAtribuicao.REALIZADO, datetime(2025, 1, 1)),
+        (cursos[2], StatusAtribuicao.RECUSADO, datetime(2025, 6, 1)),
+        (cursos[3], StatusAtribuicao.PENDENTE, None),
+    ]
+    for curso, status, data_conclusao in atribuicoes:
+        db_session.add(Atribuicao(
+            id=str(uuid4()), user_id=ana.id, curso_id=curso.id, status=status, data_conclusao=data_conclusao
+        ))
+    await db_session.commit()
+
+
+def _por_id(progresso):
+    return {item["id"]: item for item in progresso}
+
+
+@pytest.mark.asyncio
+async def test_progresso_equipe_counts_completed_statuses(db_session):
+    await _seed(db_session)
+
+    progresso = _por_id(await RelatorioProvider(db_session).get_progresso_equipe("SETOR A"))
+
+    assert (progresso["ana"]["total_cursos"], progresso["ana"]["concluidos"]) == (4, 2)
+    assert progresso["ana"]["progresso"] == 50.0
+    assert (progresso["bia"]["total_cursos"], progresso["bia"]["progresso"]) == (0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_progresso_equipe_year_filter_does_not_multiply_rows(db_session):
+    await _seed(db_session)
+    provider = RelatorioProvider(db_session)
+
+    progresso_2025 = _por_id(await provider.get_progresso_equipe("SETOR A", ano="2025"))
+    progresso_2024 = _por_id(await provider.get_progresso_equipe("SETOR A", ano="2024"))
+
+    # O ano é o do ciclo GD do curso: a atribuição pendente (sem data de conclusão) também conta
+    assert (progresso_2025["ana"]["total_cursos"], progresso_2025["ana"]["concluidos"]) == (3, 1)
+    assert progresso_2025["ana"]["progresso"] == 33.3
+    assert (progresso_2024["ana"]["total_cursos"], progresso_2024["ana"]["concluidos"]) == (1, 1)
+    # Membros sem atribuições no ano continuam na lista
+    assert progresso_2025["bia"]["total_cursos"] == 0
+
+
+@pytest.mark.asyncio
+async def test_status_lotacao_year_filter(db_session):
+    await _seed(db_session)
+
+    status = await RelatorioProvider(db_session).get_status_lotacao("SETOR A", ano="2025")
+
+    assert sorted((item["name"], item["value"]) for item in status) == [("Realizado", 1), ("Recusado", 1)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ano", ["abc", "0", "9999", "99999999999", "-99999999999999999999"])
+async def test_invalid_year_is_rejected(db_session, ano):
+    with pytest.raises(ValueError):
+        await RelatorioProvider(db_session).get_status_lotacao("SETOR A", ano=ano)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rota", ["status-lotacao", "progresso-individual"])
+async def test_chefia_reports_reject_out_of_range_year(app, async_client, rota):
+    async with app.state.app_db.async_session_maker() as session:
+        session.add(Usuario(id="chefe.ano", nome="Chefe", perfil=PerfilUsuario.CHEFIA, lotacao="SETOR A"))
+        await session.commit()
+    token = jwt.encode({"sub": "chefe.ano", "perfil": PerfilUsuario.CHEFIA.value}, JWT_SECRET, algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get(f"/api/relatorios/chefia/{rota}", params={"ano": "99999999999"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Ano inválido."
+
+    response = await async_client.get(f"/api/relatorios/chefia/{rota}", params={"ano": "2025"}, headers=headers)
+    assert response.status_code == 200
@@ -0,0 +1,87 @@
+"""Tests for the secondary/composite indexes used by the hot controller and report queries."""
+import re
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+
+from src.models import Usuario, Curso, Atribuicao, Inscricao, StatusAtribuicao, PerfilUsuario
+from src.controllers import atribuicao_controller, inscricao_controller
+from src.providers.implementations.relatorio_definicoes import CONSOLIDADO, CAPACITACOES
+
+
+async def _seed(db):
+    users = [
+        Usuario(id=f"idx-{i}", nome=f"Servidor {i}", perfil=PerfilUsuario.TRABALHADOR,
+                lotacao=f"SETOR {i % 3}", vinculo="RJU" if i % 2 else "EBSERH")
+        for i in range(6)
+    ]
+    cursos = [Curso(id=f"curso-idx-{j}", titulo=f"Curso {j}", ano_gd=str(2024 + j % 2)) for j in range(3)]
+    db.add_all(users + cursos)
+    await db.flush()
+    db.add_all([
+        Atribuicao(id=f"atr-{i}-{j}", user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.REALIZADO)
+        for i, user in enumerate(users) for j, curso in enumerate(cursos)
+    ])
+    db.add(Inscricao(id="insc-1", user_id="idx-1", curso_id="curso-idx-1"))
+    await db.commit()
+
+
+def _sem_varredura(plano: str) -> bool:
+    """Nenhuma tabela do modelo é lida por inteiro (SCAN), só por índice (SEARCH)."""
+    return re.search(r"SCAN (atribuicoes|usuarios|inscricoes|cursos)\b", plano) is None
+
+
+@pytest.mark.asyncio
+async def test_controller_queries_use_indexes(db_session, query_plans):
+    await _seed(db_session)
+
+    casos = {
+        "ix_atribuicoes_status_data_conclusao (status=?)":
+            lambda: atribuicao_controller.listar_atribuicoes_pendentes_validacao(db_session, "SETOR 1"),
+        "ix_inscricoes_user_id_curso_id (user_id=? AND curso_id=?)":
+            lambda: inscricao_controller.verificar_inscricao_existente(db_session, "idx-1", "curso-idx-1"),
+        "ix_atribuicoes_user_id_curso_id (user_id=?)":
+            lambda: atribuicao_controller.listar_atribuicoes_por_usuario(db_session, "idx-1"),
+        "ix_atribuicoes_curso_id_status (curso_id=?)":
+            lambda: atribuicao_controller.criar_atribuicoes_seletivas(db_session, "curso-idx-0", ["idx-1"], "SETOR 1"),
+    }
+    for indice, executar in casos.items():
+        planos = await query_plans(db_session, executar)
+        assert indice in planos[0], (indice, planos)
+        assert all(_sem_varredura(plano) for plano in planos), planos
+
+
+@pytest.mark.asyncio
+async def test_report_filters_use_indexes(db_session, query_plans):
+    await _seed(db_session)
+
+    casos = [
+        (lambda: CONSOLIDADO.listar(db_session, lotacao="SETOR 1"), "ix_usuarios_lotacao_vinculo (lotacao=?)"),
+        (lambda: CONSOLIDADO.listar(db_session, lotacao="SETOR 1", vinculo="RJU"),
+         "ix_usuarios_lotacao_vinculo (lotacao=? AND vinculo=?)"),
+        (lambda: CAPACITACOES.listar(db_session, ano="2025"), "ix_cursos_ano_gd (ano_gd=?)"),
+        (lambda: CAPACITACOES.listar(db_session, vinculo="RJU"), "ix_usuarios_vinculo (vinculo=?)"),
+    ]
+    for executar, indice in casos:
+        (plano,) = await query_plans(db_session, executar)
+        assert indice in plano, plano
+        assert _sem_varredura(plano), plano
+
+
+@pytest.mark.asyncio
+async def test_one_assignment_per_user_and_course(db_session):
+    await _seed(db_session)
+
+    # Atribuir o curso à lotação de novo não duplica as atribuições existentes
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, "curso-idx-0", "SETOR 1")
+    total = (await db_session.execute(select(func.count(Atribuicao.id)))).scalar_one()
+    assert total == 18
+
+    db_session.add(Atribuicao(id="atr-repetida", user_id="idx-1", curso_id="curso-idx-0"))
+    with pytest.raises(IntegrityError):
+        await db_session.commit()
+    await db_session.rollback()
+
+    db_session.add(Inscricao(id="insc-repetida", user_id="idx-1", curso_id="curso-idx-1"))
+    with pytest.raises(IntegrityError):
+        await db_session.commit()
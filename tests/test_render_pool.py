@@ -0,0 +1,92 @@
+"""Tests for the bounded report rendering pool."""
+import asyncio
+import threading
+import time
+import pytest
+
+from src.resources.render_pool import RenderPool
+from src.helpers import pdf_helper, excel_helper
+
+
+SAMPLE_DATA = [
+    {"nome_profissional": f"Servidor {i}", "nome_curso": "Curso", "status": "Pendente"}
+    for i in range(30)
+]
+
+
+def test_invalid_executor_kind():
+    with pytest.raises(ValueError):
+        RenderPool("fiber", 2)
+
+
+@pytest.mark.asyncio
+async def test_run_executes_off_event_loop_thread():
+    pool = RenderPool("thread", 1)
+    try:
+        thread_name = await pool.run(lambda: threading.current_thread().name)
+        assert thread_name.startswith("render")
+        assert thread_name != threading.current_thread().name
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_render():
+    """A blocking render must not stop other coroutines from running."""
+    pool = RenderPool("thread", 1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    try:
+        await pool.run(time.sleep, 0.2)
+    finally:
+        task.cancel()
+        pool.shutdown()
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped_by_max_workers():
+    pool = RenderPool("thread", 2)
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    try:
+        await asyncio.gather(*(pool.run(work) for _ in range(6)))
+    finally:
+        pool.shutdown()
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_process_pool_renders_pdf():
+    pool = RenderPool("process", 1)
+    try:
+        content = await pool.run(pdf_helper.render_pdf, SAMPLE_DATA)
+    finally:
+        pool.shutdown()
+    assert content.startswith(b"%PDF")
+
+
+@pytest.mark.asyncio
+async def test_async_helpers_return_rewound_buffers():
+    pdf = await pdf_helper.export_to_pdf(SAMPLE_DATA)
+    xlsx = await excel_helper.export_to_excel(SAMPLE_DATA)
+    assert pdf.read(4) == b"%PDF"
+    assert xlsx.read(2) == b"PK"
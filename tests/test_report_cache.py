@@ -0,0 +1,136 @@
+"""Tests for the report result cache and its data-version invalidation."""
+import pytest
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import relatorio_controller, atribuicao_controller, curso_controller
+from src.resources import report_cache as report_cache_module
+from src.resources.report_cache import ReportCache, report_cache
+from src.schemas.curso_schema import CursoCreate
+
+
+def _counter():
+    calls = {"n": 0}
+
+    async def compute():
+        calls["n"] += 1
+        return [{"n": calls["n"]}]
+    return calls, compute
+
+
+@pytest.mark.asyncio
+async def test_hit_until_scope_is_bumped():
+    cache = ReportCache()
+    calls, compute = _counter()
+
+    await cache.get_or_compute("r", {"lotacao": "A"}, compute, lotacao="A")
+    await cache.get_or_compute("r", {"lotacao": "A"}, compute, lotacao="A")
+    assert calls["n"] == 1
+
+    cache.invalidate("B")
+    await cache.get_or_compute("r", {"lotacao": "A"}, compute, lotacao="A")
+    assert calls["n"] == 1, "a change in another lotação must not invalidate this entry"
+
+    cache.invalidate("A")
+    await cache.get_or_compute("r", {"lotacao": "A"}, compute, lotacao="A")
+    assert calls["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unscoped_entries_follow_any_change():
+    cache = ReportCache()
+    calls, compute = _counter()
+
+    await cache.get_or_compute("r", {}, compute)
+    cache.invalidate("A")
+    await cache.get_or_compute("r", {}, compute)
+    assert calls["n"] == 2
+
+    cache.invalidate()
+    await cache.get_or_compute("r", {}, compute)
+    assert calls["n"] == 3
+
+
+@pytest.mark.asyncio
+async def test_global_bump_invalidates_scoped_entries():
+    cache = ReportCache()
+    calls, compute = _counter()
+
+    await cache.get_or_compute("r", {"lotacao": "A"}, compute, lotacao="A")
+    cache.invalidate()
+    await cache.get_or_compute("r", {"lotacao": "A"}, compute, lotacao="A")
+    assert calls["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_entries_and_bytes():
+    cache = ReportCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.put(name, {}, [name], cache.version_token())
+    cache.get("a", {})  # "a" becomes most recently used
+    cache.put("c", {}, ["c"], cache.version_token())
+
+    assert cache.get("a", {})[0] is True
+    assert cache.get("b", {})[0] is False
+    assert cache.get("c", {})[0] is True
+
+    small = ReportCache(max_bytes=20)
+    small.put("a", {}, "x" * 10, small.version_token())
+    small.put("b", {}, "y" * 10, small.version_token())
+    assert small.get("a", {})[0] is False
+    assert small.get("b", {})[0] is True
+    small.put("huge", {}, "z" * 100, small.version_token())
+    assert small.get("huge", {})[0] is False
+
+
+@pytest.mark.asyncio
+async def test_ttl_expires_entries():
+    cache = ReportCache(ttl_seconds=0)
+    calls, compute = _counter()
+    await cache.get_or_compute("r", {}, compute)
+    await cache.get_or_compute("r", {}, compute)
+    assert calls["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_consolidado_cache_invalidated_by_validacao(db_session):
+    user = Usuario(id="cache-user", nome="Servidor Cache", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+    curso = Curso(id=str(uuid4()), titulo="Curso Cache", ano_gd="2025")
+    db_session.add_all([user, curso])
+    await db_session.flush()
+    atribuicao = Atribuicao(id=str(uuid4()), user_id=user.id, curso_id=curso.id, status=StatusAtribuicao.REALIZADO)
+    db_session.add(atribuicao)
+    await db_session.commit()
+
+    first = await relatorio_controller.get_relatorio_consolidado(db_session, lotacao="SETOR A")
+    assert first[0]["status"] == StatusAtribuicao.REALIZADO
+    hits_before = report_cache.hits
+    await relatorio_controller.get_relatorio_consolidado(db_session, lotacao="SETOR A")
+    assert report_cache.hits == hits_before + 1
+
+    await atribuicao_controller.validar_atribuicao(db_session, atribuicao.id, StatusAtribuicao.CONCLUIDO)
+
+    updated = await relatorio_controller.get_relatorio_consolidado(db_session, lotacao="SETOR A")
+    assert updated[0]["status"] == StatusAtribuicao.CONCLUIDO
+
+
+@pytest.mark.asyncio
+async def test_curso_changes_invalidate_all_lotacoes(db_session):
+    token_a = report_cache.version_token("SETOR A")
+    token_all = report_cache.version_token()
+
+    await curso_controller.criar_curso(db_session, CursoCreate(titulo="Novo Curso"))
+
+    assert report_cache.version_token("SETOR A") != token_a
+    assert report_cache.version_token() != token_all
+
+
+def test_bump_data_version_with_several_lotacoes():
+    token_a = report_cache.version_token("A")
+    token_b = report_cache.version_token("B")
+    token_c = report_cache.version_token("C")
+    report_cache_module.bump_data_version("A", "B")
+    assert report_cache.version_token("A") != token_a
+    assert report_cache.version_token("B") != token_b
+    assert report_cache.version_token("C") == token_c
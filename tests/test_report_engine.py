@@ -0,0 +1,168 @@
+"""Tests for the declarative report definitions and the generic report endpoints."""
+import csv
+import io
+import os
+import jwt
+import pytest
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from src.models import Usuario, Curso, Atribuicao, Certificado, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import relatorio_controller
+from src.helpers.report_engine import Coluna, DefinicaoRelatorio
+from src.providers.implementations.relatorio_definicoes import CONSOLIDADO, CAPACITACOES
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+def _create_token(sub: str, perfil: str) -> str:
+    return jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+
+
+async def _seed(session):
+    curso = Curso(id=str(uuid4()), titulo="Curso Engine", carga_horaria=4, ano_gd="2025")
+    chefe = Usuario(id="chefe.engine", nome="Chefe", perfil=PerfilUsuario.CHEFIA, lotacao="SETOR A")
+    session.add_all([curso, chefe])
+    for i, lotacao in enumerate(["SETOR A", "SETOR A", "SETOR B"]):
+        user = Usuario(id=f"engine-{i}", nome=f"Servidor {i}", perfil=PerfilUsuario.TRABALHADOR, lotacao=lotacao)
+        session.add(user)
+        await session.flush()
+        certificado_id = None
+        if i == 0:
+            certificado_id = str(uuid4())
+            session.add(Certificado(id=certificado_id, curso_id=curso.id, file_path="cert.pdf"))
+        session.add(Atribuicao(
+            id=str(uuid4()), user_id=user.id, curso_id=curso.id,
+            status=StatusAtribuicao.PENDENTE, certificado_id=certificado_id
+        ))
+    await session.commit()
+
+
+def test_definicao_rejects_unknown_sort_column():
+    with pytest.raises(ValueError):
+        DefinicaoRelatorio(nome="x", origem=Usuario, colunas=(Coluna("id", Usuario.id),), ordem=("nome",))
+
+
+def test_compilar_rejects_unsupported_filter():
+    with pytest.raises(ValueError):
+        CAPACITACOES.compilar(lotacao="SETOR A")
+    # Filtros vazios são ignorados
+    CAPACITACOES.compilar(lotacao=None, ano="")
+
+
+@pytest.mark.asyncio
+async def test_stream_reads_in_batches_from_a_server_side_cursor(db_session):
+    """Streamed reports request a server-side cursor (a portal fetched in batches on PostgreSQL)."""
+    await _seed(db_session)
+    contextos = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        contextos.append(context)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        lotes = [lote async for lote in CAPACITACOES.stream_lotes(db_session, 2)]
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+    assert [len(lote) for lote in lotes] == [2, 1]
+    assert contextos[-1].execution_options.get("stream_results") is True
+    assert engine.dialect.supports_server_side_cursors
+
+
+@pytest.mark.asyncio
+async def test_definicao_outputs_match(db_session):
+    """List, stream and pages come from the same compiled query and mapping."""
+    await _seed(db_session)
+
+    lista = await CONSOLIDADO.listar(db_session, lotacao="SETOR A")
+    fluxo = [row async for row in CONSOLIDADO.stream(db_session, 1, lotacao="SETOR A")]
+    primeira, cursor = await CONSOLIDADO.pagina(db_session, 1, lotacao="SETOR A")
+    segunda, fim = await CONSOLIDADO.pagina(db_session, 1, cursor, lotacao="SETOR A")
+
+    assert fluxo == lista == primeira + segunda
+    assert fim is None
+    assert [row["certificado_enviado"] for row in lista] == ["Sim", "Não"]
+    assert "atribuicao_id" not in lista[0]
+    assert await CONSOLIDADO.contar(db_session, lotacao="SETOR A") == 2
+
+
+@pytest.mark.asyncio
+async def test_capacitacoes_hides_certificate_path(db_session):
+    await _seed(db_session)
+
+    rows = await relatorio_controller.listar_relatorio(db_session, CAPACITACOES)
+
+    assert [row["nome_profissional"] for row in rows] == ["Servidor 0", "Servidor 1", "Servidor 2"]
+    assert rows[0]["certificado"] == "Sim"
+    assert "cert.pdf" not in str(rows)
+
+
+@pytest.mark.asyncio
+async def test_relatorio_definido_endpoint_formats(async_client, app):
+    async with app.state.app_db.async_session_maker() as session:
+        await _seed(session)
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    response = await async_client.get("/api/relatorios/definidos/consolidado", headers=headers, params={"lotacao": "SETOR B"})
+    assert response.status_code == 200
+    assert [row["nome"] for row in response.json()] == ["Servidor 2"]
+
+    response = await async_client.get("/api/relatorios/definidos/capacitacoes", headers=headers, params={"formato": "csv"})
+    assert response.status_code == 200
+    assert "relatorio_capacitacoes.csv" in response.headers["content-disposition"]
+    linhas = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+    assert len(linhas) == 1 + 3
+
+    response = await async_client.get("/api/relatorios/definidos/capacitacoes", headers=headers, params={"lotacao": "SETOR A"})
+    assert response.status_code == 400
+
+    response = await async_client.get("/api/relatorios/definidos/inexistente", headers=headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_capacitacoes_routes_use_the_shared_responder(async_client, app):
+    async with app.state.app_db.async_session_maker() as session:
+        await _seed(session)
+    headers = {"Authorization": f"Bearer {_create_token('admin.user', PerfilUsuario.UDP.value)}"}
+
+    response = await async_client.get("/api/relatorios/capacitacoes", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    etag = response.headers["etag"]
+    response = await async_client.get("/api/relatorios/capacitacoes", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    for formato, extensao in (("excel", "xlsx"), ("pdf", "pdf"), ("csv", "csv")):
+        response = await async_client.get(f"/api/relatorios/capacitacoes/export/{formato}", headers=headers)
+        assert response.status_code == 200
+        assert f"relatorio_capacitacoes.{extensao}" in response.headers["content-disposition"]
+
+    # O dataset colunar continua na rota própria
+    response = await async_client.get("/api/relatorios/capacitacoes/export/dataset", headers=headers)
+    assert response.status_code == 200
+    assert "dataset_capacitacoes.parquet" in response.headers["content-disposition"]
+
+    response = await async_client.get("/api/relatorios/capacitacoes/export/ods", headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_relatorio_definido_chefia_scope(async_client, app):
+    async with app.state.app_db.async_session_maker() as session:
+        await _seed(session)
+    headers = {"Authorization": f"Bearer {_create_token('chefe.engine', PerfilUsuario.CHEFIA.value)}"}
+
+    # A lotação pedida é ignorada: a Chefia vê apenas a própria lotação
+    response = await async_client.get(
+        "/api/relatorios/definidos/consolidado/paginado", headers=headers, params={"lotacao": "SETOR B"}
+    )
+    assert response.status_code == 200
+    assert {row["setor"] for row in response.json()["data"]} == {"SETOR A"}
+
+    response = await async_client.get("/api/relatorios/definidos/capacitacoes", headers=headers)
+    assert response.status_code == 403
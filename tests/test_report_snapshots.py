@@ -0,0 +1,105 @@
+"""Tests for the nightly report snapshots and their opt-in use by the report endpoints."""
+import os
+import jwt
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao
+from src.models.usuario import PerfilUsuario
+from src.controllers import snapshot_controller
+from src.resources.report_snapshots import SnapshotStore
+
+JWT_SECRET = os.getenv("JWT_SECRET", "test-secret-key-for-testing")
+
+
+def _headers(sub: str, perfil: str) -> dict:
+    token = jwt.encode({"sub": sub, "perfil": perfil}, JWT_SECRET, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path), max_age_hours=36)
+    monkeypatch.setattr(snapshot_controller, "snapshot_store", store)
+    return store
+
+
+async def _seed(app):
+    async with app.state.app_db.async_session_maker() as session:
+        curso = Curso(id=str(uuid4()), titulo="Curso Snapshot", ano_gd="2025")
+        chefe = Usuario(id="chefe.snap", nome="Chefe", perfil=PerfilUsuario.CHEFIA, lotacao="SETOR A")
+        user_a = Usuario(id="user.a", nome="Servidor A", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+        user_b = Usuario(id="user.b", nome="Servidor B", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR B")
+        session.add_all([curso, chefe, user_a, user_b])
+        await session.flush()
+        session.add_all([
+            Atribuicao(id=str(uuid4()), user_id=user_a.id, curso_id=curso.id, status=StatusAtribuicao.PENDENTE),
+            Atribuicao(id=str(uuid4()), user_id=user_b.id, curso_id=curso.id, status=StatusAtribuicao.CONCLUIDO),
+        ])
+        await session.commit()
+        return curso.id
+
+
+def test_store_round_trip_and_max_age(tmp_path):
+    store = SnapshotStore(str(tmp_path), max_age_hours=1)
+    filtros = {"ano": "2025", "lotacao": None}
+
+    assert store.carregar("consolidado", filtros) is None
+    store.salvar("consolidado", filtros, [{"setor": "SETOR A", "status": StatusAtribuicao.PENDENTE}])
+
+    snapshot = store.carregar("consolidado", filtros)
+    assert snapshot.dados == [{"setor": "SETOR A", "status": "Pendente"}]
+    assert store.carregar("consolidado", {"ano": "2024", "lotacao": None}) is None
+
+    # Snapshots vencidos não são servidos
+    store.salvar("consolidado", filtros, [], gerado_em=datetime.now() - timedelta(hours=2))
+    assert store.carregar("consolidado", filtros) is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_served_only_when_requested(async_client, app, store):
+    curso_id = await _seed(app)
+    async with app.state.app_db.async_session_maker() as session:
+        total = await snapshot_controller.gerar_snapshots(session, anos=[None])
+    # capacitações + consolidado geral + 2 lotações + status geral
+    assert total == 5
+
+    # Dados novos após a geração: o snapshot continua com a versão anterior
+    async with app.state.app_db.async_session_maker() as session:
+        session.add(Atribuicao(id=str(uuid4()), user_id="chefe.snap", curso_id=curso_id, status=StatusAtribuicao.PENDENTE))
+        await session.commit()
+
+    udp = _headers("admin.user", PerfilUsuario.UDP.value)
+    response = await async_client.get("/api/relatorios/udp/consolidado?snapshot=true", headers=udp)
+    assert response.status_code == 200
+    assert "x-snapshot-timestamp" in response.headers
+    assert len(response.json()) == 2
+
+    response = await async_client.get("/api/relatorios/udp/consolidado", headers=udp)
+    assert "x-snapshot-timestamp" not in response.headers
+    assert len(response.json()) == 3
+
+    chefia = _headers("chefe.snap", PerfilUsuario.CHEFIA.value)
+    response = await async_client.get("/api/relatorios/chefia/consolidado?snapshot=true", headers=chefia)
+    assert [row["setor"] for row in response.json()] == ["SETOR A"]
+
+    response = await async_client.get("/api/relatorios/udp/status-geral?snapshot=true", headers=udp)
+    assert "x-snapshot-timestamp" in response.headers
+    assert {item["name"] for item in response.json()} == {s.value for s in StatusAtribuicao}
+    etag = response.headers["etag"]
+    response = await async_client.get(
+        "/api/relatorios/udp/status-geral?snapshot=true", headers={**udp, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_missing_snapshot_falls_back_to_live_data(async_client, app, store):
+    await _seed(app)
+    udp = _headers("admin.user", PerfilUsuario.UDP.value)
+
+    response = await async_client.get("/api/relatorios/capacitacoes?snapshot=true&ano=2025", headers=udp)
+    assert response.status_code == 200
+    assert "x-snapshot-timestamp" not in response.headers
+    assert len(response.json()) == 2
@@ -0,0 +1,123 @@
+"""Tests for the incrementally maintained assignment summary (lotação × status)."""
+import pytest
+from uuid import uuid4
+from sqlalchemy import update
+
+from src.models import Usuario, Curso, Atribuicao, StatusAtribuicao, ResumoAtribuicao, Certificado
+from src.models.usuario import PerfilUsuario
+from src.controllers import (
+    atribuicao_controller,
+    curso_controller,
+    inscricao_controller,
+    relatorio_controller,
+    resumo_controller,
+    usuario_controller,
+)
+from src.schemas.curso_schema import CursoCreate
+
+
+async def _seed(db, n_users=3, lotacao="SETOR A"):
+    users = [
+        Usuario(id=f"resumo-{lotacao.lower()}-{i}", nome=f"Servidor {i}", perfil=PerfilUsuario.TRABALHADOR,
+                lotacao=lotacao, vinculo="EBSERH")
+        for i in range(n_users)
+    ]
+    curso = Curso(id=str(uuid4()), titulo="Curso Resumo", ano_gd="2025")
+    db.add_all(users + [curso])
+    await db.commit()
+    return users, curso
+
+
+async def _assert_consistente(db):
+    assert await resumo_controller.verificar_resumo(db) == []
+
+
+@pytest.mark.asyncio
+async def test_status_transitions_keep_summary_in_sync(db_session):
+    users, curso = await _seed(db_session)
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+    await _assert_consistente(db_session)
+
+    contagens = await resumo_controller.contagens_por_status(db_session)
+    assert contagens == {StatusAtribuicao.PENDENTE: 3}
+
+    inscricao, atribuicao = await inscricao_controller.inscrever_usuario_em_curso(db_session, users[0].id, curso.id)
+    db_session.add(Certificado(id="cert-1", curso_id=curso.id))
+    await db_session.commit()
+    await atribuicao_controller.atualizar_atribuicao_com_certificado(
+        db_session, atribuicao.id, "cert-1", StatusAtribuicao.REALIZADO
+    )
+    await atribuicao_controller.validar_atribuicao(db_session, atribuicao.id, StatusAtribuicao.CONCLUIDO)
+    await _assert_consistente(db_session)
+
+    contagens = await resumo_controller.contagens_por_status(db_session)
+    assert contagens == {StatusAtribuicao.PENDENTE: 2, StatusAtribuicao.CONCLUIDO: 1}
+
+
+@pytest.mark.asyncio
+async def test_enrollment_and_cancellation_keep_summary_in_sync(db_session):
+    users, curso = await _seed(db_session, n_users=1)
+    inscricao, _ = await inscricao_controller.inscrever_usuario_em_curso(db_session, users[0].id, curso.id)
+    assert await resumo_controller.contagens_por_status(db_session) == {StatusAtribuicao.EM_ANDAMENTO: 1}
+
+    await inscricao_controller.desinscrever_usuario_de_curso(db_session, inscricao.id)
+    await _assert_consistente(db_session)
+    assert await resumo_controller.contagens_por_status(db_session) == {}
+
+
+@pytest.mark.asyncio
+async def test_course_changes_keep_summary_in_sync(db_session):
+    await _seed(db_session, n_users=2)
+    curso = await curso_controller.criar_curso(
+        db_session, CursoCreate(titulo="Curso Lote", ano_gd="2025", lotacao_id="SETOR A", atribuir_a_todos=True)
+    )
+    await _assert_consistente(db_session)
+
+    await curso_controller.atualizar_curso(
+        db_session, curso.id, CursoCreate(titulo="Curso Lote", ano_gd="2026", lotacao_id="SETOR A", atribuir_a_todos=True)
+    )
+    await _assert_consistente(db_session)
+
+    await curso_controller.deletar_curso(db_session, curso.id)
+    await _assert_consistente(db_session)
+    assert await resumo_controller.contagens_por_status(db_session) == {}
+
+
+@pytest.mark.asyncio
+async def test_lotacao_change_moves_assignments(db_session):
+    users, curso = await _seed(db_session, n_users=1)
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+
+    await usuario_controller.sincronizar_usuario(db_session, {
+        "sAMAccountName": [users[0].id],
+        "displayName": ["Servidor 0"],
+        "department": ["setor b"],
+    })
+    await _assert_consistente(db_session)
+
+    conformidade = await relatorio_controller.get_relatorio_conformidade_lotacao_udp(db_session)
+    assert conformidade == [{
+        "lotacao": "SETOR B", "Pendente": 1, "Em Andamento": 0, "Realizado": 0,
+        "Validado": 0, "Recusado": 0, "Total Atribuições": 1,
+    }]
+
+
+@pytest.mark.asyncio
+async def test_verify_reports_drift_and_rebuild_fixes_it(db_session):
+    users, curso = await _seed(db_session)
+    await atribuicao_controller.criar_atribuicoes_para_lotacao(db_session, curso.id, "SETOR A")
+
+    # Escrita feita por fora dos controllers: o resumo fica desatualizado
+    await db_session.execute(update(Atribuicao).values(status=StatusAtribuicao.REALIZADO))
+    await db_session.commit()
+
+    divergencias = await resumo_controller.verificar_resumo(db_session)
+    assert {(d["status"], d["esperado"], d["atual"]) for d in divergencias} == {
+        ("Pendente", 0, 3),
+        ("Realizado", 3, 0),
+    }
+
+    assert await resumo_controller.reconstruir_resumo(db_session) == 1
+    await _assert_consistente(db_session)
+    status_lotacao = await relatorio_controller.RelatorioProvider(db_session).get_status_lotacao("SETOR A")
+    assert status_lotacao == [{"name": "Realizado", "value": 3}]
@@ -0,0 +1,109 @@
+"""Tests for the SQLite connection profile (pragmas), the read/write pool split, PRAGMA optimize and the diagnostics endpoint."""
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.auth.auth import auth_handler
+from src.models.base import Base
+from src.models.usuario import PerfilUsuario
+from src.resources.database import DatabaseManager
+
+
+@pytest.fixture
+async def file_db(tmp_path):
+    manager = DatabaseManager(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    async with manager.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield manager
+    await manager.close_connection()
+
+
+@pytest.mark.asyncio
+async def test_pragmas_are_applied_to_every_connection(file_db):
+    diagnostico = await file_db.diagnostico()
+
+    assert diagnostico["dialeto"] == "sqlite"
+    assert diagnostico["pragmas"] == {
+        "busy_timeout": 5000,
+        "journal_mode": "wal",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    }
+    assert diagnostico["ultimo_optimize"] is None
+
+    await file_db.otimizar()
+    assert (await file_db.diagnostico())["ultimo_optimize"] is not None
+
+
+@pytest.mark.asyncio
+async def test_readers_are_not_blocked_by_a_writer(file_db):
+    async with file_db.engine.connect() as escritor, file_db.read_engine.connect() as leitor:
+        await escritor.execute(text("INSERT INTO cursos (id, titulo) VALUES ('c1', 'Curso')"))
+        # Transação de escrita aberta: em WAL a leitura segue, vendo o estado confirmado
+        total = (await leitor.execute(text("SELECT COUNT(*) FROM cursos"))).scalar_one()
+        assert total == 0
+        await escritor.commit()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_serialized_by_the_writer_pool(file_db):
+    async def escrever(i):
+        async with file_db.async_session_maker() as session:
+            await session.execute(text("INSERT INTO cursos (id, titulo) VALUES (:id, 'Curso')"), {"id": f"c{i}"})
+            # Outras escritas esperam a vez no pool, sem "database is locked"
+            await asyncio.sleep(0.01)
+            await session.commit()
+
+    async def ler():
+        async with file_db.read_session_maker() as session:
+            return (await session.execute(text("SELECT COUNT(*) FROM cursos"))).scalar_one()
+
+    resultados = await asyncio.gather(*(escrever(i) for i in range(20)), *(ler() for _ in range(5)))
+    assert all(0 <= total <= 20 for total in resultados[20:])
+    assert await ler() == 20
+    assert file_db.engine.pool.size() == 1
+
+
+@pytest.mark.asyncio
+async def test_read_sessions_are_read_only(file_db):
+    async with file_db.read_session_maker() as session:
+        with pytest.raises(OperationalError, match="readonly"):
+            await session.execute(text("INSERT INTO cursos (id, titulo) VALUES ('c1', 'Curso')"))
+
+
+@pytest.mark.asyncio
+async def test_in_memory_database_shares_a_single_pool():
+    manager = DatabaseManager("sqlite+aiosqlite:///:memory:")
+    try:
+        assert not manager.pool_leitura_separado
+        assert manager.read_engine is manager.engine
+    finally:
+        await manager.close_connection()
+
+
+@pytest.mark.asyncio
+async def test_custom_profile(tmp_path):
+    manager = DatabaseManager(f"sqlite+aiosqlite:///{tmp_path / 'custom.db'}", pragmas={"busy_timeout": 250})
+    try:
+        assert (await manager.diagnostico())["pragmas"] == {"busy_timeout": 250}
+    finally:
+        await manager.close_connection()
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_endpoint_requires_udp(app, async_client):
+    udp = auth_handler.create_access_token({"sub": "admin", "perfil": PerfilUsuario.UDP.value})
+    trabalhador = auth_handler.create_access_token({"sub": "user", "perfil": PerfilUsuario.TRABALHADOR.value})
+
+    response = await async_client.get("/api/admin/diagnostico/banco", headers={"Authorization": f"Bearer {udp}"})
+    assert response.status_code == 200
+    assert response.json()["dialeto"] == app.state.app_db.engine.dialect.name
+    if app.state.app_db.sqlite:
+        assert response.json()["pragmas"]["foreign_keys"] == "ON"
+
+    response = await async_client.get("/api/admin/diagnostico/banco", headers={"Authorization": f"Bearer {trabalhador}"})
+    assert response.status_code == 403
@@ -0,0 +1,122 @@
+"""Tests for lowercase user ids and index use in per-user lookups."""
+import sqlite3
+from pathlib import Path
+import pytest
+from uuid import uuid4
+from alembic import command
+from alembic.config import Config
+
+from src.models import Usuario, Curso, Atribuicao, Inscricao, StatusAtribuicao, PerfilUsuario
+from src.controllers import usuario_controller, dashboard_controller
+from src.auth.auth import auth_handler
+
+
+async def _seed(db):
+    user = Usuario(id=" Fulano.Silva ", nome="Fulano", perfil=PerfilUsuario.TRABALHADOR, lotacao="SETOR A")
+    curso = Curso(id=str(uuid4()), titulo="Curso")
+    db.add_all([user, curso])
+    await db.flush()
+    db.add_all([
+        Atribuicao(id=str(uuid4()), user_id="FULANO.SILVA", curso_id=curso.id, status=StatusAtribuicao.PENDENTE),
+        Inscricao(id=str(uuid4()), user_id="Fulano.Silva", curso_id=curso.id),
+    ])
+    await db.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_ids_are_stored_lowercase(db_session):
+    user = await _seed(db_session)
+
+    assert user.id == "fulano.silva"
+    atribuicao = (await db_session.execute(Atribuicao.__table__.select())).mappings().one()
+    assert atribuicao["user_id"] == "fulano.silva"
+    assert (await usuario_controller.get_user_by_username(db_session, "FULANO.Silva")).id == "fulano.silva"
+
+    token = auth_handler.create_access_token({"username": "Fulano.Silva"})
+    assert auth_handler.decode_token(token)["sub"] == "fulano.silva"
+
+
+@pytest.mark.asyncio
+async def test_user_lookup_uses_primary_key(db_session, query_plans):
+    await _seed(db_session)
+    planos = await query_plans(db_session, lambda: usuario_controller.get_user_by_username(db_session, "Fulano.Silva"))
+
+    assert len(planos) == 1
+    assert "SEARCH usuarios USING INDEX sqlite_autoindex_usuarios_1 (id=?)" in planos[0]
+
+
+@pytest.mark.asyncio
+async def test_personal_dashboard_counts_use_user_id_indexes(db_session, query_plans):
+    await _seed(db_session)
+    planos = await query_plans(db_session, lambda: dashboard_controller._contagens_pessoais(db_session, "Fulano.Silva"))
+
+    plano = " | ".join(planos)
+    assert "ix_atribuicoes_user_id_curso_id (user_id=?)" in plano
+    assert "ix_inscricoes_user_id_curso_id (user_id=?)" in plano
+    assert "SCAN atribuicoes" not in plano and "SCAN inscricoes" not in plano
+
+
+def _banco_antes_da_normalizacao(tmp_path, monkeypatch):
+    """Banco SQLite migrado até a revisão anterior à normalização; retorna (caminho, config)."""
+    banco = tmp_path / "app.db"
+    monkeypatch.setenv("SQLITE_DSN", f"sqlite+aiosqlite:///{banco}")
+    # Sem alembic.ini: o env.py não reconfigura o logging dos demais testes
+    config = Config()
+    config.set_main_option("script_location", str(Path(__file__).resolve().parent.parent / "alembic"))
+    command.upgrade(config, "e4b2d7a1c953")
+    return banco, config
+
+
+def test_migration_merges_case_duplicates_into_resumo_and_feed(tmp_path, monkeypatch):
+    banco, config = _banco_antes_da_normalizacao(tmp_path, monkeypatch)
+
+    with sqlite3.connect(banco) as conn:
+        conn.executescript(
+            """
+            INSERT INTO usuarios (id, nome, perfil, lotacao, vinculo) VALUES
+                ('John', 'John', 'TRABALHADOR', 'A', 'EBSERH'),
+                ('john', 'John', 'TRABALHADOR', 'B', 'EBSERH');
+            INSERT INTO cursos (id, titulo, ano_gd) VALUES ('c1', 'Curso 1', '2025'), ('c2', 'Curso 2', '2025');
+            INSERT INTO atribuicoes (id, user_id, curso_id, status) VALUES
+                ('a1', 'John', 'c1', 'PENDENTE'),
+                ('a2', 'john', 'c2', 'REALIZADO');
+            INSERT INTO resumo_atribuicoes (lotacao, vinculo, ano_gd, status, total) VALUES
+                ('A', 'EBSERH', '2025', 'PENDENTE', 1),
+                ('B', 'EBSERH', '2025', 'REALIZADO', 1);
+            """
+        )
+    command.upgrade(config, "head")
+
+    with sqlite3.connect(banco) as conn:
+        assert conn.execute("SELECT id, lotacao FROM usuarios").fetchall() == [("john", "B")]
+        resumo = conn.execute("SELECT lotacao, status, total FROM resumo_atribuicoes ORDER BY status").fetchall()
+        assert resumo == [("B", "PENDENTE", 1), ("B", "REALIZADO", 1)]
+        feed = conn.execute("SELECT atribuicao_id, operacao FROM alteracoes_atribuicoes ORDER BY seq").fetchall()
+        assert feed == [("a1", "upsert")]
+
+
+def test_migration_merges_whitespace_variants(tmp_path, monkeypatch):
+    banco, config = _banco_antes_da_normalizacao(tmp_path, monkeypatch)
+    with sqlite3.connect(banco) as conn:
+        conn.executescript(
+            """
+            INSERT INTO usuarios (id, nome, perfil, lotacao) VALUES
+                (' Joao', 'Joao', 'TRABALHADOR', 'A'),
+                ('joao', 'Joao', 'TRABALHADOR', 'B'),
+                ('JOAO ', 'Joao', 'TRABALHADOR', 'C'),
+                (' Maria', 'Maria', 'TRABALHADOR', 'A'),
+                ('MARIA ', 'Maria', 'TRABALHADOR', 'B');
+            INSERT INTO cursos (id, titulo) VALUES ('c1', 'Curso 1'), ('c2', 'Curso 2');
+            INSERT INTO atribuicoes (id, user_id, curso_id, status) VALUES
+                ('a1', ' Joao', 'c1', 'PENDENTE'),
+                ('a2', 'MARIA ', 'c2', 'PENDENTE');
+            """
+        )
+    command.upgrade(config, "head")
+
+    with sqlite3.connect(banco) as conn:
+        # Fica a variante já normalizada ou, sem ela, a menor
+        assert conn.execute("SELECT id, lotacao FROM usuarios ORDER BY id").fetchall() == [("joao", "B"), ("maria", "A")]
+        atribuicoes = conn.execute("SELECT id, user_id FROM atribuicoes ORDER BY id").fetchall()
+        assert atribuicoes == [("a1", "joao"), ("a2", "maria")]